@@ -0,0 +1,27 @@
+from agents import Agent
+from shared.provider import get_model, get_run_config
+from shared.sessions import SessionMemory, SQLiteSessionBackend
+import asyncio
+
+model = get_model()
+config = get_run_config()
+
+# Each turn sends a summary plus the recent messages; run this file again and the chat continues
+memory = SessionMemory(SQLiteSessionBackend(".cache/sessions.sqlite"), window=1000)
+
+
+async def main():
+    agent = Agent(
+        name="Assistant",
+        instructions="You are a helpful assistant that greets users when they say hello.",
+        model=model
+    )
+
+    for message in ["Hello how are you?", "My name is Ali.", "What is my name?"]:
+        result = await memory.run(agent, "ali", message, run_config=config)
+        print(f"User: {message}\nAssistant: {result.final_output}\n")
+    print(f"Session stats: {memory.stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+import asyncio
+from agents import Agent, Runner, set_tracing_disabled, set_default_openai_api
+from shared.provider import get_model
+from shared.streaming import RUN_ITEMS, TEXT_DELTA, BroadcastStream
+
+model = get_model()
+
+set_tracing_disabled(True)
+set_default_openai_api("chat_completions")
+
+
+async def main():
+    agent = Agent(
+        name="Assistant",
+        instructions="You are a helpful assistant",
+        model=model
+    )
+
+    # One run and one model call, read once and delivered to every subscriber
+    broadcast = BroadcastStream(Runner.run_streamed(agent, input="Explain the capital of Pakistan in 20 lines."))
+    user = broadcast.subscribe(subscribe={TEXT_DELTA}, max_queue=256, overflow="coalesce")
+    audit = broadcast.subscribe(subscribe={RUN_ITEMS}, max_queue=16, overflow="drop_oldest")
+
+    async def send_to_user():
+        async for event in user:
+            print(event.data.delta, end="", flush=True)
+
+    async def write_audit_log():
+        async for event in audit:
+            print(f"\n[audit] {event.name}")
+
+    async def late_joiner():
+        # Attaches after the run started and replays what it missed from the buffer
+        await asyncio.sleep(0.5)
+        viewer = broadcast.subscribe(subscribe={TEXT_DELTA}, replay=True)
+        text = "".join([event.data.delta async for event in viewer])
+        print(f"\n[late joiner] caught up on {len(text)} characters ({viewer.stats.replayed} replayed events)")
+
+    await asyncio.gather(send_to_user(), write_audit_log(), late_joiner())
+    await broadcast.wait()
+    print(f"User stream stats: {user.stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
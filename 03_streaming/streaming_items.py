@@ -1,30 +1,16 @@
 import asyncio
-import os
-from agents import Agent, Runner, AsyncOpenAI,ItemHelpers, set_tracing_disabled, set_default_openai_api, set_default_openai_client, OpenAIChatCompletionsModel
-from dotenv import load_dotenv
-from openai.types.responses import ResponseTextDeltaEvent
+from agents import Agent, Runner,ItemHelpers, set_tracing_disabled, set_default_openai_api
+from shared.provider import get_model
+from shared.streaming import AGENT_UPDATES, RUN_ITEMS, StreamPolicy
 
-load_dotenv()
+model = get_model()
 
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-
-if not gemini_api_key:
-    raise ValueError("GEMINI_API_KEY is not set.")
-
-external_client = AsyncOpenAI(
-    api_key=gemini_api_key, 
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
-  )
-
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client = external_client
-)
-
-set_default_openai_client(external_client)
 set_tracing_disabled(True)
 set_default_openai_api("chat_completions")
 
+# Only item and agent events are queued; the per-token raw events are dropped before they reach the queue
+stream_policy = StreamPolicy(subscribe={RUN_ITEMS, AGENT_UPDATES}, max_queue=64)
+
 
 async def main():
     agent = Agent(
@@ -33,12 +19,10 @@ async def main():
         model=model
     )
 
-    result = Runner.run_streamed(agent, input="Explain the capital of Pakistan in 20 lines.")
+    result = stream_policy.run_streamed(agent, input="Explain the capital of Pakistan in 20 lines.")
 
     async for event in result.stream_events():
-        if event.type == "raw_response_event":
-            continue
-        elif event.type == "agent_updated_stream_event":
+        if event.type == "agent_updated_stream_event":
             print(f"Agent Updated: {event.new_agent.name}")
             continue
         elif event.type == "run_item_stream_event":
@@ -51,6 +35,7 @@ async def main():
             else:
                 pass
 
+    print(f"Stream stats: {stream_policy.stats}")
 
 
 if __name__ == "__main__":
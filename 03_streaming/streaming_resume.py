@@ -0,0 +1,50 @@
+import asyncio
+from agents import Agent, set_tracing_disabled, set_default_openai_api
+from shared.provider import get_model
+from shared.resumable import ResumableRuns, SQLiteCheckpointStore
+
+model = get_model()
+
+set_tracing_disabled(True)
+set_default_openai_api("chat_completions")
+
+# Every event is numbered and checkpointed; run this file twice and the second run replays from the store
+runs = ResumableRuns(SQLiteCheckpointStore(".cache/runs.sqlite"))
+
+
+def print_text(frame):
+    # A run continued after a crash sends "run_reset": a real client drops its text after frame["after"]
+    if frame["type"] == "raw_response_event" and frame["data"]["type"] == "response.output_text.delta":
+        print(frame["data"]["delta"], end="", flush=True)
+
+
+async def main():
+    agent = Agent(
+        name="Assistant",
+        instructions="You are a helpful assistant",
+        model=model
+    )
+
+    run_id = "capital-of-pakistan"
+    await runs.start(run_id, agent, input="Explain the capital of Pakistan in 20 lines.")
+
+    # The client drops the connection after 40 events; the run carries on without it
+    last_seq = -1
+    async for seq, frame in runs.events(run_id):
+        print_text(frame)
+        last_seq = seq
+        if seq >= 40:
+            break
+    print(f"\n-- Disconnected after event {last_seq}, reconnecting --")
+
+    await asyncio.sleep(1)
+    async for seq, frame in runs.events(run_id, after=last_seq):
+        print_text(frame)
+
+    record = await runs.wait(run_id)
+    print(f"\nRun {record.status}: {record.last_seq + 1} events, {len(record.items)} items")
+    print(f"Resume stats: {runs.stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
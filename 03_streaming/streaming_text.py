@@ -1,30 +1,17 @@
 import asyncio
-import os
-from agents import Agent, Runner, AsyncOpenAI, set_tracing_disabled, set_default_openai_api, set_default_openai_client, OpenAIChatCompletionsModel
-from dotenv import load_dotenv
-from openai.types.responses import ResponseTextDeltaEvent
+from agents import Agent, Runner, set_tracing_disabled, set_default_openai_api
+from shared.provider import get_model
+from shared.streaming import TEXT_DELTA, StreamPolicy
 
-load_dotenv()
+model = get_model()
 
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-
-if not gemini_api_key:
-    raise ValueError("GEMINI_API_KEY is not set.")
-
-external_client = AsyncOpenAI(
-    api_key=gemini_api_key, 
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
-  )
-
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client = external_client
-)
-
-set_default_openai_client(external_client)
 set_tracing_disabled(True)
 set_default_openai_api("chat_completions")
 
+# Only text deltas are queued, merged into one print every 50ms (or 256 characters).
+# A slow reader pauses the model stream instead of growing the queue
+stream_policy = StreamPolicy(subscribe={TEXT_DELTA}, coalesce_seconds=0.05, coalesce_chars=256, max_queue=64)
+
 
 async def main():
     agent = Agent(
@@ -33,11 +20,12 @@ async def main():
         model=model
     )
 
-    result = Runner.run_streamed(agent, input="Explain the capital of Pakistan in three lines.")
+    result = stream_policy.run_streamed(agent, input="Explain the capital of Pakistan in three lines.")
 
     async for event in result.stream_events():
-        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
-            print(event.data.delta, end="", flush=True)
+        print(event.data.delta, end="", flush=True)
+
+    print(f"\nStream stats: {stream_policy.stats}")
 
 
 
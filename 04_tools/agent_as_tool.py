@@ -1,32 +1,18 @@
-import os 
 import asyncio
 from agents import (Agent,
                     Runner,
-                    AsyncOpenAI,
                     ItemHelpers,
+                    ModelSettings,
                     enable_verbose_stdout_logging,
                     set_tracing_disabled,
-                    set_default_openai_api,
-                    set_default_openai_client,
-                    OpenAIChatCompletionsModel
                     )
-from dotenv import load_dotenv
-
-load_dotenv()
-
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-
-if not gemini_api_key:
-    print("GEMINI_API_KEY is not set.")
+from shared.fanout import FanOut
+from shared.provider import get_model
 
 set_tracing_disabled(True)
 enable_verbose_stdout_logging()
 
-external_client = AsyncOpenAI(api_key=gemini_api_key, base_url="https://generativelanguage.googleapis.com/v1beta/openai/")
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
+model = get_model()
 
 
 # Agents as tools
@@ -52,6 +38,10 @@ french_agent = Agent(
 )
 
 
+# Sub-agent calls from one turn run concurrently, at most 8 at a time, 30 seconds each
+fan_out = FanOut(max_concurrency=8, timeout=30)
+
+
 # Orchestrator Agent (the main agent)
 orchestrator_agent = Agent(
     name="Orchestrator Agent",
@@ -65,9 +55,8 @@ orchestrator_agent = Agent(
         When the user asks for translations into multiple languages, follow this exact **step-by-step** process:
 
         1. Parse the user’s request and build a list of the languages they want (e.g. [Spanish, French]).  
-        2. **For each** language in that list, **in sequence**:
-        - Emit **exactly one** function call to the corresponding tool     
-        - Wait for the tool to return its translation.
+        2. Emit **all** the function calls for that list **in the same turn**, one call per language.
+        The translations are independent, so they run in parallel.
         3. After you’ve gathered all individual translations, send a final plain-text message that lists each result, like:
         - Spanish: …  
         - French: …  
@@ -76,10 +65,11 @@ orchestrator_agent = Agent(
         If the user’s question isn’t about translating text, answer normally without calling any tool.
     """,
     model=model,
+    model_settings=ModelSettings(parallel_tool_calls=True),
     tools=[
-      spanish_agent.as_tool("translate_to_spanish", "Translate English to Spanish."),
-      italian_agent.as_tool("translate_to_italian", "Translate English to Italian."),
-      french_agent.as_tool("translate_to_french", "Translate English to French."),
+      fan_out.as_tool(spanish_agent, "translate_to_spanish", "Translate English to Spanish."),
+      fan_out.as_tool(italian_agent, "translate_to_italian", "Translate English to Italian."),
+      fan_out.as_tool(french_agent, "translate_to_french", "Translate English to French."),
     ]
 )
 
@@ -0,0 +1,34 @@
+import asyncio
+from shared.batch_translate import BatchTranslator
+from agent_as_tool import spanish_agent, italian_agent, french_agent
+
+
+# Packs 50 strings into one request per language instead of one orchestrator run per string
+translator = BatchTranslator(
+    {"Spanish": spanish_agent, "Italian": italian_agent, "French": french_agent},
+    batch_size=50,
+    max_concurrency=4,
+)
+
+
+async def main():
+    texts = [
+        "Hello, how are you?",
+        "Where is the train station?",
+        "I would like a cup of tea.",
+        "What time is it?",
+        "Thank you very much!",
+    ]
+
+    async for result in translator.translate(texts):
+        print(f"{result.text}")
+        for language, translation in result.translations.items():
+            print(f"  - {language}: {translation}")
+        for language, error in result.errors.items():
+            print(f"  - {language}: failed ({error})")
+
+    print(f"Batch stats: {translator.stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
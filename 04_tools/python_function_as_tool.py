@@ -1,12 +1,14 @@
-from agents.tool import function_tool
-from agents import Agent, Runner, AsyncOpenAI,ItemHelpers, set_tracing_disabled, set_default_openai_api, set_default_openai_client, OpenAIChatCompletionsModel
-from dotenv import load_dotenv
+from shared.datasource import DataSource, Index
+from shared.tools import Execution, ToolCache, function_tool
+from agents import Agent, Runner, ItemHelpers, set_tracing_disabled, set_default_openai_api
+from shared.provider import get_model
 import asyncio
-import os
 
 
 
-@function_tool
+# Same arguments within 5 minutes reuse the previous result; calls run in the shared
+# thread pool so a slow lookup doesn't block other runs on the event loop
+@function_tool(cache=ToolCache(ttl=300), execution=Execution("thread", max_concurrency=8, timeout=10))
 def get_weather(location: str, unit: str = "C") -> str:
   """
   Fetch the weather for a given location, returning a short description.
@@ -15,49 +17,45 @@ def get_weather(location: str, unit: str = "C") -> str:
   return f"The weather in {location} is 22 degrees {unit}."
 
 
-@function_tool
+# Loaded and indexed once; each lookup is a dict access instead of a scan
+students = DataSource.from_records(
+    [
+        {
+            "user_name": "johndoe123",
+            "name": "John Doe",
+            "age": 20,
+            "email": "john.doe@example.com"
+        },
+        {
+            "user_name": "janesmith456",
+            "name": "Jane Smith",
+            "age": 21,
+            "email": "jane.smith@example.com"
+        },
+        {
+            "user_name": "jimbeam789",
+            "name": "Jim Beam",
+            "age": 22,
+            "email": "jim.beam@example.com"
+        }
+    ],
+    indexes=[Index("user_name")],
+)
+
+
+@function_tool(cache=ToolCache(ttl=300), execution=Execution("thread", max_concurrency=8, timeout=10))
 def get_user_info(user_name: str) -> str:
     """
     Fetch user information for a given user name.
     """
-    students = [
-     {
-       "user_name": "johndoe123",
-       "name": "John Doe",
-       "age": 20,
-       "email": "john.doe@example.com"
-     },
-     {
-       "user_name": "janesmith456",
-       "name": "Jane Smith",
-       "age": 21,
-       "email": "jane.smith@example.com"
-     },
-     {
-       "user_name": "jimbeam789",
-       "name": "Jim Beam",
-       "age": 22,
-       "email": "jim.beam@example.com"
-     }
-   ]
-    for student in students:
-      if student["user_name"] == user_name:
+    student = students.get("user_name", user_name)
+    if student:
         return f"Name: {student['name']}, Email: {student['email']}, Age: {student['age']}"
     return f"User {user_name} not found."
 
 
-load_dotenv()
-
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-
-if not gemini_api_key:
-    raise ValueError("GEMINI_API_KEY is not set.")
-
-external_client = AsyncOpenAI(api_key=gemini_api_key, base_url="https://generativelanguage.googleapis.com/v1beta/openai/")
-
 set_tracing_disabled(True)
 set_default_openai_api("chat_completions")
-set_default_openai_client(external_client)
 
 
 
@@ -66,7 +64,7 @@ async def main():
         name="Assistant",
         instructions="You are a helpful assistant that can use tools to get information.",
         tools=[get_user_info, get_weather],
-        model="gemini-2.0-flash"
+        model=get_model()
     )
     result = Runner.run_streamed(agent, "Tell me about jimbeam789?")
 
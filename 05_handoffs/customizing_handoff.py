@@ -1,34 +1,13 @@
-import os
-from dotenv import load_dotenv
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, handoff, RunContextWrapper
-from agents.run import RunConfig
+from agents import Agent, Runner, handoff, RunContextWrapper
+from shared.provider import get_model, get_run_config
+from shared.compaction import HandoffCompactor
+from shared.router import FastPathRouter
+from handoffs import language_routes
 import asyncio
 
-# Load the environment variables from the .env file
-load_dotenv()
-
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-
-# Check if the API key is present; if not, raise an error
-if not gemini_api_key:
-    raise ValueError("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")
-
-#Reference: https://ai.google.dev/gemini-api/docs/openai
-external_client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
-
-config = RunConfig(
-    model=model,
-    model_provider=external_client,
-    tracing_disabled=True
-)
+# No run-level model, so each agent uses its own (the triage agent's is the router)
+model = get_model()
+config = get_run_config(model=None)
 
 def on_handoff(agent: Agent, ctx: RunContextWrapper[None]):
     agent_name = agent.name
@@ -49,19 +28,28 @@ arabic_agent = Agent(
     model=model
 )
 
+# on_handoff still runs when the router hands off without asking the model
+router = FastPathRouter(model, language_routes)
+
+# The target agent gets recent messages plus a summary, not the whole history
+compactor = HandoffCompactor(budget=1500)
+
+
 async def main():
     agent = Agent(
         name="Assistant",
         instructions="You are a helpful assistant that greets users when they say hello. You can also handoff to the Urdu Agent or the Arabic Agent to answer questions in Urdu or Arabic.",
-        model=model,
+        model=router,
         handoffs=[
-            handoff(urdu_agent, on_handoff=lambda ctx: on_handoff(urdu_agent, ctx)),
-            handoff(arabic_agent, on_handoff=lambda ctx: on_handoff(arabic_agent, ctx))
+            handoff(urdu_agent, on_handoff=lambda ctx: on_handoff(urdu_agent, ctx), input_filter=compactor),
+            handoff(arabic_agent, on_handoff=lambda ctx: on_handoff(arabic_agent, ctx), input_filter=compactor)
         ]
     )
 
     result = await Runner.run(agent, "Salam. kya hal hy?", run_config=config)
     print(result.final_output)
+    print(f"Router stats: {router.stats}")
+    print(f"Compaction stats: {compactor.stats}")
 
 
 if __name__ == "__main__":
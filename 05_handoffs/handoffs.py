@@ -1,34 +1,12 @@
-import os
-from dotenv import load_dotenv
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel
-from agents.run import RunConfig
+from agents import Agent, Runner
+from shared.provider import get_model, get_run_config
+from shared.router import FastPathRouter
+from shared.tiered_guardrail import ARABIC_LETTERS, ARABIC_SCRIPT, PERSO_URDU_LETTERS, URDU_LETTERS, KeywordCheck, ScriptCheck, Verdict
 import asyncio
 
-# Load the environment variables from the .env file
-load_dotenv()
-
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-
-# Check if the API key is present; if not, raise an error
-if not gemini_api_key:
-    raise ValueError("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")
-
-#Reference: https://ai.google.dev/gemini-api/docs/openai
-external_client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
-
-config = RunConfig(
-    model=model,
-    model_provider=external_client,
-    tracing_disabled=True
-)
+# No run-level model, so each agent uses its own (the triage agent's is the router)
+model = get_model()
+config = get_run_config(model=None)
 
 
 
@@ -44,16 +22,43 @@ arabic_agent = Agent(
     model=model
 )
 
+# Common Roman Urdu words ("kya hal hy?"); no Arabic-script letters to detect there
+ROMAN_URDU = [
+    "kya", "hal", "hy", "hai", "hain", "ap", "aap", "ka", "ki", "ke", "kaise", "kaisa", "kaisi",
+    "mein", "main", "mera", "meri", "tum", "nahi", "haan", "acha", "theek", "shukriya", "kahan", "kab", "kyun",
+]
+
+# Obvious cases go straight to the target agent without a triage turn. Arabic needs an
+# Arabic-only letter and no Urdu or Persian one; "سلام" or Persian text goes to triage
+language_routes = {
+    "Urdu Agent": [
+        ScriptCheck(ARABIC_SCRIPT, Verdict.passed("Urdu script"), marker_chars=URDU_LETTERS),
+        KeywordCheck(ROMAN_URDU, Verdict.passed("Roman Urdu", confidence=0.95), min_ratio=0.5),
+    ],
+    "Arabic Agent": [
+        ScriptCheck(
+            ARABIC_SCRIPT,
+            Verdict.passed("Arabic script", confidence=0.95),
+            marker_chars=ARABIC_LETTERS,
+            excluded_chars=PERSO_URDU_LETTERS,
+        ),
+    ],
+}
+router = FastPathRouter(model, language_routes)
+
+
 async def main():
     agent = Agent(
         name="Assistant",
         instructions="You are a helpful assistant that greets users when they say hello. You can also handoff to the Urdu Agent or the Arabic Agent to answer questions in Urdu or Arabic.",
-        model=model,
+        model=router,
         handoffs=[urdu_agent, arabic_agent]
     )
 
     result = await Runner.run(agent, "Salam. kya hal hy?", run_config=config)
     print(result.final_output)
+    print(f"Handled by {result.last_agent.name}")
+    print(f"Router stats: {router.stats}")
 
 
 if __name__ == "__main__":
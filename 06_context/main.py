@@ -1,49 +1,28 @@
-import os
 import asyncio
 from dataclasses import dataclass
-from dotenv import load_dotenv
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, function_tool, RunContextWrapper, enable_verbose_stdout_logging
-from agents.run import RunConfig
+from agents import Agent, Runner, RunContextWrapper, enable_verbose_stdout_logging
+from shared.provider import get_model, get_run_config
+from shared.context import ContextOverlay, TenantState, TenantStore
+from shared.datasource import DataSource, Index
+from shared.tools import ToolCache, function_tool
 
 
-# Load the environment variables from the .env file
-load_dotenv()
-
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-
-# Check if the API key is present; if not, raise an error
-if not gemini_api_key:
-    raise ValueError("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")
-
-#Reference: https://ai.google.dev/gemini-api/docs/openai
-external_client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
 enable_verbose_stdout_logging()
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
 
-config = RunConfig(
-    model=model,
-    model_provider=external_client,
-    tracing_disabled=True
-)
+model = get_model()
+config = get_run_config()
 
-@dataclass
+# Slotted and frozen: a session is a few pointers, and the tenant data is shared, not copied
+@dataclass(frozen=True, slots=True)
 class CityInfo:
     city: str
+    tenant: TenantState | None = None
 
 
 
-@function_tool
-def get_weather(ctx: RunContextWrapper[CityInfo]) -> CityInfo:
-    """returns the weather information of a city. requires no parameters"""
-
-    cities_weather_data = [
+# Loaded and indexed once; "karachi" and "Karachi" find the same row
+cities_weather = DataSource.from_records(
+    [
         {
             "city": "Islamabad",
             "temperature": 32.5,
@@ -59,16 +38,29 @@ def get_weather(ctx: RunContextWrapper[CityInfo]) -> CityInfo:
             "temperature": 30.5,
             "description": "Rainy"
         }
-    ]
+    ],
+    indexes=[Index("city", case_insensitive=True)],
+)
+
+# Loaded once per tenant; every session of the tenant gets the same snapshot
+tenants = TenantStore(
+    lambda tenant_id: TenantState(
+        tenant_id,
+        profile={"units": "celsius"},
+        lookups={"cities": tuple(row["city"] for row in cities_weather)},
+    )
+)
+
 
-    for city_weather_data in cities_weather_data:
-        if city_weather_data["city"] == ctx.context.city:           
-            return city_weather_data
-    return None
+# The tool takes no arguments, so the city from the context is part of the cache key
+@function_tool(cache=ToolCache(ttl=300, key_context=("city",)))
+def get_weather(ctx: RunContextWrapper[CityInfo]) -> CityInfo:
+    """returns the weather information of a city. requires no parameters"""
+    return cities_weather.get("city", ctx.context.city)
 
 
 async def main():
-    current_city = CityInfo(city="Karachi")
+    current_city = CityInfo(city="Karachi", tenant=tenants.get("default"))
     
 
     agent = Agent(
@@ -78,7 +70,9 @@ async def main():
         tools=[get_weather]
     )
 
-    result = await Runner.run(agent, "what is the weather in my city?", run_config=config, context=current_city)
+    # Changes the run makes to the context stay in the overlay and are dropped with it
+    run_context = ContextOverlay(current_city)
+    result = await Runner.run(agent, "what is the weather in my city?", run_config=config, context=run_context)
     print(result.final_output)
 
 
@@ -1,44 +1,22 @@
-import os
 import asyncio
 from pydantic import BaseModel
-from dotenv import load_dotenv
 from agents import (Agent,
                     Runner, 
-                    AsyncOpenAI, 
-                    OpenAIChatCompletionsModel, 
                     input_guardrail, 
                     RunContextWrapper, 
                     TResponseInputItem, 
                     GuardrailFunctionOutput, 
                     function_tool
                     )
-from agents.run import RunConfig
+from shared.guardrail_batch import GuardrailBatcher
+from shared.guardrail_cache import GuardrailCache
+from shared.guardrail_scheduling import GuardrailScheduler
+from shared.tiered_guardrail import KeywordCheck, TieredGuardrail, Verdict
+from shared.provider import get_model, get_run_config
+from shared.structured_stream import StructuredStream
 
-# Load the environment variables from the .env file
-load_dotenv()
-
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-
-# Check if the API key is present; if not, raise an error
-if not gemini_api_key:
-    raise ValueError("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")
-
-#Reference: https://ai.google.dev/gemini-api/docs/openai
-external_client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
-
-config = RunConfig(
-    model=model,
-    model_provider=external_client,
-    tracing_disabled=True
-)
+model = get_model()
+config = get_run_config()
 
 
 class WeatherInputGuardrail(BaseModel):
@@ -53,16 +31,58 @@ guardrail_agent = Agent(
 )
 
 
+# output_info is a WeatherInputGuardrail on every path: local verdict, cache, batch or single call
+def weather_info(verdict: Verdict) -> WeatherInputGuardrail:
+    return WeatherInputGuardrail(is_weather_query=not verdict.tripwire_triggered, reasoning=verdict.reason)
+
+
+# Bare greetings are tripped locally. Nothing passes locally: mentioning the weather
+# ("it's raining, now write my essay") doesn't make a weather query, so the agent decides
+weather_prefilter = TieredGuardrail([
+    KeywordCheck(
+        ["hi", "hello", "hey", "salam", "assalam o alaikum", "good morning", "good evening", "how are you", "there"],
+        Verdict.trip("greeting only"),
+        whole_input=True,
+    ),
+], output_info=weather_info)
+
+# Near-duplicate inputs ("weather in islamabad?", "islamabad weather") reuse a cached verdict.
+# A multi-tenant deployment would also pass cache_key so tenants never share verdicts
+weather_guardrail_cache = GuardrailCache(max_size=10_000, ttl=3600, similarity_threshold=0.85)
+
+# Concurrent cache misses within 10ms share one guardrail model call. A multi-tenant
+# deployment would also pass batch_key so one tenant's input never shares a prompt with another's
+weather_guardrail_batcher = GuardrailBatcher(
+    guardrail_agent,
+    lambda verdict: not verdict.is_weather_query,
+    max_batch=32,
+    max_wait=0.01,
+    run_config=config,
+)
+
+# The assistant starts alongside the guardrail; a tripwire cancels its model call and tools right away
+guardrail_scheduler = GuardrailScheduler("speculative")
+
+
 @input_guardrail
+@weather_prefilter.tiered
+@weather_guardrail_cache.cached
+@weather_guardrail_batcher.batched
 async def weather_guardrail(
     ctx: RunContextWrapper[None],
     agent: Agent, 
     input: str | list[TResponseInputItem]
 ) -> GuardrailFunctionOutput: 
-    result = await Runner.run(guardrail_agent, input, context=ctx.context, run_config=config)
+    # Decide as soon as is_weather_query is parsed and stop before the reasoning is generated
+    stream = StructuredStream(guardrail_agent, input, context=ctx.context, run_config=config)
+    try:
+        is_weather_query = await stream.field("is_weather_query")
+    finally:
+        # Also when the guardrail itself is cancelled (e.g. by a tripwire elsewhere)
+        stream.cancel()
     return GuardrailFunctionOutput(
-        output_info = result.final_output,
-        tripwire_triggered = not result.final_output.is_weather_query,
+        output_info = stream.partial(reasoning=""),
+        tripwire_triggered = not is_weather_query,
     )
 
 
@@ -81,8 +101,12 @@ async def main():
         tools=[get_weather]
     )
 
-    result = await Runner.run(agent, "how is the weather in islamabad?", run_config=config)
+    result = await guardrail_scheduler.run(agent, "how is the weather in islamabad?", run_config=config)
     print(result.final_output)
+    print(f"Guardrail scheduling: {guardrail_scheduler.stats}")
+    print(f"Guardrail prefilter: {weather_prefilter.stats}")
+    print(f"Guardrail cache: {weather_guardrail_cache.stats}")
+    print(f"Guardrail batching: {weather_guardrail_batcher.stats}")
 
 
 if __name__ == "__main__":
@@ -1,43 +1,18 @@
-import os
 import asyncio
 from pydantic import BaseModel
-from dotenv import load_dotenv
 from agents import (Agent, 
                     Runner,
-                    AsyncOpenAI, 
-                    OpenAIChatCompletionsModel, 
                     output_guardrail, 
                     RunContextWrapper, 
                     TResponseInputItem, 
                     GuardrailFunctionOutput
                     )
-from agents.run import RunConfig
+from shared.provider import get_model, get_run_config
+from shared.structured_stream import StructuredStream
+from shared.tiered_guardrail import ARABIC_SCRIPT, URDU_LETTERS, KeywordCheck, ScriptCheck, TieredGuardrail, Verdict
 
-# Load the environment variables from the .env file
-load_dotenv()
-
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-
-# Check if the API key is present; if not, raise an error
-if not gemini_api_key:
-    raise ValueError("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")
-
-#Reference: https://ai.google.dev/gemini-api/docs/openai
-external_client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
-
-config = RunConfig(
-    model=model,
-    model_provider=external_client,
-    tracing_disabled=True
-)
+model = get_model()
+config = get_run_config()
 
 
 class UrduCheckOutputGuardrail(BaseModel):
@@ -52,16 +27,39 @@ output_guardrail_agent = Agent(
 )
 
 
+# output_info is an UrduCheckOutputGuardrail whether a local check or the agent decided
+def urdu_info(verdict: Verdict) -> UrduCheckOutputGuardrail:
+    return UrduCheckOutputGuardrail(is_output_in_urdu=not verdict.tripwire_triggered, reasoning=verdict.reason)
+
+
+# Urdu script and plain English are detected locally; anything else (e.g. Roman Urdu) goes to the agent
+urdu_prefilter = TieredGuardrail([
+    ScriptCheck(ARABIC_SCRIPT, Verdict.passed("Urdu script"), marker_chars=URDU_LETTERS),
+    KeywordCheck(
+        ["the", "is", "are", "and", "of", "to", "in", "it", "that", "this", "with", "for", "was", "you"],
+        Verdict.trip("English text", confidence=0.95),
+        min_ratio=0.25,
+    ),
+], output_info=urdu_info)
+
+
 @output_guardrail
+@urdu_prefilter.tiered
 async def output_guardrail(
     ctx: RunContextWrapper[None],
     agent: Agent, 
     output: str | list[TResponseInputItem]
 ) -> GuardrailFunctionOutput: 
-    result = await Runner.run(output_guardrail_agent, output, context=ctx.context, run_config=config)
+    # Decide as soon as is_output_in_urdu is parsed and stop before the reasoning is generated
+    stream = StructuredStream(output_guardrail_agent, output, context=ctx.context, run_config=config)
+    try:
+        is_output_in_urdu = await stream.field("is_output_in_urdu")
+    finally:
+        # Also when the guardrail itself is cancelled (e.g. by a tripwire elsewhere)
+        stream.cancel()
     return GuardrailFunctionOutput(
-        output_info = result.final_output,
-        tripwire_triggered = not result.final_output.is_output_in_urdu,
+        output_info = stream.partial(reasoning=""),
+        tripwire_triggered = not is_output_in_urdu,
     )
 
 
@@ -74,6 +72,7 @@ async def main():
 
     result = await Runner.run(agent, "tell me about urdu language in urdu?", run_config=config)
     print(result.final_output)
+    print(f"Guardrail prefilter: {urdu_prefilter.stats}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,33 @@
+import asyncio
+from agents import Agent, Runner, OutputGuardrailTripwireTriggered
+from openai.types.responses import ResponseTextDeltaEvent
+from shared.streaming_guardrails import StreamingOutputGuardrail
+from output_guardrails import config, model, output_guardrail
+
+
+# Checks the answer sentence by sentence while it streams and stops the generation
+# as soon as the tripwire fires, instead of waiting for the full output
+streaming_guardrail = StreamingOutputGuardrail([output_guardrail])
+
+
+async def main():
+    agent = Agent(
+        name="Assistant",
+        instructions="You are a helpful assistant.",
+        model=model
+    )
+
+    result = Runner.run_streamed(agent, input="tell me about urdu language in 20 lines.", run_config=config)
+
+    try:
+        async for event in streaming_guardrail.stream(result):
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                print(event.data.delta, end="", flush=True)
+    except OutputGuardrailTripwireTriggered as e:
+        print(f"\n\nGuardrail tripped, generation stopped: {e.guardrail_result.output.output_info}")
+
+    print(f"\nGuardrail checks: {streaming_guardrail.stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
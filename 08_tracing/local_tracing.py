@@ -1,78 +1,27 @@
 import os
 from dotenv import load_dotenv
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, trace, set_trace_processors
-from agents.tracing.processor_interface import TracingProcessor
-from agents.run import RunConfig
+from agents import Agent, Runner, trace, set_trace_processors
+from shared.provider import get_model, get_run_config
+from shared.profiler import ProfilingProcessor
+from shared.tracing import BatchingTraceProcessor, JSONLExporter
 import asyncio
 
 # Load the environment variables from the .env file
 load_dotenv()
 
-gemini_api_key = os.getenv("GEMINI_API_KEY")
 agentops_api_key = os.getenv("AGENTOPS_API_KEY")
 
 
-class LocalTraceProcessor(TracingProcessor):
-    def __init__(self):
-        self.traces = []
-        self.spans = []
+# Spans go to a bounded queue; a background thread appends them to traces/traces.jsonl in batches
+batch_processor = BatchingTraceProcessor(JSONLExporter("traces/traces.jsonl"), max_queue_size=8192, max_batch_size=256)
+# Aggregates the same spans into per-stage latency histograms and flame graph stacks
+profiler = ProfilingProcessor()
+set_trace_processors([batch_processor, profiler])
 
-    def on_trace_start(self, trace):
-        self.traces.append(trace)
-        print(f"Trace started: {trace.trace_id}")
 
-    def on_trace_end(self, trace):
-        # self.traces.append(trace)
-        print(f"Trace ended: {trace.export()}")
-
-    def on_span_start(self, span):
-        self.spans.append(span)
-        print(f"Span started: {span.span_id}")
-        print(f"span details: {span.export()}")
-
-    def on_span_end(self, span):
-        print(f"Span ended: {span.span_id}")
-        print(f"span details: {span.export()}")
-
-    def force_flush(self):
-        print("Forcing Flush of span data")
-
-    def shutdown(self):
-        print("----SHUTTING DOWN TRACE PROCESSOR----")
-
-        for trace in self.traces:
-            print(f"{trace.export()}")
-        print("Collected Spans: ")
-        for span in self.spans:
-            print(f"{span.export()}")
-
-
-
-
-local_processor = LocalTraceProcessor()
-set_trace_processors([local_processor])
-
-
-# Check if the API key is present; if not, raise an error
-if not gemini_api_key:
-    raise ValueError("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")   
-
-#Reference: https://ai.google.dev/gemini-api/docs/openai
-external_client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
-
-config = RunConfig(
-    model=model,
-    model_provider=external_client,
-    tracing_disabled=True
-)
+# Tracing stays on here so the run's agent and generation spans reach the processor
+model = get_model()
+config = get_run_config(tracing_disabled=False)
 
 
 async def main():
@@ -86,6 +35,12 @@ async def main():
         result = await Runner.run(agent, "Hello how are you?", run_config=config)
         print(f"Final Output: {result.final_output}")
 
+    # Blocks until everything queued so far is written
+    batch_processor.force_flush()
+    print(f"Trace export stats: {batch_processor.stats}")
+    print(profiler.report())
+    print(profiler.collapsed_stacks())
+
     # result = await Runner.run(agent, "Hello how are you?", run_config=config)
     # print(result.final_output)
 
@@ -0,0 +1,110 @@
+"""Per-string translation vs. ``BatchTranslator``, against the mock model.
+
+The per-string baseline runs each translation agent once per string and language,
+which already understates the orchestrator (it adds planning turns on top). The mock
+drops ``--drop-rate`` of the items from each batch reply and returns broken JSON for
+``--malformed-rate`` of the replies, so the retry path is exercised.
+
+    uv run python benchmarks/bench_batch_translate.py --strings 1000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+
+from agents import Agent, Runner
+from agents.run import RunConfig
+
+from shared import provider
+from shared.batch_translate import BatchTranslator
+from shared.mock_server import MockOpenAIServer
+
+LANGUAGES = ["Spanish", "Italian", "French"]
+
+
+def make_responder(drop_rate: float, malformed_rate: float, seed: int):
+    rng = random.Random(seed)
+
+    def responder(body):
+        instructions, text = body["messages"][0]["content"], body["messages"][-1]["content"]
+        language = instructions.split("English to ", 1)[1].split(".", 1)[0]
+        if "JSON array" not in instructions:
+            return f"[{language}] {text}"
+        if rng.random() < malformed_rate:
+            return "Sure! Here are your translations: [{"
+        items = [
+            {"id": item["id"], "translation": f"[{language}] {item['text']}"}
+            for item in json.loads(text)
+            if rng.random() >= drop_rate
+        ]
+        return json.dumps(items)
+
+    return responder
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--strings", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated model latency (s)")
+    parser.add_argument("--drop-rate", type=float, default=0.01)
+    parser.add_argument("--malformed-rate", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    texts = (f"Sentence number {i} to translate." for i in range(args.strings))
+    responder = make_responder(args.drop_rate, args.malformed_rate, seed=0)
+
+    async with MockOpenAIServer(responder, latency=args.latency) as server:
+        provider.configure(base_url=server.base_url, api_key="mock", model="mock-model")
+        config = RunConfig(tracing_disabled=True)
+        agents = {
+            language: Agent(
+                name=f"{language} Agent",
+                instructions=f"You are a helpful assistant that can translate English to {language}.",
+                model=provider.get_model(),
+            )
+            for language in LANGUAGES
+        }
+
+        # Per-string baseline with the same concurrency
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(text: str, agent: Agent) -> None:
+            async with semaphore:
+                await Runner.run(agent, text, run_config=config)
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(one(f"Sentence number {i} to translate.", agent) for i in range(args.strings) for agent in agents.values())
+        )
+        baseline_seconds, baseline_calls = time.perf_counter() - start, server.stats.requests
+
+        translator = BatchTranslator(
+            agents,
+            batch_size=args.batch_size,
+            max_concurrency=max(1, args.concurrency // len(LANGUAGES)),
+            run_config=config,
+        )
+        tracemalloc.start()
+        start = time.perf_counter()
+        complete = 0
+        async for result in translator.translate(texts):
+            complete += len(result.translations) == len(LANGUAGES)
+        batch_seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{'mode':<12}{'model calls':>12}{'seconds':>10}{'strings/s':>11}")
+        print(f"{'per-string':<12}{baseline_calls:>12}{baseline_seconds:>10.2f}{args.strings / baseline_seconds:>11.0f}")
+        print(f"{'batched':<12}{translator.stats.model_calls:>12}{batch_seconds:>10.2f}{args.strings / batch_seconds:>11.0f}")
+        print(f"\ncomplete: {complete}/{args.strings}, stats: {translator.stats}")
+        print(f"batched peak traced memory: {peak / 1024:.0f} KiB")
+        await provider.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,168 @@
+"""Memory per session and per run for three run-context representations.
+
+``--sessions`` sessions are spread over ``--tenants`` tenants. Each tenant has a profile
+of ``--profile-fields`` entries, ``--flags`` feature flags and ``--lookup-rows`` cached
+lookup rows. The contexts compared:
+
+- ``dataclass, copied``: a plain dataclass per session holding its own copy of the
+  tenant's data, as when every session loads it.
+- ``dataclass, shared``: a plain dataclass that references one copy per tenant.
+- ``slots + TenantStore``: a frozen, slotted dataclass referencing the tenant's
+  ``TenantState`` from a ``TenantStore``.
+
+The first table is traced memory with every session alive. The second gives each session
+an isolated context for one run that changes one field: ``copy.deepcopy`` for the plain
+dataclasses, ``ContextOverlay`` plus ``commit()`` for the slotted one. It reports the memory
+of all runs in flight at once and the CPU per run. The third runs ``--runs`` agent runs
+concurrently against the mock with a tool that reads the context, and reports peak traced
+memory per run.
+
+    uv run python benchmarks/bench_context.py --sessions 10000 --tenants 50
+"""
+
+import argparse
+import asyncio
+import copy
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any
+
+from agents import Agent, RunContextWrapper, Runner, function_tool, set_tracing_disabled
+
+from shared import provider
+from shared.context import ContextOverlay, TenantState, TenantStore
+from shared.mock_server import MockOpenAIServer, Script, ScriptedResponder
+
+CITIES = ["Islamabad", "Lahore", "Karachi", "Quetta", "Peshawar", "Multan"]
+
+
+@dataclass
+class CopiedContext:
+    city: str
+    tenant_id: str
+    profile: dict[str, Any]
+    flags: set[str]
+    lookups: dict[str, Any]
+
+
+@dataclass
+class SharedContext:
+    city: str
+    tenant: dict[str, Any]
+
+
+@dataclass(frozen=True, slots=True)
+class SlottedContext:
+    city: str
+    tenant: TenantState
+
+
+@function_tool
+def get_weather(ctx: RunContextWrapper[Any]) -> str:
+    """returns the weather of the user's city. requires no parameters"""
+    return f"The weather of {ctx.context.city} is sunny"
+
+
+def tenant_data(tenant_id: str, args: argparse.Namespace) -> dict[str, Any]:
+    return {
+        "profile": {f"field_{i}": f"{tenant_id} value {i}" for i in range(args.profile_fields)},
+        "flags": {f"feature_{i}" for i in range(args.flags)},
+        "lookups": {f"row_{i}": (f"{tenant_id}-{i}", i, i * 0.5) for i in range(args.lookup_rows)},
+    }
+
+
+def build(kind: str, args: argparse.Namespace) -> list[Any]:
+    tenant_ids = [f"tenant-{i}" for i in range(args.tenants)]
+    data = {tenant_id: tenant_data(tenant_id, args) for tenant_id in tenant_ids}
+    store = TenantStore(lambda tenant_id: TenantState(tenant_id, **data[tenant_id]))
+    sessions = []
+    for i in range(args.sessions):
+        tenant_id = tenant_ids[i % args.tenants]
+        city = CITIES[i % len(CITIES)]
+        if kind == "dataclass, copied":
+            sessions.append(CopiedContext(city, tenant_id, **copy.deepcopy(data[tenant_id])))
+        elif kind == "dataclass, shared":
+            sessions.append(SharedContext(city, data[tenant_id]))
+        else:
+            sessions.append(SlottedContext(city, store.get(tenant_id)))
+    return sessions
+
+
+def traced(func) -> tuple[Any, int]:
+    """``func()`` and the traced bytes it left allocated."""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    value = func()
+    gc.collect()
+    return value, tracemalloc.get_traced_memory()[0] - before
+
+
+def isolate(kind: str, session: Any) -> Any:
+    """A context for one run that changes the city."""
+    if kind == "slots + TenantStore":
+        overlay = ContextOverlay(session)
+        overlay.city = "Murree"
+        return overlay
+    run_context = copy.deepcopy(session)
+    run_context.city = "Murree"
+    return run_context
+
+
+async def run_agents(kind: str, args: argparse.Namespace) -> int:
+    """Peak traced bytes of ``--runs`` concurrent runs, their sessions and run contexts included."""
+    agent = Agent(name="Assistant", instructions="give weather information", tools=[get_weather], model=provider.get_model())
+    gc.collect()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = build(kind, argparse.Namespace(**{**vars(args), "sessions": args.runs}))
+    contexts = [isolate(kind, session) for session in sessions]
+    await asyncio.gather(*(Runner.run(agent, "what is the weather in my city?", context=context) for context in contexts))
+    return tracemalloc.get_traced_memory()[1] - before
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--tenants", type=int, default=50)
+    parser.add_argument("--profile-fields", type=int, default=50)
+    parser.add_argument("--flags", type=int, default=100)
+    parser.add_argument("--lookup-rows", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=500, help="concurrent agent runs for the last table")
+    args = parser.parse_args()
+
+    set_tracing_disabled(True)
+    kinds = ["dataclass, copied", "dataclass, shared", "slots + TenantStore"]
+    print(f"{args.sessions} sessions over {args.tenants} tenants")
+    print(f"{'context':<22}{'KB/session':>12}{'total MB':>10}{'run KB':>10}{'runs MB':>10}{'us/run':>9}")
+    tracemalloc.start()
+    for kind in kinds:
+        sessions, session_bytes = traced(lambda: build(kind, args))
+        start = time.process_time()
+        runs, run_bytes = traced(lambda: [isolate(kind, session) for session in sessions])
+        per_run = (time.process_time() - start) / len(sessions)
+        if kind == "slots + TenantStore":
+            committed = [run.commit() for run in runs]
+            assert all(session.city == "Murree" and session.tenant is run.tenant for session, run in zip(committed, runs))
+        print(
+            f"{kind:<22}{session_bytes / len(sessions) / 1024:>12.2f}{session_bytes / 2**20:>10.1f}"
+            f"{run_bytes / len(runs) / 1024:>10.2f}{run_bytes / 2**20:>10.1f}{per_run * 1e6:>9.1f}"
+        )
+        del sessions, runs
+
+    print()
+    print(f"{args.runs} concurrent agent runs")
+    print(f"{'context':<22}{'peak KB/run':>12}")
+    responder = ScriptedResponder(Script(tool_calls={"get_weather": "{}"}, reply="It is sunny."))
+    async with MockOpenAIServer(responder) as server:
+        provider.configure(base_url=server.base_url, api_key="mock", model="mock-model", max_in_flight=args.runs)
+        for kind in kinds:
+            peak = await run_agents(kind, args)
+            print(f"{kind:<22}{peak / args.runs / 1024:>12.1f}")
+        await provider.aclose()
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
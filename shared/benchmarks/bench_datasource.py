@@ -0,0 +1,125 @@
+"""Linear scan vs. ``DataSource`` lookups for the ``get_user_info`` / ``get_weather`` tools.
+
+For each size, builds the original list-of-dicts and an indexed ``DataSource`` (exact
+``user_name``, case-insensitive ``city`` with a prefix index), then times lookups and
+reports the traced memory of each representation. Also times a hot reload from CSV
+and SQLite.
+
+    uv run python benchmarks/bench_datasource.py --sizes 1000 100000 1000000
+"""
+
+import argparse
+import csv
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from shared.datasource import DataSource, Index
+
+INDEXES = [Index("user_name"), Index("city", case_insensitive=True, prefix=True)]
+
+
+def make_records(n: int) -> list[dict]:
+    return [
+        {
+            "user_name": f"user{i:07d}",
+            "name": f"User {i}",
+            "age": 18 + i % 50,
+            "email": f"user{i}@example.com",
+            "city": f"City{i:07d}",
+            "temperature": 20 + i % 15,
+        }
+        for i in range(n)
+    ]
+
+
+def linear_user(records: list[dict], user_name: str) -> dict | None:
+    for record in records:
+        if record["user_name"] == user_name:
+            return record
+    return None
+
+
+def linear_city(records: list[dict], city: str) -> dict | None:
+    city = city.casefold()
+    for record in records:
+        if record["city"].casefold() == city:
+            return record
+    return None
+
+
+def traced(build):
+    tracemalloc.start()
+    value = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+
+def time_lookups(lookup, keys: list[str]) -> float:
+    """Median microseconds per lookup."""
+    samples = []
+    for key in keys:
+        start = time.perf_counter()
+        lookup(key)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--linear-lookups", type=int, default=20, help="linear scans per size (they are slow)")
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    print(
+        f"{'records':>9}{'scan user':>12}{'index user':>12}{'scan city':>12}{'index city':>12}"
+        f"{'prefix':>10}{'list MiB':>10}{'source MiB':>11}{'csv reload':>12}{'sqlite reload':>15}"
+    )
+    for n in args.sizes:
+        records, list_bytes = traced(lambda: make_records(n))
+        source, source_bytes = traced(lambda: DataSource.from_records(records, INDEXES))
+        users = [f"user{rng.randrange(n):07d}" for _ in range(args.lookups)]
+        cities = [f"city{rng.randrange(n):07d}" for _ in range(args.lookups)]
+
+        scan_user = time_lookups(lambda k: linear_user(records, k), users[: args.linear_lookups])
+        scan_city = time_lookups(lambda k: linear_city(records, k), cities[: args.linear_lookups])
+        index_user = time_lookups(lambda k: source.get("user_name", k), users)
+        index_city = time_lookups(lambda k: source.get("city", k), cities)
+        prefix = time_lookups(lambda k: source.find_prefix("city", k[:-2]), cities)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path, db_path = os.path.join(tmp, "users.csv"), os.path.join(tmp, "users.db")
+            with open(csv_path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(records[0]))
+                writer.writeheader()
+                writer.writerows(records)
+            db = sqlite3.connect(db_path)
+            db.execute("CREATE TABLE users (user_name, name, age, email, city, temperature)")
+            db.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?, ?)", (tuple(r.values()) for r in records))
+            db.commit()
+            db.close()
+
+            reloads = []
+            for path, table in ((csv_path, None), (db_path, "users")):
+                file_source = DataSource.from_file(path, INDEXES, table=table)
+                start = time.perf_counter()
+                file_source.reload()
+                reloads.append(time.perf_counter() - start)
+
+        print(
+            f"{n:>9}{scan_user:>10.1f}us{index_user:>10.2f}us{scan_city:>10.1f}us{index_city:>10.2f}us"
+            f"{prefix:>8.2f}us{list_bytes / 2**20:>10.1f}{source_bytes / 2**20:>11.1f}"
+            f"{reloads[0]:>11.2f}s{reloads[1]:>14.2f}s"
+        )
+        del records, source
+
+
+if __name__ == "__main__":
+    main()
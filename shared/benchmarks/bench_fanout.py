@@ -0,0 +1,105 @@
+"""Wall-clock time of an N-language translation request, sequential vs. fan-out.
+
+The mock model plays the orchestrator. In "sequential" mode it calls one translation
+tool per turn, as the original 04_tools instructions asked for. In "parallel" mode it
+emits every call in one turn (``FanOut.as_tool``), and in "fan_out_tool" mode it makes
+one call to a single fan-out tool. Every model call takes ``--latency`` seconds.
+
+    uv run python benchmarks/bench_fanout.py
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from agents import Agent, ModelSettings, Runner
+from agents.run import RunConfig
+
+from shared import provider
+from shared.fanout import FanOut
+from shared.mock_server import MockOpenAIServer, MockReply, MockToolCall
+
+LANGUAGES = ["Spanish", "Italian", "French", "German", "Portuguese", "Dutch", "Turkish", "Urdu"]
+
+
+def make_responder(state: dict):
+    def responder(body):
+        if not body.get("tools"):
+            # A translation sub-agent
+            language = body["messages"][0]["content"].rsplit(" ", 1)[-1].rstrip(".")
+            return f"[{language}] Hola, ¿cómo estás?"
+
+        done = sum(1 for message in body["messages"] if message["role"] == "tool")
+        languages = state["languages"]
+        if state["mode"] == "sequential":
+            if done < len(languages):
+                name = f"translate_to_{languages[done].lower()}"
+                return MockReply(tool_calls=[MockToolCall(name, json.dumps({"input": "Hello, how are you?"}))])
+        elif state["mode"] == "parallel":
+            if done == 0:
+                return MockReply(
+                    tool_calls=[
+                        MockToolCall(f"translate_to_{language.lower()}", json.dumps({"input": "Hello, how are you?"}))
+                        for language in languages
+                    ]
+                )
+        elif done == 0:
+            arguments = json.dumps({"input": "Hello, how are you?", "targets": languages})
+            return MockReply(tool_calls=[MockToolCall("translate", arguments)])
+        return "Here are your translations."
+
+    return responder
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated model latency (s)")
+    args = parser.parse_args()
+
+    state: dict = {}
+    async with MockOpenAIServer(make_responder(state), latency=args.latency) as server:
+        provider.configure(base_url=server.base_url, api_key="mock", model="mock-model")
+        model = provider.get_model()
+        config = RunConfig(tracing_disabled=True)
+        agents = {
+            language: Agent(
+                name=f"{language} Agent",
+                instructions=f"You are a helpful assistant that can translate English to {language}.",
+                model=model,
+            )
+            for language in LANGUAGES
+        }
+        fan_out = FanOut(max_concurrency=8, timeout=30, run_config=config)
+        tools = {
+            "sequential": [agent.as_tool(f"translate_to_{name.lower()}", f"Translate to {name}.") for name, agent in agents.items()],
+            "parallel": [
+                fan_out.as_tool(agent, f"translate_to_{name.lower()}", f"Translate to {name}.")
+                for name, agent in agents.items()
+            ],
+            "fan_out_tool": [fan_out.fan_out_tool(agents, "translate", "Translate into several languages at once.")],
+        }
+
+        print(f"{'languages':>10}" + "".join(f"{mode:>16}" for mode in tools))
+        for count in (1, 2, 4, 8):
+            row = f"{count:>10}"
+            for mode, mode_tools in tools.items():
+                state.update(mode=mode, languages=LANGUAGES[:count])
+                orchestrator = Agent(
+                    name="Orchestrator Agent",
+                    instructions="You are a translation orchestrator.",
+                    model=model,
+                    model_settings=ModelSettings(parallel_tool_calls=mode != "sequential"),
+                    tools=mode_tools,
+                )
+                start = time.perf_counter()
+                await Runner.run(orchestrator, "Translate 'Hello, how are you?'", run_config=config)
+                row += f"{time.perf_counter() - start:>15.2f}s"
+            print(row)
+
+        print(f"\nfan-out stats: {fan_out.stats}")
+        await provider.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,339 @@
+"""Throughput, latency, time to first token and memory of every example flow, offline.
+
+Each flow is the example's own module (its agents, tools, guardrails, router and run
+config), imported after the shared provider points at the local mock server, so no API
+key is needed. A ``ScriptedResponder`` plays the model's part: it calls the flow's tools
+or handoff on the first turn, fills structured outputs and then answers. ``--profile``
+picks the simulated latency and token rate; the default ``instant`` leaves only our own
+overhead, which is what regressions show up in.
+
+Results can be written as JSON (``--output``) and compared with an earlier file
+(``--baseline``); the script exits with status 1 if a flow got slower, lost throughput or
+used more memory than ``--tolerance`` allows.
+
+    uv run python benchmarks/bench_flows.py --runs 200 --output flows.json
+    uv run python benchmarks/bench_flows.py --runs 200 --baseline flows.json
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from importlib.metadata import version
+from pathlib import Path
+from types import ModuleType
+
+from agents import Agent, Runner
+from openai.types.responses import ResponseTextDeltaEvent
+
+from shared import provider
+from shared.context import ContextOverlay
+from shared.mock_server import PROFILES, MockOpenAIServer, Script, ScriptedResponder
+
+ROOT = Path(__file__).resolve().parents[2]
+
+URDU_REPLY = " ".join(["اردو پاکستان کی قومی زبان ہے اور یہ بہت خوبصورت زبان ہے۔"] * 4)
+ENGLISH_REPLY = " ".join(["Islamabad is the capital of Pakistan, planned in the 1960s."] * 4)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def load_example(relative_path: str) -> ModuleType:
+    """Import an example file under a unique name (two of them are called ``main.py``),
+    with its folder on ``sys.path`` for the sibling imports some of them do."""
+    path = ROOT / relative_path
+    if str(path.parent) not in sys.path:
+        sys.path.insert(0, str(path.parent))
+    name = "flow_" + relative_path.replace("/", "_").removesuffix(".py")
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+async def first_token(result) -> float | None:
+    """Drain a streamed run; returns seconds from now to the first text delta."""
+    start = time.perf_counter()
+    ttft = None
+    async for event in result.stream_events():
+        if ttft is None and event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+            ttft = time.perf_counter() - start
+    return ttft
+
+
+# Each run function mirrors the example's main() without the printing and returns the
+# time to first token for streamed flows
+async def run_hello_agent(m: ModuleType) -> float | None:
+    agent = Agent(
+        name="Assistant",
+        instructions="You are a helpful assistant that greets users when they say hello.",
+        model=m.model,
+    )
+    await Runner.run(agent, "Hello how are you?", run_config=m.config)
+    return None
+
+
+async def run_streaming(m: ModuleType) -> float | None:
+    agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=m.model)
+    return await first_token(Runner.run_streamed(agent, input="Explain the capital of Pakistan in three lines."))
+
+
+async def run_tools(m: ModuleType) -> float | None:
+    agent = Agent(
+        name="Assistant",
+        instructions="You are a helpful assistant that can use tools to get information.",
+        tools=[m.get_user_info, m.get_weather],
+        model=provider.get_model(),
+    )
+    return await first_token(Runner.run_streamed(agent, "Tell me about jimbeam789?"))
+
+
+async def run_agent_as_tool(m: ModuleType) -> float | None:
+    result = Runner.run_streamed(m.orchestrator_agent, "Translate 'Hello, how are you?' to Spanish and frensh")
+    return await first_token(result)
+
+
+async def run_handoffs(m: ModuleType) -> float | None:
+    agent = Agent(
+        name="Assistant",
+        instructions="You are a helpful assistant that greets users when they say hello. You can also handoff to the Urdu Agent or the Arabic Agent to answer questions in Urdu or Arabic.",
+        model=m.router,
+        handoffs=[m.urdu_agent, m.arabic_agent],
+    )
+    await Runner.run(agent, "Salam. kya hal hy?", run_config=m.config)
+    return None
+
+
+async def run_context(m: ModuleType) -> float | None:
+    agent = Agent(
+        name="Assistant",
+        instructions="you are a helpful assistant that give weather information to a user. you have a tool to get the weather information.",
+        tools=[m.get_weather],
+    )
+    context = ContextOverlay(m.CityInfo(city="Karachi", tenant=m.tenants.get("default")))
+    await Runner.run(agent, "what is the weather in my city?", run_config=m.config, context=context)
+    return None
+
+
+async def run_input_guardrails(m: ModuleType) -> float | None:
+    agent = Agent(
+        name="Assistant",
+        instructions="You are a helpful assistant.",
+        input_guardrails=[m.weather_guardrail],
+        tools=[m.get_weather],
+    )
+    await Runner.run(agent, "how is the weather in islamabad?", run_config=m.config)
+    return None
+
+
+async def run_output_guardrails(m: ModuleType) -> float | None:
+    agent = Agent(name="Assistant", instructions="You are a helpful assistant.", output_guardrails=[m.output_guardrail])
+    await Runner.run(agent, "tell me about urdu language in urdu?", run_config=m.config)
+    return None
+
+
+async def run_streaming_guardrails(m: ModuleType) -> float | None:
+    agent = Agent(name="Assistant", instructions="You are a helpful assistant.", model=m.model)
+    result = Runner.run_streamed(agent, input="tell me about urdu language in 20 lines.", run_config=m.config)
+    start = time.perf_counter()
+    ttft = None
+    async for event in m.streaming_guardrail.stream(result):
+        if ttft is None and event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+            ttft = time.perf_counter() - start
+    return ttft
+
+
+@dataclass
+class Flow:
+    name: str
+    path: str
+    script: Script
+    run: Callable[[ModuleType], Awaitable[float | None]]
+
+
+FLOWS = [
+    Flow("hello_agent", "01_hello_agent/main.py", Script(reply="Hello! I am doing well, thank you."), run_hello_agent),
+    Flow("streaming", "03_streaming/streaming_text.py", Script(reply=ENGLISH_REPLY), run_streaming),
+    Flow(
+        "tools",
+        "04_tools/python_function_as_tool.py",
+        Script(tool_calls={"get_user_info": '{"user_name": "jimbeam789"}'}, reply="Jim Beam is 22 years old."),
+        run_tools,
+    ),
+    Flow(
+        "agent_as_tool",
+        "04_tools/agent_as_tool.py",
+        Script(
+            tool_calls={
+                "translate_to_spanish": '{"input": "Hello, how are you?"}',
+                "translate_to_french": '{"input": "Hello, how are you?"}',
+            },
+            reply="- Spanish: Hola, ¿cómo estás?\n- French: Bonjour, comment ça va ?",
+        ),
+        run_agent_as_tool,
+    ),
+    Flow("handoffs", "05_handoffs/handoffs.py", Script(handoff="transfer_to_urdu_agent", reply=URDU_REPLY), run_handoffs),
+    Flow(
+        "context",
+        "06_context/main.py",
+        Script(tool_calls={"get_weather": "{}"}, reply="It is 30.5 degrees and rainy in Karachi."),
+        run_context,
+    ),
+    Flow(
+        "input_guardrails",
+        "07_guardrails/input_guardrails.py",
+        Script(tool_calls={"get_weather": '{"city": "islamabad"}'}, reply="It is sunny in Islamabad."),
+        run_input_guardrails,
+    ),
+    Flow("output_guardrails", "07_guardrails/output_guardrails.py", Script(reply=URDU_REPLY), run_output_guardrails),
+    Flow(
+        "streaming_guardrails",
+        "07_guardrails/streaming_output_guardrails.py",
+        Script(reply=URDU_REPLY),
+        run_streaming_guardrails,
+    ),
+]
+
+
+async def drive(flow: Flow, module: ModuleType, runs: int, concurrency: int) -> tuple[list[float], list[float], float]:
+    """Runs the flow ``runs`` times, ``concurrency`` at a time. Returns latencies, times to
+    first token and wall-clock seconds."""
+    latencies: list[float] = []
+    ttfts: list[float] = []
+    remaining = iter(range(runs))
+
+    async def worker() -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            ttft = await flow.run(module)
+            latencies.append(time.perf_counter() - start)
+            if ttft is not None:
+                ttfts.append(ttft)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, ttfts, time.perf_counter() - start
+
+
+async def bench_flow(flow: Flow, server: MockOpenAIServer, args: argparse.Namespace) -> dict:
+    server.responder = ScriptedResponder(flow.script)
+    module = load_example(flow.path)
+    # Some examples turn on verbose SDK logging, which would dominate the timings
+    logging.getLogger("openai.agents").setLevel(logging.WARNING)
+
+    await drive(flow, module, args.warmup, min(args.warmup, args.concurrency) or 1)
+    requests_before = server.stats.requests
+    latencies, ttfts, elapsed = await drive(flow, module, args.runs, args.concurrency)
+    model_calls = server.stats.requests - requests_before
+
+    # Separate pass: tracemalloc slows allocation-heavy code down too much to time it
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    await drive(flow, module, args.memory_runs, args.concurrency)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "runs": args.runs,
+        "throughput": args.runs / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "ttft_p50_ms": percentile(ttfts, 50) * 1000 if ttfts else None,
+        "ttft_p95_ms": percentile(ttfts, 95) * 1000 if ttfts else None,
+        "model_calls_per_run": model_calls / args.runs,
+        "peak_kb_per_run": (peak - baseline) / 1024 / min(args.concurrency, args.memory_runs),
+    }
+
+
+# metric -> True if higher is better
+COMPARED = {"throughput": True, "p50_ms": False, "p95_ms": False, "ttft_p50_ms": False, "peak_kb_per_run": False}
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    found = []
+    for name, current in results["flows"].items():
+        before = baseline.get("flows", {}).get(name)
+        if before is None:
+            continue
+        for metric, higher_is_better in COMPARED.items():
+            old, new = before.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                found.append(f"{name}: {metric} {old:.1f} -> {new:.1f} ({change:+.0%})")
+    return found
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--flows", nargs="+", choices=[flow.name for flow in FLOWS], help="default: all")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="instant")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--memory-runs", type=int, default=20)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="earlier --output file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative change before failing")
+    args = parser.parse_args()
+
+    flows = [flow for flow in FLOWS if not args.flows or flow.name in args.flows]
+    results = {
+        "profile": args.profile,
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+        "openai-agents": version("openai-agents"),
+        "flows": {},
+    }
+
+    async with MockOpenAIServer.from_profile(profile=args.profile) as server:
+        # Before any example is imported, so their module-level get_model() calls succeed
+        provider.configure(base_url=server.base_url, api_key="mock", model="mock-model")
+        for flow in flows:
+            results["flows"][flow.name] = await bench_flow(flow, server, args)
+        await provider.aclose()
+
+    print(
+        f"{'flow':<22}{'runs/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        f"{'ttft ms':>9}{'calls':>7}{'KB/run':>9}"
+    )
+    for name, flow in results["flows"].items():
+        ttft = f"{flow['ttft_p50_ms']:.1f}" if flow["ttft_p50_ms"] is not None else "-"
+        print(
+            f"{name:<22}{flow['throughput']:>9.1f}{flow['p50_ms']:>9.1f}{flow['p95_ms']:>9.1f}"
+            f"{flow['p99_ms']:>9.1f}{ttft:>9}{flow['model_calls_per_run']:>7.1f}{flow['peak_kb_per_run']:>9.1f}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        print()
+        for key in ("profile", "concurrency"):
+            if baseline.get(key) != results[key]:
+                print(f"Note: baseline {key} was {baseline.get(key)!r}, now {results[key]!r}")
+        found = regressions(results, baseline, args.tolerance)
+        print("\n".join(found) if found else f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
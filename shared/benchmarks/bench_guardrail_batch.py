@@ -0,0 +1,139 @@
+"""Model calls, latency and throughput of the weather guardrail with and without batching.
+
+Sends ``--calls`` guardrail checks, ``--concurrency`` at a time, through the LLM weather
+guardrail from 07_guardrails (no prefilter or cache), first one request per check and then
+through ``GuardrailBatcher`` for each ``--max-wait`` and ``--max-batch``. The mock model
+takes ``--latency`` seconds plus ``--token-delay`` per output token, so a batch reply
+costs more than a single one, but far less than one request per input. ``--corrupt-rate``
+makes that share of batch replies unparseable to exercise the single-item fallback.
+``--tenants`` spreads the checks over that many tenants, batched only within a tenant.
+
+    uv run python benchmarks/bench_guardrail_batch.py --calls 500 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+from agents import RunContextWrapper, set_tracing_disabled
+
+from shared import provider
+from shared.guardrail_batch import GuardrailBatcher
+from shared.mock_server import MockOpenAIServer
+from shared.profiler import LatencyHistogram
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "07_guardrails"))
+
+INPUTS = [
+    "how is the weather in {}?",
+    "will it rain in {} tomorrow",
+    "tell me a joke about {}",
+    "what is the population of {}",
+    "temperature in {} right now",
+]
+CITIES = ["Islamabad", "Lahore", "Karachi", "Quetta", "Peshawar", "Multan", "Murree", "Hunza"]
+BATCH_ITEM = re.compile(r"<input_(\w+)>\n(.*?)\n</input_\1>", re.S)
+
+
+def make_responder(corrupt_rate: float, rng: random.Random):
+    def verdict(text: str) -> dict:
+        return {"is_weather_query": any(word in text for word in ("weather", "rain", "temperature")), "reasoning": "ok"}
+
+    def responder(body: dict) -> str:
+        text = body["messages"][-1]["content"]
+        items = BATCH_ITEM.findall(text)
+        if not items:
+            return json.dumps(verdict(text))
+        if rng.random() < corrupt_rate:
+            return '{"verdicts": [{"id": "0", "is_weather'
+        return json.dumps({"verdicts": [{"id": id, **verdict(input)} for id, input in items]})
+
+    return responder
+
+
+async def run_checks(
+    guardrail_function, texts: list[str], concurrency: int, tenants: int
+) -> tuple[LatencyHistogram, float]:
+    latency = LatencyHistogram()
+    semaphore = asyncio.Semaphore(concurrency)
+    contexts = [RunContextWrapper(context=tenant) for tenant in range(tenants)]
+
+    async def one(index: int, text: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await guardrail_function(contexts[index % tenants], None, text)
+            latency.record(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index, text) for index, text in enumerate(texts)))
+    return latency, time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated model latency (s)")
+    parser.add_argument("--token-delay", type=float, default=0.0005, help="simulated time per output token (s)")
+    parser.add_argument("--max-wait", type=float, nargs="+", default=[0.005, 0.02, 0.05])
+    parser.add_argument("--max-batch", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--corrupt-rate", type=float, default=0.0, help="share of batch replies that fail to parse")
+    parser.add_argument("--tenants", type=int, default=1, help="tenants whose checks never share a batch")
+    args = parser.parse_args()
+
+    set_tracing_disabled(True)
+    # Failed batches are counted in the table
+    logging.getLogger("shared.guardrail_batch").setLevel(logging.ERROR)
+    logging.getLogger("openai.agents").setLevel(logging.CRITICAL)
+    rng = random.Random(0)
+    texts = [rng.choice(INPUTS).format(rng.choice(CITIES)) for _ in range(args.calls)]
+    responder = make_responder(args.corrupt_rate, rng)
+    async with MockOpenAIServer(responder, latency=args.latency, token_delay=args.token_delay) as server:
+        provider.configure(base_url=server.base_url, api_key="mock", max_in_flight=1024)
+        import input_guardrails
+
+        single = inspect.unwrap(input_guardrails.weather_guardrail.guardrail_function)
+        print(
+            f"{args.calls} checks, {args.concurrency} concurrent, {args.tenants} tenants, "
+            f"{args.latency * 1000:.0f}ms model latency"
+        )
+        print(
+            f"{'mode':<26}{'model calls':>12}{'mean batch':>12}{'fallbacks':>11}"
+            f"{'p50 ms':>9}{'p99 ms':>9}{'checks/s':>10}"
+        )
+        requests = server.stats.requests
+        latency, elapsed = await run_checks(single, texts, args.concurrency, args.tenants)
+        print(
+            f"{'one call per check':<26}{server.stats.requests - requests:>12}{1.0:>12.1f}{0:>11}"
+            f"{latency.percentile(50) * 1000:>9.0f}{latency.percentile(99) * 1000:>9.0f}{args.calls / elapsed:>10.0f}"
+        )
+        for max_batch in args.max_batch:
+            for max_wait in args.max_wait:
+                batcher = GuardrailBatcher(
+                    input_guardrails.guardrail_agent,
+                    lambda verdict: not verdict.is_weather_query,
+                    max_batch=max_batch,
+                    max_wait=max_wait,
+                    run_config=input_guardrails.config,
+                    batch_key=lambda ctx: ctx.context,
+                )
+                requests = server.stats.requests
+                latency, elapsed = await run_checks(batcher.batched(single), texts, args.concurrency, args.tenants)
+                name = f"batch {max_batch}, wait {max_wait * 1000:g}ms"
+                print(
+                    f"{name:<26}{server.stats.requests - requests:>12}{batcher.stats.mean_batch_size:>12.1f}"
+                    f"{batcher.stats.fallbacks:>11}{latency.percentile(50) * 1000:>9.0f}"
+                    f"{latency.percentile(99) * 1000:>9.0f}{args.calls / elapsed:>10.0f}"
+                )
+        await provider.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
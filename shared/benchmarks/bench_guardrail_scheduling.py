@@ -0,0 +1,170 @@
+"""End-to-end latency and wasted work under each input guardrail scheduling policy.
+
+The main agent calls a ``get_weather`` tool and then answers, which takes two model calls.
+The input guardrail is an LLM guardrail agent on a mock server of its own, so the two
+sides get separate latencies. Every policy runs ``--runs`` inputs that pass the guardrail
+and ``--runs`` that trip it. For passing inputs the table shows the latency. For tripping
+inputs it shows the time to the tripwire and what the main agent spent on the rejected
+input: model calls, tokens and tool executions. The first row is the SDK's own
+scheduling. A cancelled non-streamed call still counts, since a provider would still
+bill it.
+
+    uv run python benchmarks/bench_guardrail_scheduling.py --guardrail-latency 0.3 --deadline 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from agents import (
+    Agent,
+    GuardrailFunctionOutput,
+    InputGuardrailTripwireTriggered,
+    OpenAIChatCompletionsModel,
+    Runner,
+    function_tool,
+    input_guardrail,
+    set_tracing_disabled,
+)
+from openai import AsyncOpenAI
+from pydantic import BaseModel
+
+from shared import provider
+from shared.guardrail_scheduling import GuardrailScheduler
+from shared.mock_server import MockOpenAIServer, Script, ScriptedResponder
+from shared.profiler import LatencyHistogram
+
+tool_runs = 0
+
+
+class WeatherInputGuardrail(BaseModel):
+    is_weather_query: bool
+    reasoning: str
+
+
+@function_tool
+def get_weather(city: str) -> str:
+    """returns the weather of a city"""
+    global tool_runs
+    tool_runs += 1
+    return f"The weather of {city} is sunny"
+
+
+def guardrail_responder(body: dict) -> str:
+    text = body["messages"][-1]["content"]
+    return json.dumps({"is_weather_query": "weather" in text, "reasoning": "scripted"})
+
+
+async def run_inputs(run, inputs: list[str], concurrency: int) -> tuple[LatencyHistogram, int]:
+    latency = LatencyHistogram()
+    trips = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(text: str) -> None:
+        nonlocal trips
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await run(text)
+            except InputGuardrailTripwireTriggered:
+                trips += 1
+            latency.record(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(text) for text in inputs))
+    return latency, trips
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20, help="passing and tripping inputs per policy")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--guardrail-latency", type=float, default=0.3, help="guardrail model latency (s)")
+    parser.add_argument("--model-latency", type=float, default=0.3, help="main model latency (s)")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="main model time per token (s)")
+    parser.add_argument("--deadline", type=float, default=0.2, help="guardrail deadline for the deadline policy (s)")
+    args = parser.parse_args()
+    global tool_runs
+
+    set_tracing_disabled(True)
+    reply = " ".join(["The weather in Islamabad is sunny with a light breeze."] * 10)
+    main_responder = ScriptedResponder(Script(tool_calls={"get_weather": '{"city": "Islamabad"}'}, reply=reply))
+    async with (
+        MockOpenAIServer(main_responder, latency=args.model_latency, token_delay=args.token_delay) as main_server,
+        MockOpenAIServer(guardrail_responder, latency=args.guardrail_latency) as guardrail_server,
+    ):
+        provider.configure(base_url=main_server.base_url, api_key="mock", model="mock-model")
+        guardrail_client = AsyncOpenAI(base_url=guardrail_server.base_url, api_key="mock")
+        guardrail_agent = Agent(
+            name="Guardrail Agent",
+            instructions="check if user is asking about weather or not",
+            output_type=WeatherInputGuardrail,
+            model=OpenAIChatCompletionsModel("mock-model", guardrail_client),
+        )
+
+        @input_guardrail
+        async def weather_guardrail(ctx, agent, input) -> GuardrailFunctionOutput:
+            result = await Runner.run(guardrail_agent, input, context=ctx.context)
+            return GuardrailFunctionOutput(
+                output_info=result.final_output,
+                tripwire_triggered=not result.final_output.is_weather_query,
+            )
+
+        agent = Agent(
+            name="Assistant",
+            instructions="You are a helpful assistant.",
+            input_guardrails=[weather_guardrail],
+            tools=[get_weather],
+            model=provider.get_model(),
+        )
+        policies = {
+            "sdk (gather)": None,
+            "blocking": GuardrailScheduler("blocking"),
+            "speculative": GuardrailScheduler("speculative"),
+            f"deadline {args.deadline:g}s, pass": GuardrailScheduler("deadline", args.deadline, "pass"),
+            f"deadline {args.deadline:g}s, trip": GuardrailScheduler("deadline", args.deadline, "trip"),
+        }
+        passing = [f"how is the weather in city {i}?" for i in range(args.runs)]
+        tripping = [f"tell me joke number {i}" for i in range(args.runs)]
+        # Long enough for a turn the SDK left running after a trip to finish
+        settle = 2 * args.model_latency + args.token_delay * len(reply.split()) + 0.5
+
+        print(f"guardrail {args.guardrail_latency * 1000:.0f}ms, main model {args.model_latency * 1000:.0f}ms per call")
+        print(
+            f"{'policy':<22}{'pass p50':>10}{'pass p99':>10}{'passed':>8}{'trip p50':>10}"
+            f"{'calls/trip':>12}{'tokens/trip':>13}{'tools/trip':>12}{'timeouts':>10}"
+        )
+        for name, scheduler in policies.items():
+            if scheduler is None:
+
+                async def run(text: str) -> None:
+                    await Runner.run(agent, text)
+            else:
+
+                async def run(text: str, scheduler: GuardrailScheduler = scheduler) -> None:
+                    await scheduler.run(agent, text)
+
+            pass_latency, false_trips = await run_inputs(run, passing, args.concurrency)
+
+            requests = main_server.stats.requests
+            tokens = main_server.stats.prompt_tokens + main_server.stats.completion_tokens
+            tools = tool_runs
+            trip_latency, _ = await run_inputs(run, tripping, args.concurrency)
+            await asyncio.sleep(settle)
+            wasted_calls = (main_server.stats.requests - requests) / args.runs
+            wasted_tokens = (main_server.stats.prompt_tokens + main_server.stats.completion_tokens - tokens) / args.runs
+            wasted_tools = (tool_runs - tools) / args.runs
+
+            timeouts = scheduler.stats.timeouts if scheduler is not None else 0
+            print(
+                f"{name:<22}{pass_latency.percentile(50) * 1000:>10.0f}{pass_latency.percentile(99) * 1000:>10.0f}"
+                f"{args.runs - false_trips:>8}{trip_latency.percentile(50) * 1000:>10.0f}"
+                f"{wasted_calls:>12.2f}{wasted_tokens:>13.1f}{wasted_tools:>12.2f}{timeouts:>10}"
+            )
+
+        await guardrail_client.close()
+        await provider.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
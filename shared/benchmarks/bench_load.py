@@ -0,0 +1,123 @@
+"""Many concurrent sessions through one example flow or agent, on one event loop.
+
+Drives either a flow from ``bench_flows.py`` (``--flow``) or any agent defined at module
+level in the examples (``--agent 04_tools/agent_as_tool.py:orchestrator_agent``) against
+the scripted mock server, at each of ``--levels``: concurrent sessions in closed-loop mode,
+target requests per second in open-loop mode. For every level it prints throughput,
+latency, event-loop lag, how often model calls waited for one of the ``--max-in-flight``
+slots, peak traced memory per session and errors, then the saturation point.
+
+    uv run python benchmarks/bench_load.py --flow tools --levels 1 8 32 128 512
+    uv run python benchmarks/bench_load.py --flow hello_agent --mode open --levels 50 100 200 400
+    uv run python benchmarks/bench_load.py --agent 04_tools/agent_as_tool.py:orchestrator_agent \\
+        --input "Translate 'good night' to French" --tool-call translate_to_french='{"input": "good night"}'
+"""
+
+import argparse
+import asyncio
+import logging
+
+from agents import Runner
+
+from bench_flows import FLOWS, load_example
+from shared import provider
+from shared.loadgen import format_results, saturation, sweep
+from shared.mock_server import PROFILES, MockOpenAIServer, Script, ScriptedResponder
+
+
+def agent_request(spec: str, text: str, streamed: bool, turns: int):
+    """A request function for ``path:attribute``. Each session keeps its conversation for
+    ``turns`` turns and then starts over."""
+    path, _, attribute = spec.partition(":")
+    module = load_example(path)
+    agent = getattr(module, attribute)
+    config = getattr(module, "config", None) or provider.get_run_config()
+    histories: dict[int, list] = {}
+
+    async def request(session: int) -> None:
+        history = histories.get(session, [])
+        turn_input = history + [{"role": "user", "content": text}]
+        if streamed:
+            result = Runner.run_streamed(agent, turn_input, run_config=config)
+            async for _ in result.stream_events():
+                pass
+        else:
+            result = await Runner.run(agent, turn_input, run_config=config)
+        history = result.to_input_list()
+        if len(history) >= 2 * turns:
+            histories.pop(session, None)
+        else:
+            histories[session] = history
+
+    return request
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--flow", choices=[flow.name for flow in FLOWS])
+    target.add_argument("--agent", help="example file and agent, e.g. 01_hello_agent/main.py:agent")
+    parser.add_argument("--input", default="Hello how are you?", help="user message for --agent")
+    parser.add_argument("--streamed", action="store_true", help="use Runner.run_streamed for --agent")
+    parser.add_argument("--turns", type=int, default=1, help="turns per conversation for --agent")
+    parser.add_argument("--tool-call", action="append", default=[], metavar="NAME=JSON", help="scripted tool call")
+    parser.add_argument("--handoff", help="scripted handoff tool, e.g. transfer_to_urdu_agent")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--levels", type=float, nargs="+", default=[1, 8, 32, 128, 512])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per level")
+    parser.add_argument("--think-time", type=float, default=0.0, help="closed loop: pause between requests")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast")
+    parser.add_argument("--max-in-flight", type=int, default=64)
+    parser.add_argument("--max-connections-per-host", type=int, default=50)
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced memory pass")
+    args = parser.parse_args()
+
+    async with MockOpenAIServer.from_profile(profile=args.profile) as server:
+        provider.configure(
+            base_url=server.base_url,
+            api_key="mock",
+            model="mock-model",
+            max_in_flight=args.max_in_flight,
+            max_connections_per_host=args.max_connections_per_host,
+        )
+        if args.flow:
+            flow = next(flow for flow in FLOWS if flow.name == args.flow)
+            server.responder = ScriptedResponder(flow.script)
+            module = load_example(flow.path)
+
+            async def request(session: int) -> None:
+                await flow.run(module)
+        else:
+            tool_calls = dict(call.split("=", 1) for call in args.tool_call)
+            server.responder = ScriptedResponder(Script(tool_calls=tool_calls, handoff=args.handoff))
+            request = agent_request(args.agent, args.input, args.streamed, args.turns)
+        logging.getLogger("openai.agents").setLevel(logging.WARNING)
+
+        # One untimed request so imports, schema building and the first connection are done
+        await request(0)
+        kwargs = {"think_time": args.think_time} if args.mode == "closed" else {}
+        results = await sweep(
+            request,
+            args.levels,
+            mode=args.mode,
+            duration=args.duration,
+            measure_memory=not args.no_memory,
+            **kwargs,
+        )
+        await provider.aclose()
+
+    print(f"{args.mode} loop, profile {args.profile}, {server.stats.connections} connections opened")
+    print(format_results(results))
+    knee = saturation(results)
+    unit = "sessions" if args.mode == "closed" else "requests/s"
+    if knee is None:
+        print(f"\nNo saturation up to {args.levels[-1]:g} {unit}")
+    else:
+        print(f"\nSaturates at about {knee.level:g} {unit} ({knee.throughput:.1f} runs/s)")
+    for result in results:
+        if result.last_error:
+            print(f"level {result.level:g}: {result.errors} errors, last: {result.last_error}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""Per-flow clients vs. the shared pooled client, against the local mock server.
+
+Traffic arrives in bursts, each burst hitting one randomly chosen flow. With one
+``AsyncOpenAI`` client per flow every pool has to open its own connections (paying the
+simulated handshake each time); the shared pool reuses connections opened for any flow.
+
+    uv run python benchmarks/bench_provider.py
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel, Runner
+from agents.run import RunConfig
+
+from shared import provider
+from shared.mock_server import MockOpenAIServer
+
+FLOWS = ["hello_agent", "streaming", "tools", "handoffs", "context", "guardrails", "tracing"]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_bursts(models: dict[str, OpenAIChatCompletionsModel], bursts: int, burst_size: int, seed: int):
+    rng = random.Random(seed)
+    latencies: list[float] = []
+
+    async def one(flow: str) -> None:
+        agent = Agent(name="Assistant", instructions="You are a helpful assistant.", model=models[flow])
+        start = time.perf_counter()
+        await Runner.run(agent, "Hello how are you?", run_config=RunConfig(tracing_disabled=True))
+        latencies.append(time.perf_counter() - start)
+
+    for _ in range(bursts):
+        flow = rng.choice(FLOWS)
+        await asyncio.gather(*(one(flow) for _ in range(burst_size)))
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bursts", type=int, default=40)
+    parser.add_argument("--burst-size", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated model latency (s)")
+    parser.add_argument("--handshake", type=float, default=0.05, help="simulated TLS handshake (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("per-flow clients", "shared pool"):
+        async with MockOpenAIServer(latency=args.latency, handshake_latency=args.handshake) as server:
+            if mode == "per-flow clients":
+                clients = {flow: AsyncOpenAI(api_key="mock", base_url=server.base_url) for flow in FLOWS}
+                models = {
+                    flow: OpenAIChatCompletionsModel(model="mock-model", openai_client=client)
+                    for flow, client in clients.items()
+                }
+            else:
+                provider.configure(base_url=server.base_url, api_key="mock", model="mock-model")
+                models = {flow: provider.get_model() for flow in FLOWS}
+
+            start = time.perf_counter()
+            latencies = await run_bursts(models, args.bursts, args.burst_size, args.seed)
+            elapsed = time.perf_counter() - start
+            results[mode] = (latencies, elapsed, server.stats.connections)
+
+            if mode == "per-flow clients":
+                await asyncio.gather(*(client.close() for client in clients.values()))
+            else:
+                await provider.aclose()
+
+    print(f"{'mode':<18}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'wall s':>9}{'conns':>7}")
+    for mode, (latencies, elapsed, connections) in results.items():
+        print(
+            f"{mode:<18}"
+            f"{percentile(latencies, 50) * 1000:>10.1f}"
+            f"{percentile(latencies, 99) * 1000:>10.1f}"
+            f"{statistics.mean(latencies) * 1000:>10.1f}"
+            f"{elapsed:>9.2f}"
+            f"{connections:>7}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
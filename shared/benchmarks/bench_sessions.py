@@ -0,0 +1,106 @@
+"""Latency, prompt tokens and memory of turn N of a chat session, up to ``--turns`` turns.
+
+Each mode runs one session of ``--turns`` turns against the mock model:
+
+- ``full transcript``: the caller keeps ``result.to_input_list()`` and sends it back with
+  every turn, as the examples would for a multi-turn chat.
+- ``session, sqlite`` and ``session, log``: ``SessionMemory`` with ``--window`` tokens of
+  recent items and a rolling summary, on each local backend.
+
+For each checkpoint turn the table shows the mean latency of the ``--bucket`` turns up to
+it, the prompt tokens the model received for that turn and the size of the state carried
+to the next turn: the transcript, or the session's cached window and summary. A warm-up
+run comes first, so turn 1 doesn't pay for imports and schema building. The last table
+times loading the session in a fresh ``SessionMemory``, as a process that didn't serve
+the earlier turns would.
+
+    uv run python benchmarks/bench_sessions.py --turns 1000
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from agents import Agent, Runner, set_tracing_disabled
+
+from shared import provider
+from shared.mock_server import MockOpenAIServer, Script, ScriptedResponder
+from shared.sessions import LogSessionBackend, SessionMemory, SQLiteSessionBackend
+
+REPLY = "Islamabad is sunny today with a light breeze, and it should stay clear until the evening."
+
+
+def deep_size(value: Any) -> int:
+    """Bytes of ``value`` and everything it holds (containers, strings, numbers)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(key) + deep_size(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)) or type(value).__name__ == "deque":
+        size += sum(deep_size(item) for item in value)
+    elif hasattr(value, "__dataclass_fields__"):
+        size += sum(deep_size(getattr(value, name)) for name in value.__dataclass_fields__ if name != "lock")
+    return size
+
+
+async def run_session(mode: str, agent: Agent, server: MockOpenAIServer, args: argparse.Namespace, memory):
+    checkpoints = {turn for turn in (1, 10, 100, 250, 500, 1000, args.turns) if turn <= args.turns}
+    transcript: list = []
+    latencies: list[float] = []
+    for turn in range(1, args.turns + 1):
+        text = f"Turn {turn}: how is the weather in Islamabad today, and what should I wear outside?"
+        prompt_tokens = server.stats.prompt_tokens
+        start = time.perf_counter()
+        if memory is None:
+            result = await Runner.run(agent, [*transcript, {"role": "user", "content": text}])
+            transcript = result.to_input_list()
+        else:
+            await memory.run(agent, "bench", text)
+        latencies.append(time.perf_counter() - start)
+        if turn in checkpoints:
+            bucket = latencies[-args.bucket :]
+            state = transcript if memory is None else memory._sessions["bench"]
+            print(
+                f"{mode:<18}{turn:>6}{sum(bucket) / len(bucket) * 1000:>10.2f}"
+                f"{server.stats.prompt_tokens - prompt_tokens:>15}{deep_size(state) / 1024:>10.1f}"
+            )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--window", type=int, default=2000, help="estimated tokens of recent items per turn")
+    parser.add_argument("--bucket", type=int, default=10, help="turns averaged for each latency")
+    args = parser.parse_args()
+
+    set_tracing_disabled(True)
+    directory = Path(tempfile.mkdtemp(prefix="bench_sessions_"))
+    backends = {
+        "session, sqlite": SQLiteSessionBackend(directory / "sessions.sqlite"),
+        "session, log": LogSessionBackend(directory / "log"),
+    }
+    print(f"{args.turns} turns, window {args.window} tokens, store in {directory}")
+    print(f"{'mode':<18}{'turn':>6}{'turn ms':>10}{'prompt tokens':>15}{'state KB':>10}")
+    async with MockOpenAIServer(ScriptedResponder(Script(reply=REPLY))) as server:
+        provider.configure(base_url=server.base_url, api_key="mock", model="mock-model")
+        agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=provider.get_model())
+        modes = {"full transcript": None, **{name: SessionMemory(backend, window=args.window) for name, backend in backends.items()}}
+        await Runner.run(agent, "warm up")
+        for mode, memory in modes.items():
+            await run_session(mode, agent, server, args, memory)
+        await provider.aclose()
+
+    print()
+    print(f"{'backend':<18}{'cold load ms':>14}{'items read':>12}")
+    for name, backend in backends.items():
+        memory = SessionMemory(backend, window=args.window)
+        start = time.perf_counter()
+        memory.history("bench")
+        print(f"{name:<18}{(time.perf_counter() - start) * 1000:>14.2f}{memory.stats.items_loaded:>12}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""Events/s and client CPU per stream: plain ``stream_events()`` vs. ``StreamPolicy``.
+
+Runs ``--streams`` concurrent streamed answers of ``--words`` words each. Every consumer
+sends what it receives as one server-sent event frame per event (``json.dumps`` and an
+``os.write`` to ``/dev/null``, standing in for a socket write and flush). The mock server
+runs in its own process, so the CPU time reported is the client's: the SDK, the queue and
+the consumer. About 70% of it is the OpenAI client parsing each chunk, which no
+consumer-side policy removes, so the CPU column stays within run-to-run noise across
+modes. The rows differ in delivered events.
+
+The second table has consumers that take ``--slow-delay`` seconds per event, such as a
+congested socket, and reports how far each queue grows.
+
+    uv run python benchmarks/bench_streaming.py --streams 100 --words 400
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+
+from agents import Agent, Runner, set_tracing_disabled
+from openai.types.responses import ResponseTextDeltaEvent
+
+from shared import provider
+from shared.mock_server import MockOpenAIServer
+from shared.streaming import TEXT_DELTA, StreamPolicy
+
+
+def serve(words: int, token_delay: float, ports: multiprocessing.Queue) -> None:
+    reply = " ".join(f"word{i}" for i in range(words))
+
+    async def run() -> None:
+        async with MockOpenAIServer(lambda body: reply, token_delay=token_delay) as server:
+            ports.put(server.port)
+            await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+async def run_mode(agent: Agent, policy: StreamPolicy | None, streams: int, slow_delay: float) -> dict:
+    sink = os.open(os.devnull, os.O_WRONLY)
+    delivered = 0
+    peak_queue = 0
+
+    async def one() -> None:
+        nonlocal delivered, peak_queue
+        if policy is None:
+            result = Runner.run_streamed(agent, input="Explain the capital of Pakistan.")
+        else:
+            result = policy.run_streamed(agent, input="Explain the capital of Pakistan.")
+        async for event in result.stream_events():
+            peak_queue = max(peak_queue, result._event_queue.qsize())
+            # The plain stream delivers everything, so the consumer filters
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                os.write(sink, f"data: {json.dumps({'delta': event.data.delta})}\n\n".encode())
+                delivered += 1
+                if slow_delay:
+                    await asyncio.sleep(slow_delay)
+
+    cpu = time.process_time()
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(streams)))
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    os.close(sink)
+    return {"elapsed": elapsed, "cpu": cpu, "delivered": delivered, "peak_queue": peak_queue}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=100)
+    parser.add_argument("--words", type=int, default=400)
+    parser.add_argument("--token-delay", type=float, default=0.002, help="simulated time per token (s)")
+    parser.add_argument("--slow-delay", type=float, default=0.01, help="slow consumer: seconds per event")
+    parser.add_argument("--slow-streams", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N for the first table")
+    args = parser.parse_args()
+
+    set_tracing_disabled(True)
+    ports: multiprocessing.Queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(args.words, args.token_delay, ports), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{ports.get()}/v1/"
+    provider.configure(base_url=base_url, api_key="mock", model="mock-model", max_in_flight=1024)
+    agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=provider.get_model())
+
+    modes = {
+        "plain stream_events()": None,
+        "subscribe text deltas": StreamPolicy(subscribe={TEXT_DELTA}),
+        "+ coalesce 50ms": StreamPolicy(subscribe={TEXT_DELTA}, coalesce_seconds=0.05),
+        "+ coalesce 512 chars": StreamPolicy(subscribe={TEXT_DELTA}, coalesce_chars=512),
+    }
+    print(f"{args.streams} streams x {args.words} tokens")
+    print(f"{'mode':<24}{'wall s':>8}{'events':>9}{'events/s':>10}{'cpu ms/stream':>15}")
+    for name, policy in modes.items():
+        # Best of N: the OpenAI client's chunk parsing dominates and is noisy between rounds
+        stats = min([await run_mode(agent, policy, args.streams, 0.0) for _ in range(args.repeat)], key=lambda s: s["cpu"])
+        print(
+            f"{name:<24}{stats['elapsed']:>8.2f}{stats['delivered']:>9}"
+            f"{stats['delivered'] / stats['elapsed']:>10.0f}{stats['cpu'] / args.streams * 1000:>15.1f}"
+        )
+
+    slow_modes = {
+        "plain stream_events()": None,
+        "bounded 32, block": StreamPolicy(subscribe={TEXT_DELTA}, max_queue=32, overflow="block"),
+        "bounded 32, coalesce": StreamPolicy(subscribe={TEXT_DELTA}, max_queue=32, overflow="coalesce"),
+    }
+    print()
+    print(f"{args.slow_streams} slow consumers ({args.slow_delay * 1000:.0f}ms per event)")
+    print(f"{'mode':<24}{'wall s':>8}{'events':>9}{'peak queue':>12}{'producer waits':>16}")
+    for name, policy in slow_modes.items():
+        stats = await run_mode(agent, policy, args.slow_streams, args.slow_delay)
+        waits = policy.stats.producer_waits if policy is not None else 0
+        print(f"{name:<24}{stats['elapsed']:>8.2f}{stats['delivered']:>9}{stats['peak_queue']:>12}{waits:>16}")
+
+    await provider.aclose()
+    server.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
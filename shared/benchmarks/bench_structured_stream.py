@@ -0,0 +1,126 @@
+"""Time to a guardrail decision and tokens generated, with and without incremental parsing.
+
+The guardrail agent's verdict is ``{"is_weather_query": ..., "reasoning": ...}`` with
+``--reasoning-words`` words of reasoning, streamed by the mock at ``--token-delay`` per
+token. Each mode runs ``--runs`` checks, ``--concurrency`` at a time:
+
+- ``run``: ``Runner.run``, the verdict once the whole reply is parsed.
+- ``streamed, full parse``: ``StructuredStream.final_output()``, the same reply streamed.
+- ``streamed, first field``: ``StructuredStream.field("is_weather_query")``, then ``cancel()``.
+
+A second table compares the client CPU of ``PartialJSONParser`` on the streamed chunks
+with one ``json.loads`` of the finished reply.
+
+    uv run python benchmarks/bench_structured_stream.py --reasoning-words 200 --token-delay 0.005
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from agents import Agent, Runner, set_tracing_disabled
+from pydantic import BaseModel
+
+from shared import provider
+from shared.mock_server import MockOpenAIServer, Script, ScriptedResponder
+from shared.profiler import LatencyHistogram
+from shared.structured_stream import PartialJSONParser, StructuredStream
+
+
+class WeatherInputGuardrail(BaseModel):
+    is_weather_query: bool
+    reasoning: str
+
+
+async def run_checks(check, runs: int, concurrency: int) -> LatencyHistogram:
+    latency = LatencyHistogram()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await check(f"how is the weather in city {index}?")
+            latency.record(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(index) for index in range(runs)))
+    return latency
+
+
+def parser_cpu(reply: str, repeat: int) -> tuple[float, float]:
+    """Microseconds per reply for the incremental parser and for ``json.loads``."""
+    words = reply.split(" ")
+    chunks = [word if index == 0 else f" {word}" for index, word in enumerate(words)]
+    start = time.process_time()
+    for _ in range(repeat):
+        parser = PartialJSONParser()
+        for chunk in chunks:
+            parser.feed(chunk)
+    incremental = (time.process_time() - start) / repeat
+    start = time.process_time()
+    for _ in range(repeat):
+        json.loads("".join(chunks))
+    whole = (time.process_time() - start) / repeat
+    return incremental * 1e6, whole * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.1, help="simulated time to first token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="simulated time per output token (s)")
+    parser.add_argument("--reasoning-words", type=int, nargs="+", default=[20, 200])
+    parser.add_argument("--repeat", type=int, default=2000, help="replies parsed for the CPU table")
+    args = parser.parse_args()
+
+    set_tracing_disabled(True)
+    print(f"{args.runs} checks, {args.concurrency} concurrent, {args.token_delay * 1000:g}ms per token")
+    print(f"{'mode':<24}{'reasoning':>11}{'p50 ms':>9}{'p99 ms':>9}{'tokens/check':>14}")
+    replies: dict[int, str] = {}
+    for words in args.reasoning_words:
+        reasoning = " ".join(["the user asks about the weather in a city"] * (words // 9 + 1)).split()[:words]
+        verdict = {"is_weather_query": True, "reasoning": " ".join(reasoning)}
+        replies[words] = json.dumps(verdict)
+        responder = ScriptedResponder(Script(structured=verdict))
+        async with MockOpenAIServer(responder, latency=args.latency, token_delay=args.token_delay) as server:
+            provider.configure(base_url=server.base_url, api_key="mock", model="mock-model")
+            agent = Agent(
+                name="Guardrail Agent",
+                instructions="check if user is asking about weather or not",
+                output_type=WeatherInputGuardrail,
+                model=provider.get_model(),
+            )
+
+            async def run(text: str) -> None:
+                await Runner.run(agent, text)
+
+            async def full_parse(text: str) -> None:
+                await StructuredStream(agent, text).final_output()
+
+            async def first_field(text: str) -> None:
+                stream = StructuredStream(agent, text)
+                await stream.field("is_weather_query")
+                stream.cancel()
+
+            modes = {"run": run, "streamed, full parse": full_parse, "streamed, first field": first_field}
+            for name, check in modes.items():
+                tokens = server.stats.completion_tokens
+                latency = await run_checks(check, args.runs, args.concurrency)
+                # Let cancelled streams notice the closed connection before counting
+                await asyncio.sleep(args.latency + 0.2)
+                print(
+                    f"{name:<24}{words:>11}{latency.percentile(50) * 1000:>9.0f}{latency.percentile(99) * 1000:>9.0f}"
+                    f"{(server.stats.completion_tokens - tokens) / args.runs:>14.1f}"
+                )
+            await provider.aclose()
+
+    print()
+    print(f"{'reasoning':>9}{'incremental us':>16}{'json.loads us':>15}")
+    for words, reply in replies.items():
+        incremental, whole = parser_cpu(reply, args.repeat)
+        print(f"{words:>9}{incremental:>16.1f}{whole:>15.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
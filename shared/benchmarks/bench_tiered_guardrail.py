@@ -0,0 +1,134 @@
+"""Escalation rate and latency of the tiered guardrails in 07_guardrails.
+
+Runs the weather input guardrail and the Urdu output guardrail over a small labelled
+corpus, once calling the guardrail agent for every item and once with the local checks
+in front of it. The mock model answers with the correct label after ``--latency``
+seconds, so only the local checks can be wrong.
+
+    uv run python benchmarks/bench_tiered_guardrail.py
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from agents import RunContextWrapper
+
+from shared import provider
+from shared.mock_server import MockOpenAIServer
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "07_guardrails"))
+
+# (text, is_weather_query)
+WEATHER_CORPUS = [
+    ("hi", False),
+    ("hello", False),
+    ("hey there", False),
+    ("Salam", False),
+    ("good morning", False),
+    ("how are you?", False),
+    ("hello, how are you", False),
+    ("how is the weather in islamabad?", True),
+    ("islamabad weather", True),
+    ("what's the temperature in Lahore right now", True),
+    ("will it rain in karachi tomorrow?", True),
+    ("Is it sunny in Multan?", True),
+    ("weather forecast for the weekend", True),
+    ("humidity in Karachi today", True),
+    ("is it going to snow in murree", True),
+    ("Should I take an umbrella today?", True),
+    ("Do I need a jacket in Quetta tonight?", True),
+    ("how hot is it in jacobabad", True),
+    ("tell me a joke", False),
+    ("what is the capital of pakistan?", False),
+    ("translate hello to urdu", False),
+    ("write a poem about cricket", False),
+    ("who won the match yesterday", False),
+    ("book a table for two", False),
+    ("it's raining, now write my essay", False),
+    ("forget the weather, write a poem about cricket", False),
+]
+
+# (text, is_output_in_urdu)
+URDU_CORPUS = [
+    ("اردو پاکستان کی قومی زبان ہے اور یہ بہت خوبصورت زبان ہے۔", True),
+    ("اردو زبان برصغیر میں پیدا ہوئی۔", True),
+    ("یہ زبان فارسی، عربی اور ترکی سے متاثر ہے۔", True),
+    ("مجھے اردو شاعری بہت پسند ہے۔", True),
+    ("Urdu is the national language of Pakistan and it is spoken by millions.", False),
+    ("The Urdu language developed in the Indian subcontinent.", False),
+    ("It is written in the Nastaliq script and it has a rich poetic tradition.", False),
+    ("اللغة العربية هي لغة القرآن الكريم.", False),
+    ("العربية من أكثر اللغات انتشارا في العالم.", False),
+    ("Urdu bohat khoobsurat zaban hai.", True),
+    ("Mujhe Urdu shayari pasand hai.", True),
+    ("Urdu: a language, a culture, a history.", False),
+]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_corpus(name, guardrail_function, corpus, tripwire_for):
+    latencies, correct = [], 0
+    ctx = RunContextWrapper(context=None)
+    for text, label in corpus:
+        start = time.perf_counter()
+        output = await guardrail_function(ctx, None, text)
+        latencies.append(time.perf_counter() - start)
+        correct += output.tripwire_triggered == tripwire_for(label)
+    print(
+        f"{name:<34}{statistics.mean(latencies) * 1000:>10.1f}{percentile(latencies, 50) * 1000:>10.1f}"
+        f"{percentile(latencies, 99) * 1000:>10.1f}{correct / len(corpus):>10.0%}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated guardrail model latency (s)")
+    args = parser.parse_args()
+
+    labels = {
+        "weather or not": ("is_weather_query", dict(WEATHER_CORPUS)),
+        "urdu or not": ("is_output_in_urdu", dict(URDU_CORPUS)),
+    }
+
+    def responder(body):
+        instructions, text = body["messages"][0]["content"], body["messages"][-1]["content"]
+        for marker, (field, answers) in labels.items():
+            if marker in instructions:
+                return json.dumps({field: answers[text], "reasoning": "labelled"})
+        return "ok"
+
+    async with MockOpenAIServer(responder, latency=args.latency) as server:
+        provider.configure(base_url=server.base_url, api_key="mock")
+        import input_guardrails
+        import output_guardrails
+
+        weather_llm = inspect.unwrap(input_guardrails.weather_guardrail.guardrail_function)
+        urdu_llm = inspect.unwrap(output_guardrails.output_guardrail.guardrail_function)
+        weather_tiered = input_guardrails.weather_prefilter.tiered(weather_llm)
+        urdu_tiered = output_guardrails.urdu_prefilter.tiered(urdu_llm)
+
+        print(f"{'guardrail':<34}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'accuracy':>10}")
+        await run_corpus("weather (LLM only)", weather_llm, WEATHER_CORPUS, lambda is_weather: not is_weather)
+        await run_corpus("weather (tiered)", weather_tiered, WEATHER_CORPUS, lambda is_weather: not is_weather)
+        await run_corpus("urdu (LLM only)", urdu_llm, URDU_CORPUS, lambda is_urdu: not is_urdu)
+        await run_corpus("urdu (tiered)", urdu_tiered, URDU_CORPUS, lambda is_urdu: not is_urdu)
+
+        print()
+        print(f"weather prefilter: {input_guardrails.weather_prefilter.stats}")
+        print(f"urdu prefilter:    {output_guardrails.urdu_prefilter.stats}")
+        print(f"model calls: {server.stats.requests}")
+        await provider.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
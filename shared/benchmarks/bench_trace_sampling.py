@@ -0,0 +1,134 @@
+"""Hot-path overhead and exported volume of trace sampling.
+
+Drives synthetic traces through the SDK's tracing API: an agent span with generation,
+function and guardrail spans, the same shape as a short tool-using run. A few traces are
+slow, have an error or trip a guardrail. Each configuration installs a different processor
+chain in front of an exporter that only counts, so the numbers are the sampler and
+processor cost alone. Sampler configurations use ``install()``, so head-skipped traces
+never create spans. ``head 1%, processor`` registers the same sampler as a plain
+processor instead, for comparison.
+
+    uv run python benchmarks/bench_trace_sampling.py --traces 20000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from agents.tracing import (
+    agent_span,
+    function_span,
+    generation_span,
+    get_trace_provider,
+    guardrail_span,
+    set_trace_processors,
+    set_trace_provider,
+    set_tracing_disabled,
+    trace,
+)
+from agents.tracing.processor_interface import TracingExporter
+from agents.tracing.spans import SpanError
+
+from shared.sampling import SamplingTraceProcessor, TailPolicy
+from shared.tracing import BatchingTraceProcessor
+
+
+class CountingExporter(TracingExporter):
+    def __init__(self) -> None:
+        self.spans = 0
+        self.traces = 0
+
+    def export(self, items) -> None:
+        for item in items:
+            if item.export() is None:
+                continue
+            if item.export()["object"] == "trace":
+                self.traces += 1
+            else:
+                self.spans += 1
+
+
+def run_traces(count: int, spans_per_trace: int, rng: random.Random, slow_seconds: float) -> float:
+    """Returns the mean time spent per trace, excluding the simulated slow sleeps."""
+    slept = 0.0
+    start = time.perf_counter()
+    for i in range(count):
+        roll = rng.random()
+        with trace(f"workflow {i % 10}"):
+            with agent_span(name=f"Agent {i % 3}", tools=["get_weather"]) as agent:
+                for _ in range(spans_per_trace):
+                    with generation_span(model="mock-model"):
+                        pass
+                    with function_span(name="get_weather", input="{}", output="sunny"):
+                        pass
+                with guardrail_span(name="weather_guardrail") as guardrail:
+                    guardrail.span_data.triggered = roll < 0.005
+                if 0.005 <= roll < 0.01:
+                    agent.set_error(SpanError(message="tool failed", data=None))
+                if 0.01 <= roll < 0.015:
+                    sleep_start = time.perf_counter()
+                    time.sleep(slow_seconds)
+                    slept += time.perf_counter() - sleep_start
+    return (time.perf_counter() - start - slept) / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--traces", type=int, default=20_000)
+    parser.add_argument("--spans-per-trace", type=int, default=3, help="generation + function pairs per trace")
+    args = parser.parse_args()
+
+    slow = 0.002
+    configs = {
+        "disabled": None,
+        "full": lambda p: [p],
+        "head 1%, processor": lambda p: [SamplingTraceProcessor([p], head_rate=0.01, seed=1)],
+        "head 1%": lambda p: [SamplingTraceProcessor([p], head_rate=0.01, seed=1)],
+        "head 10% + 20/s": lambda p: [
+            SamplingTraceProcessor([p], head_rate=0.1, agent_rate_limits={"*": 20.0}, seed=1)
+        ],
+        "head 1% + tail": lambda p: [
+            SamplingTraceProcessor([p], head_rate=0.01, tail=TailPolicy(slow_seconds=slow), seed=1)
+        ],
+        "tail, 500 spans": lambda p: [
+            SamplingTraceProcessor(
+                [p], head_rate=0.0, tail=TailPolicy(slow_seconds=slow), max_buffered_spans=500, seed=1
+            )
+        ],
+    }
+
+    default_provider = get_trace_provider()
+    print(f"{'config':<20}{'us/trace':>10}{'traces out':>12}{'spans out':>11}{'peak KiB':>10}  sampler stats")
+    for name, build in configs.items():
+        # Timed pass, then a separate pass under tracemalloc (which slows everything down)
+        for traced in (False, True):
+            exporter = CountingExporter()
+            batcher = BatchingTraceProcessor(exporter, max_queue_size=65_536, max_batch_size=1024, schedule_delay=0.2)
+            processors = [] if build is None else build(batcher)
+            set_trace_provider(default_provider)
+            if processors and isinstance(processors[0], SamplingTraceProcessor) and name != "head 1%, processor":
+                processors[0].install()
+            else:
+                set_trace_processors(processors)
+            set_tracing_disabled(build is None)
+            if traced:
+                tracemalloc.start()
+            per_trace = run_traces(args.traces, args.spans_per_trace, random.Random(0), slow)
+            if traced:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            else:
+                timed = per_trace
+            batcher.force_flush()
+            batcher.shutdown()
+
+        stats = processors[0].stats if processors and processors[0] is not batcher else ""
+        print(f"{name:<20}{timed * 1e6:>10.1f}{exporter.traces:>12}{exporter.spans:>11}{peak / 1024:>10.0f}  {stats}")
+
+    set_trace_provider(default_provider)
+    set_trace_processors([])
+
+
+if __name__ == "__main__":
+    main()
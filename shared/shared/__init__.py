@@ -0,0 +1,25 @@
+from .provider import (
+    ModelHooks,
+    ProviderSettings,
+    aclose,
+    add_hooks,
+    add_model_wrapper,
+    configure,
+    get_client,
+    get_model,
+    get_provider,
+    get_run_config,
+)
+
+__all__ = [
+    "ModelHooks",
+    "ProviderSettings",
+    "aclose",
+    "add_hooks",
+    "add_model_wrapper",
+    "configure",
+    "get_client",
+    "get_model",
+    "get_provider",
+    "get_run_config",
+]
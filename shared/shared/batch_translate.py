@@ -0,0 +1,215 @@
+"""Map-reduce batch translation on top of the agent-as-tool translation agents.
+
+Translating thousands of strings with the orchestrator means one run (and several model
+calls) per string. ``BatchTranslator`` instead packs ``batch_size`` strings into a single
+request per target language: a numbered JSON array in, a JSON array of translations out.
+Each reply is parsed and validated; items that are missing or malformed are split into
+smaller batches and retried, so one bad item never costs a whole batch. Items still
+missing after ``max_retries`` are translated one at a time by the plain agent.
+
+Input is read lazily and at most ``max_concurrency`` batches are in flight, so memory
+stays bounded no matter how long the input is. Results are yielded in input order.
+
+Usage:
+
+    translator = BatchTranslator({"Spanish": spanish_agent, "French": french_agent}, batch_size=50)
+
+    async for result in translator.translate(lines):
+        print(result.index, result.translations)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import Agent, Runner
+from agents.run import RunConfig
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+BATCH_INSTRUCTIONS = """
+You will receive a JSON array of objects with an "id" and a "text".
+Translate every "text" to {language}. Reply with only a JSON array of objects with the
+same "id" and the translation in "translation", in the same order, and nothing else.
+"""
+
+
+class TranslatedItem(BaseModel):
+    id: int
+    translation: str
+
+
+_items_adapter = TypeAdapter(list[TranslatedItem])
+
+
+@dataclass
+class TranslationResult:
+    index: int
+    text: str
+    translations: dict[str, str] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    """Languages that still failed after all retries and the single-item call, with the
+    last error."""
+
+
+@dataclass
+class BatchStats:
+    items: int = 0
+    batches: int = 0
+    model_calls: int = 0
+    retried_items: int = 0
+    single_items: int = 0
+    """Items translated on their own after the batch retries were used up."""
+
+    failed_items: int = 0
+
+
+def append_instructions(agent: Agent[Any], extra: str) -> str | Callable[..., Any]:
+    """``agent.instructions`` followed by ``extra``, for static and dynamic instructions alike."""
+    instructions = agent.instructions
+    if isinstance(instructions, str):
+        return f"{instructions}\n{extra}"
+    if callable(instructions):
+
+        async def combined(run_context: Any, current_agent: Agent[Any]) -> str:
+            base = instructions(run_context, current_agent)
+            if inspect.isawaitable(base):
+                base = await base
+            return f"{base}\n{extra}" if base else extra
+
+        return combined
+    return extra
+
+
+def parse_batch_reply(reply: str, ids: list[int]) -> tuple[dict[int, str], str | None]:
+    """Return the valid translations by id, and an error message if anything was wrong."""
+    start, end = reply.find("["), reply.rfind("]")
+    if start == -1 or end < start:
+        return {}, "reply is not a JSON array"
+    try:
+        items = _items_adapter.validate_json(reply[start : end + 1])
+    except ValidationError as e:
+        return {}, f"invalid reply: {e.errors()[0]['msg']}"
+
+    wanted = set(ids)
+    translations = {item.id: item.translation for item in items if item.id in wanted and item.translation.strip()}
+    missing = wanted - translations.keys()
+    return translations, f"missing ids {sorted(missing)}" if missing else None
+
+
+@dataclass
+class BatchTranslator:
+    agents: dict[str, Agent[Any]]
+    """Target language to translation agent, e.g. the agents in 04_tools/agent_as_tool.py."""
+
+    batch_size: int = 50
+    max_concurrency: int = 4
+    """Batches in flight at once. Each batch makes one request per language."""
+
+    max_retries: int = 2
+    """How many times failed items are split in half and retried."""
+
+    run_config: RunConfig | None = None
+    stats: BatchStats = field(default_factory=BatchStats)
+
+    def __post_init__(self) -> None:
+        self._batch_agents = {
+            language: agent.clone(
+                instructions=append_instructions(agent, BATCH_INSTRUCTIONS.format(language=language)),
+                tools=[],
+                handoffs=[],
+            )
+            for language, agent in self.agents.items()
+        }
+
+    async def translate(self, texts: Iterable[str] | AsyncIterable[str]) -> AsyncIterator[TranslationResult]:
+        """Translate ``texts`` into every language, yielding results in input order."""
+        in_flight: deque[asyncio.Task[list[TranslationResult]]] = deque()
+        try:
+            async for batch in self._batches(texts):
+                in_flight.append(asyncio.ensure_future(self._translate_batch(batch)))
+                if len(in_flight) >= self.max_concurrency:
+                    for result in await in_flight.popleft():
+                        yield result
+            while in_flight:
+                for result in await in_flight.popleft():
+                    yield result
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def _batches(self, texts: Iterable[str] | AsyncIterable[str]) -> AsyncIterator[list[TranslationResult]]:
+        batch: list[TranslationResult] = []
+        index = 0
+        if isinstance(texts, AsyncIterable):
+            async for text in texts:
+                batch.append(TranslationResult(index=index, text=text))
+                index += 1
+                if len(batch) == self.batch_size:
+                    yield batch
+                    batch = []
+        else:
+            for text in texts:
+                batch.append(TranslationResult(index=index, text=text))
+                index += 1
+                if len(batch) == self.batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    async def _translate_batch(self, batch: list[TranslationResult]) -> list[TranslationResult]:
+        self.stats.batches += 1
+        self.stats.items += len(batch)
+        await asyncio.gather(*(self._translate_language(batch, language, self.max_retries) for language in self.agents))
+        self.stats.failed_items += sum(1 for result in batch if result.errors)
+        return batch
+
+    async def _translate_language(self, items: list[TranslationResult], language: str, retries: int) -> None:
+        ids = [item.index for item in items]
+        payload = json.dumps([{"id": item.index, "text": item.text} for item in items], ensure_ascii=False)
+
+        self.stats.model_calls += 1
+        try:
+            result = await Runner.run(self._batch_agents[language], payload, run_config=self.run_config)
+            translations, error = parse_batch_reply(str(result.final_output), ids)
+        except Exception as e:
+            translations, error = {}, f"{type(e).__name__}: {e}"
+
+        failed = []
+        for item in items:
+            if item.index in translations:
+                item.translations[language] = translations[item.index]
+                item.errors.pop(language, None)
+            else:
+                item.errors[language] = error or "no translation"
+                failed.append(item)
+
+        if not failed:
+            return
+        if retries <= 0:
+            await asyncio.gather(*(self._translate_single(item, language) for item in failed))
+            return
+        self.stats.retried_items += len(failed)
+        middle = (len(failed) + 1) // 2
+        halves = [half for half in (failed[:middle], failed[middle:]) if half]
+        await asyncio.gather(*(self._translate_language(half, language, retries - 1) for half in halves))
+
+    async def _translate_single(self, item: TranslationResult, language: str) -> None:
+        """Translate one item with the plain agent, no JSON involved."""
+        self.stats.model_calls += 1
+        self.stats.single_items += 1
+        try:
+            result = await Runner.run(self.agents[language], item.text, run_config=self.run_config)
+        except Exception as e:
+            item.errors[language] = f"{type(e).__name__}: {e}"
+            return
+        translation = str(result.final_output).strip()
+        if translation:
+            item.translations[language] = translation
+            item.errors.pop(language, None)
@@ -0,0 +1,209 @@
+"""Handoff input compaction under a token budget.
+
+By default a handoff forwards the whole conversation to the target agent, so every turn
+of a long session sends more tokens than the last. ``HandoffCompactor`` is a handoff
+``input_filter`` that:
+
+- drops tool-call noise (function calls and their outputs, handoff calls);
+- keeps the most recent messages verbatim, within ``budget`` estimated tokens;
+- folds older messages into a single summary message, capped at ``summary_budget``.
+
+Summaries are incremental. The summary message is part of the compacted history, so the
+next handoff carries the earlier summary forward and only condenses the messages that
+have just left the window. Token counts come from a local estimate (``estimate_tokens``),
+so nothing goes over the network. Each compaction is recorded as a ``handoff_compaction``
+span under the handoff span, with the tokens before, after and saved.
+
+Usage:
+
+    compactor = HandoffCompactor(budget=1500)
+    handoff(urdu_agent, input_filter=compactor)
+
+or ``get_run_config(handoff_input_filter=compactor)`` for every handoff in a run.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import HandoffInputData
+from agents.items import HandoffCallItem, HandoffOutputItem, RunItem, ToolCallItem, ToolCallOutputItem
+from agents.tracing import custom_span
+
+from .guardrail_cache import input_text
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+TOOL_ITEM_TYPES = frozenset(
+    {
+        "function_call",
+        "function_call_output",
+        "computer_call",
+        "computer_call_output",
+        "file_search_call",
+        "web_search_call",
+    }
+)
+
+_TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r"(?<=[.!?؟۔])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough BPE-style count: one token per punctuation mark and per four characters of
+    each word. Good enough for a budget, and it needs no tokenizer download."""
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in _TOKEN_PIECES.findall(text))
+
+
+def summarize_message(role: str, text: str, max_words: int = 25) -> str:
+    """One summary line: the role and the message's first sentence, cut to ``max_words``."""
+    first = _SENTENCE_END.split(text.strip(), maxsplit=1)[0]
+    words = first.split()
+    if len(words) > max_words:
+        first = " ".join(words[:max_words]) + " ..."
+    return f"- {role}: {first}"
+
+
+@dataclass
+class CompactionStats:
+    handoffs: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    dropped_tool_items: int = 0
+    summarized_messages: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+@dataclass
+class _Entry:
+    source: str
+    """``"history"``, ``"pre"`` or ``"new"``: which ``HandoffInputData`` field it came from."""
+
+    original: Any
+    item: dict[str, Any]
+    tokens: int
+
+
+def _item_text(item: dict[str, Any]) -> str:
+    if "content" in item:
+        return input_text([item])
+    return " ".join(str(item.get(key, "")) for key in ("name", "arguments", "output"))
+
+
+def _is_tool_noise(entry: _Entry) -> bool:
+    if isinstance(entry.original, (ToolCallItem, ToolCallOutputItem, HandoffCallItem, HandoffOutputItem)):
+        return True
+    return entry.item.get("type") in TOOL_ITEM_TYPES
+
+
+@dataclass
+class HandoffCompactor:
+    budget: int = 2000
+    """Estimated tokens forwarded to the target agent, summary included."""
+
+    summary_budget: int = 300
+    keep_last: int = 2
+    """Messages at the end that are always kept verbatim, even over budget."""
+
+    drop_tools: bool = True
+    estimate: Callable[[str], int] = estimate_tokens
+    summarize: Callable[[str, str], str] = summarize_message
+    """``(role, text) -> line`` for each message that leaves the window."""
+
+    stats: CompactionStats = field(default_factory=CompactionStats)
+
+    def __call__(self, data: HandoffInputData) -> HandoffInputData:
+        with custom_span("handoff_compaction") as span:
+            entries = self._entries(data)
+            tokens_before = sum(entry.tokens for entry in entries)
+
+            kept = [entry for entry in entries if not (self.drop_tools and _is_tool_noise(entry))]
+            dropped_tools = len(entries) - len(kept)
+
+            # Pick up the summary from an earlier handoff so it is extended, not rebuilt
+            summary_lines: list[str] = []
+            for entry in [entry for entry in kept if self._is_summary(entry.item)]:
+                summary_lines.extend(input_text([entry.item]).splitlines()[1:])
+                kept.remove(entry)
+
+            window = self._window(kept, reserve=bool(summary_lines))
+            older = kept[: len(kept) - len(window)]
+            for entry in older:
+                summary_lines.append(self.summarize(str(entry.item.get("role", "item")), _item_text(entry.item)))
+            summary = self._summary_item(summary_lines)
+
+            history = [entry.original for entry in window if entry.source == "history"]
+            tokens_after = sum(entry.tokens for entry in window)
+            if summary is not None:
+                history.insert(0, summary)
+                tokens_after += self.estimate(summary["content"])
+
+            self.stats.handoffs += 1
+            self.stats.tokens_before += tokens_before
+            self.stats.tokens_after += tokens_after
+            self.stats.dropped_tool_items += dropped_tools
+            self.stats.summarized_messages += len(older)
+            span.span_data.data.update(
+                tokens_before=tokens_before,
+                tokens_after=tokens_after,
+                tokens_saved=tokens_before - tokens_after,
+                dropped_tool_items=dropped_tools,
+                summarized_messages=len(older),
+            )
+            return HandoffInputData(
+                input_history=tuple(history),
+                pre_handoff_items=tuple(entry.original for entry in window if entry.source == "pre"),
+                new_items=tuple(entry.original for entry in window if entry.source == "new"),
+            )
+
+    def _window(self, entries: list[_Entry], reserve: bool) -> list[_Entry]:
+        """The most recent entries that fit the budget, oldest first."""
+        if not reserve and sum(entry.tokens for entry in entries) <= self.budget:
+            return entries
+        window: list[_Entry] = []
+        used = self.summary_budget
+        for position, entry in enumerate(reversed(entries)):
+            if position >= self.keep_last and used + entry.tokens > self.budget:
+                break
+            window.append(entry)
+            used += entry.tokens
+        window.reverse()
+        return window
+
+    def _entries(self, data: HandoffInputData) -> list[_Entry]:
+        entries = []
+        history = data.input_history
+        if isinstance(history, str):
+            history = ({"role": "user", "content": history},)
+        for item in history:
+            entries.append(_Entry("history", item, dict(item), self.estimate(_item_text(dict(item)))))
+        for source, items in (("pre", data.pre_handoff_items), ("new", data.new_items)):
+            for run_item in items:
+                item = _as_dict(run_item)
+                entries.append(_Entry(source, run_item, item, self.estimate(_item_text(item))))
+        return entries
+
+    @staticmethod
+    def _is_summary(item: dict[str, Any]) -> bool:
+        content = item.get("content")
+        return item.get("role") == "system" and isinstance(content, str) and content.startswith(SUMMARY_PREFIX)
+
+    def _summary_item(self, lines: list[str]) -> dict[str, Any] | None:
+        if not lines:
+            return None
+        # Oldest lines go first once the summary itself is over budget
+        while len(lines) > 1 and self.estimate("\n".join(lines)) > self.summary_budget:
+            lines.pop(0)
+        return {"role": "system", "content": "\n".join([SUMMARY_PREFIX, *lines])}
+
+
+def _as_dict(run_item: RunItem) -> dict[str, Any]:
+    item = run_item.to_input_item()
+    return item if isinstance(item, dict) else dict(item)
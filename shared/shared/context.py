@@ -0,0 +1,176 @@
+"""Compact, shared run contexts for many concurrent sessions.
+
+``06_context`` passes a ``CityInfo`` dataclass as ``context=`` and tools read it through
+``RunContextWrapper``. Once the context also carries per-tenant state (user profile,
+feature flags, cached lookups), every session holding its own copy costs memory in
+proportion to sessions times tenant size, and copying the context for each run so that
+one run's changes don't leak into another costs CPU on every call.
+
+- ``TenantState`` is a frozen, slotted snapshot of one tenant's data, with read-only
+  mappings. ``TenantStore`` loads each tenant once and hands the same object to every
+  session of that tenant. It keeps up to ``max_size`` tenants, least recently used
+  evicted first, so a tenant whose sessions come and go is not reloaded each time.
+- Session contexts are frozen ``slots=True`` dataclasses that reference the shared
+  ``TenantState`` instead of embedding it, so a session costs a few pointers.
+- ``ContextOverlay`` wraps a context for one run. Reads fall through to the base
+  context, and the first write allocates a small dict of changes. Runs never see each
+  other's changes. ``commit()`` returns the context with the run's changes applied, and
+  dropping the overlay discards them.
+
+Values are shared, not copied: store tuples, frozensets and read-only mappings on a
+context, and assign a new value instead of mutating one in place.
+
+Usage:
+
+    tenants = TenantStore(load_tenant)
+
+    @dataclass(frozen=True, slots=True)
+    class CityInfo:
+        city: str
+        tenant: TenantState
+
+    session = CityInfo(city="Karachi", tenant=tenants.get("acme"))
+    run_context = ContextOverlay(session)
+    result = await Runner.run(agent, "what is the weather in my city?", context=run_context)
+    session = run_context.commit()
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field, is_dataclass, replace
+from types import MappingProxyType
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+@dataclass(frozen=True, slots=True)
+class TenantState:
+    tenant_id: str
+    profile: Mapping[str, Any] = _EMPTY
+    flags: frozenset[str] = frozenset()
+    lookups: Mapping[str, Any] = _EMPTY
+    """Cached lookups shared by every session of the tenant, e.g. the tenant's city list."""
+
+    def __post_init__(self) -> None:
+        # Read-only views, so one session can't change what the others see
+        if not isinstance(self.profile, MappingProxyType):
+            object.__setattr__(self, "profile", MappingProxyType(dict(self.profile)))
+        if not isinstance(self.lookups, MappingProxyType):
+            object.__setattr__(self, "lookups", MappingProxyType(dict(self.lookups)))
+        if not isinstance(self.flags, frozenset):
+            object.__setattr__(self, "flags", frozenset(self.flags))
+
+    def enabled(self, flag: str) -> bool:
+        return flag in self.flags
+
+
+@dataclass
+class TenantStoreStats:
+    loads: int = 0
+    hits: int = 0
+    """``get`` calls served by a snapshot already in the store."""
+
+    evictions: int = 0
+
+
+@dataclass
+class TenantStore:
+    loader: Callable[[str], TenantState]
+    """Builds the snapshot of a tenant, e.g. from a ``DataSource`` or a database."""
+
+    max_size: int = 1024
+    """Tenants kept loaded. Sessions keep an evicted snapshot alive, but new sessions reload it."""
+
+    stats: TenantStoreStats = field(default_factory=TenantStoreStats)
+
+    def __post_init__(self) -> None:
+        self._tenants: OrderedDict[str, TenantState] = OrderedDict()
+
+    def get(self, tenant_id: str) -> TenantState:
+        """The tenant's shared snapshot, loaded if it is not in the store."""
+        state = self._tenants.get(tenant_id)
+        if state is not None:
+            self.stats.hits += 1
+            self._tenants.move_to_end(tenant_id)
+            return state
+        self.stats.loads += 1
+        state = self._tenants[tenant_id] = self.loader(tenant_id)
+        while len(self._tenants) > self.max_size:
+            self._tenants.popitem(last=False)
+            self.stats.evictions += 1
+        return state
+
+    def refresh(self, tenant_id: str) -> TenantState:
+        """Load a new snapshot for new sessions. Sessions keep the one they were given."""
+        self._tenants.pop(tenant_id, None)
+        return self.get(tenant_id)
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+
+class ContextOverlay(Generic[T]):
+    """Copy-on-write view of a context for one run. Attribute reads go to the run's
+    changes, then to the base context. Writes go to the changes only."""
+
+    __slots__ = ("_base", "_changes")
+
+    def __init__(self, base: T) -> None:
+        object.__setattr__(self, "_base", base)
+        object.__setattr__(self, "_changes", None)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for names that are not slots of the overlay itself, and for the slots
+        # before they are set: copy and pickle build the overlay without calling __init__
+        if name in ContextOverlay.__slots__:
+            raise AttributeError(name)
+        changes = self._changes
+        if changes is not None and name in changes:
+            return changes[name]
+        return getattr(self._base, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in ContextOverlay.__slots__:
+            # Restoring a copied or unpickled overlay
+            object.__setattr__(self, name, value)
+            return
+        if not hasattr(self._base, name):
+            raise AttributeError(f"{type(self._base).__name__} has no field {name!r}")
+        if self._changes is None:
+            object.__setattr__(self, "_changes", {})
+        self._changes[name] = value
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"Can't delete {name!r} from a run context")
+
+    def __repr__(self) -> str:
+        return f"ContextOverlay({self._base!r}, changes={self._changes or {}})"
+
+    def __copy__(self) -> ContextOverlay[T]:
+        # Same base, its own changes: writes to the copy don't show up in this overlay
+        copy = ContextOverlay(self._base)
+        if self._changes:
+            object.__setattr__(copy, "_changes", dict(self._changes))
+        return copy
+
+    @property
+    def changes(self) -> Mapping[str, Any]:
+        """The fields this run has written."""
+        return MappingProxyType(self._changes) if self._changes else _EMPTY
+
+    def commit(self) -> T:
+        """The base context with this run's changes: a new object for a frozen dataclass,
+        the base itself updated in place otherwise."""
+        base = self._base
+        if not self._changes:
+            return base
+        if is_dataclass(base) and type(base).__dataclass_params__.frozen:
+            return replace(base, **self._changes)
+        for name, value in self._changes.items():
+            setattr(base, name, value)
+        return base
@@ -0,0 +1,205 @@
+"""Indexed, hot-reloadable data for tool lookups.
+
+Tools like ``get_user_info`` and ``get_weather`` rebuild a list on every call and scan it
+linearly. ``DataSource`` loads the rows once, stores them compactly (one tuple per row,
+column names shared) and builds hash indexes for O(1) exact lookups, optionally
+case-insensitive, plus sorted indexes for prefix search.
+
+Data can come from records in code, a CSV, SQLite or Parquet file. ``reload()`` builds a
+complete new snapshot and swaps it in with a single assignment, so readers never see a
+half-loaded table; ``watch()`` reloads whenever the file changes.
+
+Usage:
+
+    users = DataSource.from_file("users.csv", indexes=[Index("user_name")])
+    users.get("user_name", "jimbeam789")
+    users.find_prefix("user_name", "jim")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import csv
+import os
+import sqlite3
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+Row = dict[str, Any]
+
+
+@dataclass(frozen=True)
+class Index:
+    field: str
+    case_insensitive: bool = False
+    prefix: bool = False
+    """Also build a sorted index for ``find_prefix``."""
+
+    def normalize(self, value: Any) -> Any:
+        if self.case_insensitive and isinstance(value, str):
+            return value.casefold()
+        return value
+
+
+class _Snapshot:
+    __slots__ = ("columns", "rows", "exact", "sorted_keys", "sorted_rows")
+
+    def __init__(self, records: Iterable[Mapping[str, Any]], indexes: Iterable[Index]) -> None:
+        self.columns: tuple[str, ...] = ()
+        self.rows: list[tuple[Any, ...]] = []
+        column_positions: dict[str, int] = {}
+
+        for record in records:
+            if not self.columns:
+                self.columns = tuple(record)
+                column_positions = {name: i for i, name in enumerate(self.columns)}
+            elif record.keys() != column_positions.keys():
+                for name in record:
+                    if name not in column_positions:
+                        column_positions[name] = len(self.columns)
+                        self.columns += (name,)
+            self.rows.append(tuple(record.get(name) for name in self.columns))
+
+        # Rows read before a column first appeared don't have it
+        width = len(self.columns)
+        if any(len(row) < width for row in self.rows):
+            self.rows = [row + (None,) * (width - len(row)) for row in self.rows]
+
+        self.exact: dict[str, dict[Any, int]] = {}
+        self.sorted_keys: dict[str, list[str]] = {}
+        self.sorted_rows: dict[str, list[int]] = {}
+        for index in indexes:
+            position = column_positions.get(index.field)
+            if position is None:
+                self.exact[index.field] = {}
+                continue
+            # Rows without a value for the field aren't indexed
+            self.exact[index.field] = {
+                index.normalize(row[position]): row_number
+                for row_number, row in enumerate(self.rows)
+                if row[position] is not None
+            }
+            if index.prefix:
+                pairs = sorted(
+                    (str(index.normalize(row[position])), row_number)
+                    for row_number, row in enumerate(self.rows)
+                    if row[position] is not None
+                )
+                self.sorted_keys[index.field] = [key for key, _ in pairs]
+                self.sorted_rows[index.field] = [row_number for _, row_number in pairs]
+
+    def row(self, row_number: int) -> Row:
+        return dict(zip(self.columns, self.rows[row_number]))
+
+
+def read_csv(path: str | os.PathLike[str]) -> Iterator[Row]:
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def read_sqlite(path: str | os.PathLike[str], table: str) -> Iterator[Row]:
+    db = sqlite3.connect(f"file:{os.fspath(path)}?mode=ro", uri=True)
+    db.row_factory = sqlite3.Row
+    try:
+        for row in db.execute(f'SELECT * FROM "{table}"'):
+            yield dict(row)
+    finally:
+        db.close()
+
+
+def read_parquet(path: str | os.PathLike[str]) -> Iterator[Row]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet files requires pyarrow: `uv add pyarrow`") from e
+    for batch in pq.ParquetFile(path).iter_batches():
+        yield from batch.to_pylist()
+
+
+class DataSource:
+    def __init__(
+        self,
+        loader: Callable[[], Iterable[Mapping[str, Any]]],
+        indexes: Iterable[Index] = (),
+        path: str | None = None,
+    ) -> None:
+        self._loader = loader
+        self.indexes = {index.field: index for index in indexes}
+        self.path = path
+        self._mtime = os.stat(path).st_mtime_ns if path else None
+        self._snapshot = _Snapshot(loader(), self.indexes.values())
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]], indexes: Iterable[Index] = ()) -> DataSource:
+        records = list(records)
+        return cls(lambda: records, indexes)
+
+    @classmethod
+    def from_file(
+        cls, path: str | os.PathLike[str], indexes: Iterable[Index] = (), table: str | None = None
+    ) -> DataSource:
+        """Load a ``.csv``, ``.parquet`` or SQLite (``.db``/``.sqlite``, needs ``table``) file."""
+        path = os.fspath(path)
+        suffix = os.path.splitext(path)[1].lower()
+        if suffix == ".csv":
+            loader = lambda: read_csv(path)  # noqa: E731
+        elif suffix == ".parquet":
+            loader = lambda: read_parquet(path)  # noqa: E731
+        elif suffix in (".db", ".sqlite", ".sqlite3"):
+            if table is None:
+                raise ValueError("A table name is required for SQLite files.")
+            loader = lambda: read_sqlite(path, table)  # noqa: E731
+        else:
+            raise ValueError(f"Unsupported data file: {path}")
+        return cls(loader, indexes, path=path)
+
+    def __len__(self) -> int:
+        return len(self._snapshot.rows)
+
+    def __iter__(self) -> Iterator[Row]:
+        snapshot = self._snapshot
+        return (snapshot.row(i) for i in range(len(snapshot.rows)))
+
+    def get(self, field: str, value: Any) -> Row | None:
+        """Exact lookup on an indexed field. Returns ``None`` if there is no match."""
+        snapshot = self._snapshot
+        row_number = snapshot.exact[field].get(self.indexes[field].normalize(value))
+        return None if row_number is None else snapshot.row(row_number)
+
+    def find_prefix(self, field: str, prefix: str, limit: int = 10) -> list[Row]:
+        """Rows whose ``field`` starts with ``prefix``, in sorted order. Needs ``Index(prefix=True)``."""
+        snapshot = self._snapshot
+        keys = snapshot.sorted_keys[field]
+        prefix = str(self.indexes[field].normalize(prefix))
+        start = bisect.bisect_left(keys, prefix)
+        results = []
+        for position in range(start, min(start + limit, len(keys))):
+            if not keys[position].startswith(prefix):
+                break
+            results.append(snapshot.row(snapshot.sorted_rows[field][position]))
+        return results
+
+    def reload(self) -> None:
+        """Load the data again and swap it in atomically. Lookups keep using the old snapshot
+        until the new one is complete."""
+        mtime = os.stat(self.path).st_mtime_ns if self.path else None
+        snapshot = _Snapshot(self._loader(), self.indexes.values())
+        self._snapshot, self._mtime = snapshot, mtime
+
+    def reload_if_changed(self) -> bool:
+        if self.path is None or os.stat(self.path).st_mtime_ns == self._mtime:
+            return False
+        self.reload()
+        return True
+
+    async def watch(self, interval: float = 5.0) -> None:
+        """Reload in a worker thread whenever the file changes. Run it as a background task."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.reload_if_changed)
+            except (OSError, ValueError, sqlite3.Error):
+                # Keep serving the last good snapshot; the file may be mid-write
+                continue
@@ -0,0 +1,184 @@
+"""Concurrent agent-as-tool calls with bounded concurrency and per-call timeouts.
+
+The SDK already runs all function tool calls emitted in one model turn with
+``asyncio.gather``. What makes a multi-language request slow is asking the model to call
+the tools "in sequence", which costs one orchestrator turn per tool. ``FanOut`` helps in
+two ways:
+
+- ``FanOut.as_tool`` is a drop-in for ``Agent.as_tool``. All tools created from one
+  ``FanOut`` share a semaphore (``max_concurrency``), and each call gets a ``timeout``.
+  Combine it with ``ModelSettings(parallel_tool_calls=True)`` and instructions that ask
+  for every call in a single turn.
+- ``FanOut.fan_out_tool`` declares a group of agents as parallel-safe behind a single
+  tool. One call (input plus a list of targets) runs every target concurrently and
+  returns the results in the order the targets were given.
+
+Like the SDK's ``function_tool``, both return errors to the model as the tool output:
+a failing sub-agent or malformed arguments don't end the orchestrator's run. Errors are
+counted in ``stats.errors`` and timeouts in ``stats.timeouts``.
+
+Usage:
+
+    fan_out = FanOut(max_concurrency=8, timeout=30)
+    tools = [fan_out.as_tool(spanish_agent, "translate_to_spanish", "Translate English to Spanish.")]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import Agent, FunctionTool, ItemHelpers, RunContextWrapper, RunResult, Runner, default_tool_error_function
+from agents.run import RunConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FanOutStats:
+    calls: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    max_in_flight: int = 0
+
+
+@dataclass
+class FanOut:
+    max_concurrency: int = 8
+    timeout: float | None = 60.0
+    """Seconds per sub-agent call. A timed-out call returns an error message to the model
+    instead of failing the whole run."""
+
+    run_config: RunConfig | None = None
+    stats: FanOutStats = field(default_factory=FanOutStats)
+
+    def __post_init__(self) -> None:
+        self._semaphore: asyncio.Semaphore | None = None
+        self._in_flight = 0
+
+    async def run_agent(
+        self,
+        agent: Agent[Any],
+        input: str,
+        context: Any = None,
+        output_extractor: Callable[[RunResult], Awaitable[str]] | None = None,
+    ) -> str:
+        """Run ``agent`` as a sub-call, respecting the concurrency limit and timeout."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            self.stats.calls += 1
+            self._in_flight += 1
+            self.stats.max_in_flight = max(self.stats.max_in_flight, self._in_flight)
+            try:
+                result = await asyncio.wait_for(
+                    Runner.run(agent, input, context=context, run_config=self.run_config),
+                    self.timeout,
+                )
+            except asyncio.TimeoutError:
+                self.stats.timeouts += 1
+                return f"Error: {agent.name} did not answer within {self.timeout} seconds."
+            finally:
+                self._in_flight -= 1
+
+        if output_extractor is not None:
+            return await output_extractor(result)
+        return ItemHelpers.text_message_outputs(result.new_items)
+
+    def as_tool(
+        self,
+        agent: Agent[Any],
+        tool_name: str,
+        tool_description: str,
+        custom_output_extractor: Callable[[RunResult], Awaitable[str]] | None = None,
+    ) -> FunctionTool:
+        """Like ``Agent.as_tool``, with the shared concurrency limit and per-call timeout."""
+
+        async def invoke(ctx: RunContextWrapper[Any], args: dict[str, Any]) -> str:
+            return await self.run_agent(agent, args["input"], ctx.context, custom_output_extractor)
+
+        return self._tool(
+            tool_name,
+            tool_description,
+            {"input": {"type": "string", "title": "Input"}},
+            invoke,
+        )
+
+    def fan_out_tool(self, agents: dict[str, Agent[Any]], tool_name: str, tool_description: str) -> FunctionTool:
+        """One tool that runs several agents on the same input concurrently.
+
+        ``agents`` maps a target name (e.g. ``"Spanish"``) to its agent. The model passes
+        ``input`` and a list of ``targets``; the result lists ``"<target>: <output>"`` lines
+        in the order the targets were requested. A target that fails or is not in
+        ``agents`` gets an error line; the other targets still answer.
+        """
+
+        async def invoke(ctx: RunContextWrapper[Any], args: dict[str, Any]) -> str:
+            targets = list(dict.fromkeys(args["targets"]))
+            known = [target for target in targets if target in agents]
+            outputs = dict(
+                zip(
+                    known,
+                    await asyncio.gather(
+                        *(self.run_agent(agents[target], args["input"], ctx.context) for target in known),
+                        return_exceptions=True,
+                    ),
+                )
+            )
+
+            lines = []
+            for target in targets:
+                output = outputs.get(target)
+                if target not in agents:
+                    self.stats.errors += 1
+                    output = f"Error: unknown target {target!r}, expected one of {', '.join(agents)}."
+                elif isinstance(output, Exception):
+                    self.stats.errors += 1
+                    output = f"Error: {output}"
+                lines.append(f"{target}: {output}")
+            return "\n".join(lines)
+
+        return self._tool(
+            tool_name,
+            tool_description,
+            {
+                "input": {"type": "string", "title": "Input"},
+                "targets": {"type": "array", "title": "Targets", "items": {"type": "string", "enum": list(agents)}},
+            },
+            invoke,
+        )
+
+    def _tool(
+        self,
+        name: str,
+        description: str,
+        properties: dict[str, Any],
+        invoke: Callable[[RunContextWrapper[Any], dict[str, Any]], Awaitable[str]],
+    ) -> FunctionTool:
+        """A ``FunctionTool`` that returns errors to the model as ``function_tool`` does,
+        so bad arguments or a failing sub-agent don't end the orchestrator's run."""
+
+        async def on_invoke_tool(ctx: RunContextWrapper[Any], arguments: str) -> str:
+            try:
+                return await invoke(ctx, json.loads(arguments))
+            except Exception as error:
+                self.stats.errors += 1
+                logger.debug("Fan-out tool %s failed: %r", name, error)
+                return default_tool_error_function(ctx, error)
+
+        return FunctionTool(
+            name=name,
+            description=description,
+            params_json_schema={
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False,
+            },
+            on_invoke_tool=on_invoke_tool,
+        )
@@ -0,0 +1,279 @@
+"""Verdict cache for LLM-based guardrails.
+
+A guardrail like ``weather_guardrail`` starts a full ``Runner.run`` on every message just
+to get a yes/no verdict, even though most inputs are near-duplicates of ones already
+seen. ``GuardrailCache`` remembers verdicts in two tiers:
+
+1. **Exact**: an LRU keyed on the normalized input (casefolded, punctuation stripped,
+   whitespace collapsed).
+2. **Similar** (optional): if ``similarity_threshold`` is set, a miss on the exact tier
+   looks for a cached input whose similarity is at least the threshold. Similarity is the
+   Jaccard index of per-word character n-grams, or the cosine similarity of ``embed()``
+   vectors if an embedding function is given. Both score "is it raining" and "is it not
+   raining" as near-identical, so a match is rejected when the two inputs differ by a
+   negation ("not", "no", "never", "isn't", ...).
+
+Verdicts are shared by every caller. If the verdict depends on who is asking (the tenant,
+the user's settings in the context), pass ``cache_key`` so only calls with the same key
+share verdicts.
+
+Usage:
+
+    cache = GuardrailCache(
+        max_size=10_000,
+        ttl=3600,
+        similarity_threshold=0.85,
+        cache_key=lambda ctx: ctx.context.tenant_id,
+    )
+
+    @input_guardrail
+    @cache.cached
+    async def weather_guardrail(ctx, agent, input) -> GuardrailFunctionOutput:
+        ...
+
+    print(cache.stats)
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import GuardrailFunctionOutput, TResponseInputItem
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_NOT = re.compile(r"n['’]t\b")
+NEGATIONS = frozenset(
+    {"not", "no", "never", "nor", "neither", "none", "nobody", "nothing", "nowhere", "without", "cannot"}
+)
+
+
+def input_text(input: str | list[TResponseInputItem] | Any) -> str:
+    """Return the text of a guardrail input (a string or a list of input items)."""
+    if isinstance(input, str):
+        return input
+    if not isinstance(input, list):
+        return str(input)
+
+    parts: list[str] = []
+    for item in input:
+        content = item.get("content") if isinstance(item, dict) else getattr(item, "content", None)
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            for part in content:
+                text = part.get("text") if isinstance(part, dict) else getattr(part, "text", None)
+                if text:
+                    parts.append(text)
+    return "\n".join(parts)
+
+
+def normalize(text: str) -> str:
+    # "isn't" becomes "is not", so the negation survives as a word of its own
+    text = _PUNCTUATION.sub(" ", _NOT.sub(" not", text.casefold()))
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def differ_by_negation(a: str, b: str) -> bool:
+    """Whether one normalized text has a negation the other lacks."""
+    return not NEGATIONS.isdisjoint(set(a.split()) ^ set(b.split()))
+
+
+def ngrams(text: str, n: int = 3) -> frozenset[str]:
+    """Character n-grams of each word. Word order does not matter, so "weather in
+    islamabad" and "islamabad weather" share almost all of their n-grams."""
+    grams: set[str] = set()
+    for word in text.split():
+        if len(word) <= n:
+            grams.add(word)
+        else:
+            grams.update(word[i : i + n] for i in range(len(word) - n + 1))
+    return frozenset(grams)
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+@dataclass
+class CacheStats:
+    exact_hits: int = 0
+    similar_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    miss_seconds: float = 0.0
+    """Total time spent in the wrapped guardrail on misses."""
+
+    @property
+    def hits(self) -> int:
+        return self.exact_hits + self.similar_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        """Estimated guardrail time saved: hits times the mean miss latency."""
+        return self.hits * (self.miss_seconds / self.misses) if self.misses else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"hits={self.hits} (exact={self.exact_hits}, similar={self.similar_hits}) "
+            f"misses={self.misses} hit_rate={self.hit_rate:.1%} "
+            f"saved_calls={self.hits} saved_seconds={self.saved_seconds:.2f}"
+        )
+
+
+@dataclass
+class _Entry:
+    value: GuardrailFunctionOutput
+    expires_at: float
+    grams: frozenset[str] = frozenset()
+    vector: Sequence[float] | None = None
+
+
+@dataclass
+class GuardrailCache:
+    max_size: int = 1024
+    ttl: float | None = 3600.0
+    """Seconds a verdict stays valid. ``None`` keeps verdicts until they are evicted."""
+
+    similarity_threshold: float | None = None
+    """Enables the similarity tier. ``None`` means exact matches only."""
+
+    ngram_size: int = 3
+    embed: Callable[[str], Sequence[float]] | None = None
+    cache_key: Callable[[Any], Hashable] | None = None
+    """``cache_key(ctx)``, e.g. the tenant id: only calls with the same key share verdicts."""
+
+    stats: CacheStats = field(default_factory=CacheStats)
+
+    def __post_init__(self) -> None:
+        # Keyed on (cache key, normalized text)
+        self._entries: OrderedDict[tuple[Hashable, str], _Entry] = OrderedDict()
+        self._index: dict[str, set[tuple[Hashable, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, text: str, partition: Hashable = None) -> GuardrailFunctionOutput | None:
+        """The cached verdict for ``text`` among those stored with the same ``partition``."""
+        key = (partition, normalize(text))
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.stats.exact_hits += 1
+                return entry.value
+            self._remove(key)
+            self.stats.expirations += 1
+
+        if self.similarity_threshold is not None:
+            match = self._find_similar(key, now)
+            if match is not None:
+                self._entries.move_to_end(match)
+                self.stats.similar_hits += 1
+                return self._entries[match].value
+
+        self.stats.misses += 1
+        return None
+
+    def put(self, text: str, value: GuardrailFunctionOutput, partition: Hashable = None) -> None:
+        key = (partition, normalize(text))
+        if key in self._entries:
+            self._remove(key)
+
+        entry = _Entry(value=value, expires_at=time.monotonic() + self.ttl if self.ttl else math.inf)
+        if self.similarity_threshold is not None:
+            if self.embed is not None:
+                entry.vector = self.embed(key[1])
+            else:
+                entry.grams = ngrams(key[1], self.ngram_size)
+                for gram in entry.grams:
+                    self._index.setdefault(gram, set()).add(key)
+        self._entries[key] = entry
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._index.clear()
+
+    def cached(
+        self,
+        func: Callable[[Any, Any, Any], Awaitable[GuardrailFunctionOutput]],
+    ) -> Callable[[Any, Any, Any], Awaitable[GuardrailFunctionOutput]]:
+        """Wrap an async guardrail function so cache hits skip it entirely."""
+
+        @functools.wraps(func)
+        async def wrapper(ctx: Any, agent: Any, input: Any) -> GuardrailFunctionOutput:
+            text = input_text(input)
+            partition = self.cache_key(ctx) if self.cache_key is not None else None
+            cached = self.get(text, partition)
+            if cached is not None:
+                return cached
+
+            start = time.perf_counter()
+            result = await func(ctx, agent, input)
+            self.stats.miss_seconds += time.perf_counter() - start
+            self.put(text, result, partition)
+            return result
+
+        return wrapper
+
+    def _find_similar(self, key: tuple[Hashable, str], now: float) -> tuple[Hashable, str] | None:
+        threshold = self.similarity_threshold or 0.0
+        best_key, best_score = None, threshold
+        partition, text = key
+
+        if self.embed is not None:
+            vector = self.embed(text)
+            candidates = (
+                (k, _cosine(vector, e.vector or ())) for k, e in self._entries.items() if k[0] == partition
+            )
+        else:
+            grams = ngrams(text, self.ngram_size)
+            counts: dict[tuple[Hashable, str], int] = {}
+            for gram in grams:
+                for candidate in self._index.get(gram, ()):
+                    if candidate[0] == partition:
+                        counts[candidate] = counts.get(candidate, 0) + 1
+            candidates = (
+                (k, shared / (len(grams) + len(self._entries[k].grams) - shared))
+                for k, shared in counts.items()
+            )
+
+        for candidate, score in list(candidates):
+            if score < best_score or differ_by_negation(text, candidate[1]):
+                continue
+            if self._entries[candidate].expires_at <= now:
+                self._remove(candidate)
+                self.stats.expirations += 1
+                continue
+            best_key, best_score = candidate, score
+        return best_key
+
+    def _remove(self, key: tuple[Hashable, str]) -> None:
+        entry = self._entries.pop(key)
+        for gram in entry.grams:
+            keys = self._index.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[gram]
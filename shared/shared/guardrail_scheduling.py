@@ -0,0 +1,207 @@
+"""Scheduling policies for input guardrails.
+
+On the first turn the SDK starts the input guardrails and the agent's first turn together
+with ``asyncio.gather``. When a guardrail trips the run raises, but the turn carries on in
+the background: its model call completes and its tools run, for an input that was just
+rejected. ``GuardrailScheduler`` takes the input guardrails off the agent and run config
+and schedules them itself, with one of three policies:
+
+- ``"blocking"``: guardrails first, the agent only once every one has passed. Nothing is
+  spent on rejected inputs, but every run pays the guardrail latency.
+- ``"speculative"``: guardrails and agent start together, and a trip cancels the agent at
+  once, in-flight model call and tool execution included. The result is returned when
+  every guardrail has passed.
+- ``"deadline"``: like ``"speculative"``, but the guardrails get ``deadline`` seconds.
+  Guardrails still running then are cancelled, and ``on_timeout`` decides: ``"pass"``
+  lets the run finish (fail open), ``"trip"`` stops it (fail closed). The tripped
+  result's ``output_info`` is ``timeout_info(guardrail)`` for the first late guardrail,
+  or a message if that is not set.
+
+The guardrails and the agent share one trace. Each guardrail keeps its ``guardrail``
+span, and an ``input_guardrails`` span records the policy, the outcome and the seconds
+each guardrail took, late ones included.
+
+Usage:
+
+    scheduler = GuardrailScheduler("deadline", deadline=0.5, on_timeout="trip")
+    result = await scheduler.run(agent, "how is the weather in islamabad?", run_config=config)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import copy
+import time
+from dataclasses import dataclass, field, replace
+from collections.abc import Callable
+from typing import Any, Literal
+
+from agents import (
+    Agent,
+    GuardrailFunctionOutput,
+    InputGuardrail,
+    InputGuardrailResult,
+    InputGuardrailTripwireTriggered,
+    RunContextWrapper,
+    Runner,
+    RunResult,
+    TResponseInputItem,
+    trace,
+)
+from agents.run import RunConfig
+from agents.tracing import SpanError, custom_span, get_current_trace, guardrail_span
+
+Policy = Literal["blocking", "speculative", "deadline"]
+
+
+@dataclass
+class ScheduleStats:
+    runs: int = 0
+    trips: int = 0
+    timeouts: int = 0
+    agents_cancelled: int = 0
+    """Agent runs still in flight that a trip, a guardrail error or a cancelled caller stopped."""
+
+    guardrail_seconds: float = 0.0
+    blocked_seconds: float = 0.0
+    """Time the agent (blocking) or its finished result (otherwise) waited for verdicts."""
+
+
+@dataclass
+class GuardrailScheduler:
+    policy: Policy = "speculative"
+    deadline: float | None = None
+    on_timeout: Literal["pass", "trip"] = "pass"
+    timeout_info: Callable[[InputGuardrail[Any]], Any] | None = None
+    """``output_info`` for a guardrail tripped by the deadline, e.g. its verdict type."""
+
+    stats: ScheduleStats = field(default_factory=ScheduleStats)
+
+    def __post_init__(self) -> None:
+        if self.policy not in ("blocking", "speculative", "deadline"):
+            raise ValueError(f"Unknown guardrail policy: {self.policy!r}")
+        if self.policy == "deadline" and self.deadline is None:
+            raise ValueError("The deadline policy needs a deadline")
+
+    async def run(
+        self,
+        starting_agent: Agent[Any],
+        input: str | list[TResponseInputItem],
+        *,
+        context: Any = None,
+        run_config: RunConfig | None = None,
+        **kwargs: Any,
+    ) -> RunResult:
+        """``Runner.run`` with the input guardrails scheduled by ``policy``. ``kwargs`` go
+        to ``Runner.run``."""
+        run_config = run_config or RunConfig()
+        guardrails = starting_agent.input_guardrails + (run_config.input_guardrails or [])
+        if not guardrails:
+            return await Runner.run(starting_agent, input, context=context, run_config=run_config, **kwargs)
+
+        agent = starting_agent.clone(input_guardrails=[])
+        config = replace(run_config, input_guardrails=None)
+        self.stats.runs += 1
+        # Like Runner.run: a new trace unless the caller is already inside one
+        workflow = (
+            trace(
+                run_config.workflow_name,
+                trace_id=run_config.trace_id,
+                group_id=run_config.group_id,
+                metadata=run_config.trace_metadata,
+                disabled=run_config.tracing_disabled,
+            )
+            if get_current_trace() is None
+            else contextlib.nullcontext()
+        )
+        with workflow:
+            start = time.perf_counter()
+            agent_task: asyncio.Task[RunResult] | None = None
+            agent_done_at: list[float] = []
+            if self.policy != "blocking":
+                # Started outside the input_guardrails span so the agent's spans are not nested in it
+                agent_task = asyncio.create_task(
+                    Runner.run(agent, input, context=context, run_config=config, **kwargs)
+                )
+                agent_task.add_done_callback(lambda _: agent_done_at.append(time.perf_counter()))
+
+            try:
+                results = await self._check(starting_agent, guardrails, input, RunContextWrapper(context=context))
+            except BaseException as e:
+                # A trip, a failing guardrail or a cancelled caller: the agent must not run on
+                if isinstance(e, InputGuardrailTripwireTriggered):
+                    self.stats.trips += 1
+                if agent_task is not None:
+                    if not agent_task.done():
+                        self.stats.agents_cancelled += 1
+                    agent_task.cancel()
+                    await asyncio.gather(agent_task, return_exceptions=True)
+                raise
+            finally:
+                self.stats.guardrail_seconds += time.perf_counter() - start
+
+            if agent_task is None:
+                self.stats.blocked_seconds += time.perf_counter() - start
+                result = await Runner.run(agent, input, context=context, run_config=config, **kwargs)
+            else:
+                if agent_done_at:
+                    self.stats.blocked_seconds += time.perf_counter() - agent_done_at[0]
+                result = await agent_task
+        result.input_guardrail_results = results
+        return result
+
+    async def _check(
+        self,
+        agent: Agent[Any],
+        guardrails: list[InputGuardrail[Any]],
+        input: str | list[TResponseInputItem],
+        context: RunContextWrapper[Any],
+    ) -> list[InputGuardrailResult]:
+        with custom_span("input_guardrails", data={"policy": self.policy}) as span:
+            timings: dict[str, float] = {}
+
+            async def check(guardrail: InputGuardrail[Any]) -> InputGuardrailResult:
+                began = time.perf_counter()
+                try:
+                    with guardrail_span(guardrail.get_name()) as guardrail_trace:
+                        result = await guardrail.run(agent, copy.deepcopy(input), context)
+                        guardrail_trace.span_data.triggered = result.output.tripwire_triggered
+                        return result
+                finally:
+                    timings[guardrail.get_name()] = time.perf_counter() - began
+
+            started = time.perf_counter()
+            tasks = [asyncio.create_task(check(guardrail)) for guardrail in guardrails]
+            results: list[InputGuardrailResult] = []
+            outcome = "passed"
+            try:
+                timeout = self.deadline if self.policy == "deadline" else None
+                for done in asyncio.as_completed(tasks, timeout=timeout):
+                    result = await done
+                    if result.output.tripwire_triggered:
+                        outcome = "tripped"
+                        span.set_error(
+                            SpanError(message="Guardrail tripwire triggered", data={"guardrail": result.guardrail.get_name()})
+                        )
+                        raise InputGuardrailTripwireTriggered(result)
+                    results.append(result)
+            except asyncio.TimeoutError:
+                self.stats.timeouts += 1
+                late = [guardrail for guardrail, task in zip(guardrails, tasks) if not task.done()]
+                outcome = "timed_out"
+                if self.on_timeout == "trip":
+                    info = (
+                        self.timeout_info(late[0])
+                        if self.timeout_info is not None
+                        else f"No verdict within {self.deadline}s"
+                    )
+                    output = GuardrailFunctionOutput(output_info=info, tripwire_triggered=True)
+                    raise InputGuardrailTripwireTriggered(InputGuardrailResult(late[0], output)) from None
+            finally:
+                for guardrail, task in zip(guardrails, tasks):
+                    if not task.done():
+                        timings[guardrail.get_name()] = time.perf_counter() - started
+                    task.cancel()
+                span.span_data.data.update(outcome=outcome, seconds=timings)
+            return results
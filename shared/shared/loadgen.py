@@ -0,0 +1,266 @@
+"""Load generation for agent runs: many concurrent sessions on one event loop.
+
+Every example runs a single ``Runner.run`` per process, which says nothing about how the
+agent loop behaves with hundreds of sessions sharing one event loop and one connection
+pool. This module drives any ``request(session_id)`` coroutine:
+
+- ``closed_loop``: a fixed number of sessions, each sending its next request as soon as
+  the previous one finishes (plus optional think time).
+- ``open_loop``: Poisson arrivals at a target rate, whether or not earlier requests have
+  finished, up to ``max_in_flight``; arrivals beyond that are shed and counted.
+
+Each run reports throughput, latency percentiles, event-loop lag (how late a timer that
+should fire every ``interval`` actually fires), contention on the shared client
+(``provider.pool_stats()``) and, from a separate traced pass, memory per session.
+``sweep`` runs a series of levels and ``saturation`` picks the point where adding load
+stops adding throughput.
+
+Usage:
+
+    async def request(session: int) -> None:
+        await Runner.run(agent, "Hello how are you?", run_config=config)
+
+    results = await sweep(request, [1, 8, 64, 256], duration=10)
+    print(format_results(results))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from .profiler import LatencyHistogram
+from .provider import PoolStats, reset_pool_stats
+
+Request = Callable[[int], Awaitable[Any]]
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic timer fires; anything blocking the loop shows up here."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.lag = LatencyHistogram()
+        self._task: asyncio.Task[None] | None = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag.record(max(time.perf_counter() - expected, 0.0))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self) -> LoopLagMonitor:
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+
+@dataclass
+class LoadResult:
+    mode: Literal["closed", "open"]
+    level: float
+    """Sessions (closed loop) or target requests per second (open loop)."""
+
+    elapsed: float = 0.0
+    completed: int = 0
+    errors: int = 0
+    last_error: str | None = None
+    shed: int = 0
+    """Open loop only: arrivals dropped because ``max_in_flight`` requests were running."""
+
+    peak_in_flight: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    loop_lag: LatencyHistogram = field(default_factory=LatencyHistogram)
+    pool: PoolStats = field(default_factory=PoolStats)
+    memory_per_session: float | None = None
+    """Bytes allocated per concurrent session at peak, from a separate traced pass."""
+
+    @property
+    def throughput(self) -> float:
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+
+class _Tracker:
+    def __init__(self, result: LoadResult, request: Request) -> None:
+        self.result = result
+        self.request = request
+        self.in_flight = 0
+
+    def enter(self) -> None:
+        self.in_flight += 1
+        self.result.peak_in_flight = max(self.result.peak_in_flight, self.in_flight)
+
+    async def one(self, session: int) -> None:
+        self.enter()
+        await self.run(session)
+
+    async def run(self, session: int) -> None:
+        """One request that ``enter`` has already counted."""
+        start = time.perf_counter()
+        try:
+            await self.request(session)
+        except Exception as e:
+            self.result.errors += 1
+            self.result.last_error = f"{type(e).__name__}: {e}"
+        else:
+            self.result.completed += 1
+            self.result.latency.record(time.perf_counter() - start)
+        finally:
+            self.in_flight -= 1
+
+
+async def closed_loop(request: Request, sessions: int, duration: float, think_time: float = 0.0) -> LoadResult:
+    """``sessions`` sessions back to back for ``duration`` seconds. Requests already running
+    at the deadline are finished and counted."""
+    result = LoadResult("closed", sessions)
+    tracker = _Tracker(result, request)
+    reset_pool_stats()
+
+    async def session(session_id: int) -> None:
+        while time.perf_counter() < deadline:
+            await tracker.one(session_id)
+            if think_time:
+                await asyncio.sleep(think_time)
+
+    async with LoopLagMonitor() as monitor:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(session(i) for i in range(sessions)))
+        result.elapsed = time.perf_counter() - start
+    result.loop_lag = monitor.lag
+    result.pool = reset_pool_stats()
+    return result
+
+
+async def open_loop(
+    request: Request,
+    rps: float,
+    duration: float,
+    max_in_flight: int = 10_000,
+    seed: int | None = None,
+) -> LoadResult:
+    """Poisson arrivals at ``rps`` for ``duration`` seconds. The schedule is absolute, so a
+    stalled loop sends the missed arrivals in a burst instead of quietly lowering the rate."""
+    result = LoadResult("open", rps)
+    tracker = _Tracker(result, request)
+    rng = random.Random(seed)
+    tasks: set[asyncio.Task[None]] = set()
+    reset_pool_stats()
+
+    async with LoopLagMonitor() as monitor:
+        start = time.perf_counter()
+        deadline = start + duration
+        arrival = start
+        session = 0
+        while True:
+            arrival += rng.expovariate(rps)
+            if arrival >= deadline:
+                break
+            delay = arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if tracker.in_flight >= max_in_flight:
+                result.shed += 1
+                continue
+            # Counted before the task starts: arrivals due at once would all pass the check otherwise
+            tracker.enter()
+            task = asyncio.create_task(tracker.run(session))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            session += 1
+        if tasks:
+            await asyncio.gather(*tasks)
+        result.elapsed = time.perf_counter() - start
+    result.loop_lag = monitor.lag
+    result.pool = reset_pool_stats()
+    return result
+
+
+async def memory_per_session(request: Request, sessions: int) -> float:
+    """Peak traced bytes per session with ``sessions`` requests running at once. tracemalloc
+    slows everything down, so this is a separate pass from the timed one."""
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        await asyncio.gather(*(request(i) for i in range(sessions)), return_exceptions=True)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (peak - baseline) / max(sessions, 1)
+
+
+async def sweep(
+    request: Request,
+    levels: Sequence[float],
+    mode: Literal["closed", "open"] = "closed",
+    duration: float = 10.0,
+    measure_memory: bool = True,
+    **kwargs: Any,
+) -> list[LoadResult]:
+    """Run each level in turn. ``kwargs`` go to ``closed_loop`` or ``open_loop``."""
+    results = []
+    for level in levels:
+        if mode == "closed":
+            result = await closed_loop(request, int(level), duration, **kwargs)
+        else:
+            result = await open_loop(request, level, duration, **kwargs)
+        if measure_memory:
+            result.memory_per_session = await memory_per_session(request, max(result.peak_in_flight, 1))
+        results.append(result)
+    return results
+
+
+def saturation(results: Sequence[LoadResult], min_gain: float = 0.1) -> LoadResult | None:
+    """The highest level before throughput stops keeping up, or ``None`` if it never does.
+
+    Closed loop: the last level after which the next one gained less than ``min_gain`` of
+    throughput. Open loop: the last level served within ``min_gain`` of its target rate
+    without shedding.
+    """
+    previous = None
+    for result in results:
+        if result.mode == "open":
+            if result.shed or result.throughput < result.level * (1 - min_gain):
+                return previous
+        elif previous is not None and result.throughput < previous.throughput * (1 + min_gain):
+            return previous
+        previous = result
+    return None
+
+
+def format_results(results: Sequence[LoadResult]) -> str:
+    lines = [
+        f"{'level':>7}{'runs/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'lag p99':>9}{'lag max':>9}"
+        f"{'in-flt':>8}{'waited':>8}{'wait ms':>9}{'KB/sess':>9}{'errors':>8}"
+    ]
+    for result in results:
+        pool = result.pool
+        waited = pool.slot_waits / pool.model_calls if pool.model_calls else 0.0
+        mean_wait = pool.slot_wait_seconds / pool.slot_waits * 1e3 if pool.slot_waits else 0.0
+        memory = f"{result.memory_per_session / 1024:.1f}" if result.memory_per_session is not None else "-"
+        lines.append(
+            f"{result.level:>7g}{result.throughput:>9.1f}{result.latency.percentile(50) * 1e3:>9.1f}"
+            f"{result.latency.percentile(99) * 1e3:>9.1f}{result.loop_lag.percentile(99) * 1e3:>9.1f}"
+            f"{result.loop_lag.max / 1e3:>9.1f}{result.peak_in_flight:>8}{waited:>8.0%}{mean_wait:>9.1f}"
+            f"{memory:>9}{result.errors + result.shed:>8}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,347 @@
+"""A local, OpenAI-compatible chat completions server for benchmarks.
+
+Only ``POST /v1/chat/completions`` is implemented, with and without ``stream=True``.
+Replies come from a ``responder`` callable, so a benchmark can script plain text or tool
+calls. ``ScriptedResponder`` plays a whole agent flow: it calls the scripted tools or
+handoff on the first turn, fills structured outputs from their JSON schema and answers
+with fixed text once the tool results are in. Latency is simulated with ``latency`` (time
+to first byte), ``token_delay`` (time per streamed token) and ``handshake_latency`` (a
+one-off delay for every new TCP connection, standing in for the TLS handshake of a real
+endpoint). ``PROFILES`` has named sets of the three.
+
+Usage:
+
+    async with MockOpenAIServer(latency=0.05) as server:
+        configure(base_url=server.base_url, api_key="mock")
+        ...
+
+    script = Script(tool_calls={"get_weather": '{"city": "Lahore"}'}, reply="It is sunny.")
+    async with MockOpenAIServer.from_profile(ScriptedResponder(script), "flash") as server:
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class MockToolCall:
+    name: str
+    arguments: str = "{}"
+
+
+@dataclass
+class MockReply:
+    content: str | None = None
+    tool_calls: list[MockToolCall] = field(default_factory=list)
+
+
+Responder = Callable[[dict[str, Any]], "MockReply | str"]
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    latency: float = 0.0
+    token_delay: float = 0.0
+    handshake_latency: float = 0.0
+
+
+PROFILES = {
+    "instant": LatencyProfile(),
+    "fast": LatencyProfile(latency=0.02, token_delay=0.001, handshake_latency=0.01),
+    # Roughly a hosted flash model: a few hundred ms to the first token, ~200 tokens/s
+    "flash": LatencyProfile(latency=0.3, token_delay=0.005, handshake_latency=0.05),
+    "slow": LatencyProfile(latency=1.0, token_delay=0.02, handshake_latency=0.1),
+}
+
+
+def echo_responder(body: dict[str, Any]) -> MockReply:
+    """Reply with the last user message."""
+    for message in reversed(body.get("messages", [])):
+        if message.get("role") == "user":
+            content = message.get("content")
+            if isinstance(content, list):
+                content = " ".join(part.get("text", "") for part in content)
+            return MockReply(content=f"You said: {content}")
+    return MockReply(content="Hello!")
+
+
+@dataclass
+class Script:
+    tool_calls: dict[str, str] = field(default_factory=dict)
+    """Tool name -> JSON arguments. Every scripted tool the request offers is called on the
+    first turn after a user message."""
+
+    handoff: str | None = None
+    """Handoff tool to call on the first turn (e.g. ``"transfer_to_urdu_agent"``), if offered.
+    Takes precedence over ``tool_calls``."""
+
+    reply: str = "Done."
+    structured: dict[str, Any] = field(default_factory=dict)
+    """Field values for structured outputs; other fields get a default for their type."""
+
+
+def _from_schema(schema: dict[str, Any], overrides: dict[str, Any], defs: dict[str, Any]) -> Any:
+    if "$ref" in schema:
+        schema = defs.get(schema["$ref"].rsplit("/", 1)[-1], {})
+    for key in ("anyOf", "oneOf", "allOf"):
+        if schema.get(key):
+            return _from_schema(schema[key][0], overrides, defs)
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((item for item in kind if item != "null"), "null")
+    if kind == "object":
+        return {
+            name: overrides[name] if name in overrides else _from_schema(prop, overrides, defs)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if "enum" in schema:
+        return schema["enum"][0]
+    return {"boolean": True, "integer": 0, "number": 0.0, "array": [], "string": "ok", "null": None}.get(kind, "ok")
+
+
+class ScriptedResponder:
+    """Deterministic responder that plays a ``Script`` against whatever agent is calling."""
+
+    def __init__(self, script: Script | None = None) -> None:
+        self.script = script or Script()
+
+    def __call__(self, body: dict[str, Any]) -> MockReply:
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"].get("schema", {})
+            value = _from_schema(schema, self.script.structured, schema.get("$defs", {}))
+            return MockReply(content=json.dumps(value))
+
+        messages = body.get("messages", [])
+        last_user = max((i for i, message in enumerate(messages) if message.get("role") == "user"), default=-1)
+        answered = any(message.get("role") == "tool" for message in messages[last_user + 1 :])
+        offered = {tool["function"]["name"] for tool in body.get("tools", []) if tool.get("type") == "function"}
+        if not answered:
+            if self.script.handoff in offered:
+                return MockReply(tool_calls=[MockToolCall(self.script.handoff)])
+            calls = [MockToolCall(name, args) for name, args in self.script.tool_calls.items() if name in offered]
+            if calls:
+                return MockReply(tool_calls=calls)
+        return MockReply(content=self.script.reply)
+
+
+def count_tokens(text: str | None) -> int:
+    """Rough token estimate (whitespace-separated words)."""
+    return len(text.split()) if text else 0
+
+
+@dataclass
+class ServerStats:
+    connections: int = 0
+    requests: int = 0
+    streamed_requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    """Tokens written to clients. A stream whose client went away stops counting."""
+
+
+class MockOpenAIServer:
+    def __init__(
+        self,
+        responder: Responder = echo_responder,
+        *,
+        latency: float = 0.0,
+        token_delay: float = 0.0,
+        handshake_latency: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.responder = responder
+        self.latency = latency
+        self.token_delay = token_delay
+        self.handshake_latency = handshake_latency
+        self.host = host
+        self.port = port
+        self.stats = ServerStats()
+        self._server: asyncio.base_events.Server | None = None
+
+    @classmethod
+    def from_profile(
+        cls, responder: Responder = echo_responder, profile: str | LatencyProfile = "instant", **kwargs: Any
+    ) -> MockOpenAIServer:
+        if isinstance(profile, str):
+            profile = PROFILES[profile]
+        return cls(
+            responder,
+            latency=profile.latency,
+            token_delay=profile.token_delay,
+            handshake_latency=profile.handshake_latency,
+            **kwargs,
+        )
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1/"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> MockOpenAIServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        try:
+            if self.handshake_latency:
+                await asyncio.sleep(self.handshake_latency)
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                if method != "POST" or not path.rstrip("/").endswith("/chat/completions"):
+                    self._write_json(writer, 404, {"error": {"message": f"{method} {path} not found"}})
+                else:
+                    await self._handle_completion(writer, json.loads(body or b"{}"))
+                await writer.drain()
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_completion(self, writer: asyncio.StreamWriter, body: dict[str, Any]) -> None:
+        self.stats.requests += 1
+        reply = self.responder(body)
+        if isinstance(reply, str):
+            reply = MockReply(content=reply)
+
+        prompt_tokens = sum(count_tokens(json.dumps(m.get("content"))) for m in body.get("messages", []))
+        completion_tokens = count_tokens(reply.content) + sum(
+            count_tokens(call.arguments) for call in reply.tool_calls
+        )
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        self.stats.prompt_tokens += prompt_tokens
+        model = body.get("model", "mock-model")
+        finish_reason = "tool_calls" if reply.tool_calls else "stop"
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if not body.get("stream"):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay * completion_tokens)
+            message: dict[str, Any] = {"role": "assistant", "content": reply.content}
+            if reply.tool_calls:
+                message["tool_calls"] = [
+                    {
+                        "id": f"call_{index}",
+                        "type": "function",
+                        "function": {"name": call.name, "arguments": call.arguments},
+                    }
+                    for index, call in enumerate(reply.tool_calls)
+                ]
+            self.stats.completion_tokens += completion_tokens
+            self._write_json(
+                writer,
+                200,
+                {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                    "usage": usage,
+                },
+            )
+            return
+
+        self.stats.streamed_requests += 1
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n"
+            b"Connection: keep-alive\r\n\r\n"
+        )
+
+        def chunk(delta: dict[str, Any], finish: str | None = None, **extra: Any) -> None:
+            payload = {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                **extra,
+            }
+            self._write_chunk(writer, f"data: {json.dumps(payload)}\n\n".encode())
+
+        chunk({"role": "assistant", "content": ""})
+        if reply.content:
+            words = reply.content.split(" ")
+            for index, word in enumerate(words):
+                if self.token_delay:
+                    await asyncio.sleep(self.token_delay)
+                chunk({"content": word if index == 0 else f" {word}"})
+                self.stats.completion_tokens += 1
+                await writer.drain()
+        for index, call in enumerate(reply.tool_calls):
+            self.stats.completion_tokens += count_tokens(call.arguments)
+            chunk(
+                {
+                    "tool_calls": [
+                        {
+                            "index": index,
+                            "id": f"call_{index}",
+                            "type": "function",
+                            "function": {"name": call.name, "arguments": call.arguments},
+                        }
+                    ]
+                }
+            )
+        chunk({}, finish_reason, usage=usage)
+        self._write_chunk(writer, b"data: [DONE]\n\n")
+        writer.write(b"0\r\n\r\n")
+
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    @staticmethod
+    def _write_json(writer: asyncio.StreamWriter, status: int, payload: dict[str, Any]) -> None:
+        data = json.dumps(payload).encode()
+        reason = "OK" if status == 200 else "Not Found"
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: keep-alive\r\n\r\n".encode()
+            + data
+        )
@@ -0,0 +1,295 @@
+"""Latency profiling from the tracing hooks.
+
+``span.export()`` dumps show what happened in a run but not where the time went.
+``ProfilingProcessor`` is a ``TracingProcessor`` that times every span itself (with
+``perf_counter``, not the exported timestamps) and aggregates per stage into fixed-size,
+HDR-style histograms:
+
+- ``model``, ``tool``, ``guardrail``, ``handoff``: the matching spans.
+- ``model queue``, ``tool queue``: time waiting for an in-flight slot or a worker before
+  the call really starts (reported through the pooled model's hooks and by ``Execution``
+  tools).
+- ``time to first token``: streamed model calls, from the start of the request.
+- ``local overhead``: time inside an agent span that no child span or queue wait covers,
+  i.e. the SDK and our own code between model calls.
+- ``run``: whole traces.
+
+It also keeps collapsed stacks of self time (``workflow;agent:Assistant;function:get_weather 1234``,
+in microseconds), which ``flamegraph.pl`` or speedscope turn into a flame graph.
+
+Usage:
+
+    profiler = ProfilingProcessor()
+    add_trace_processor(profiler)
+    ...
+    print(profiler.report())
+    profiler.write_collapsed("profile.folded")
+
+Tracing must be enabled for the runs being profiled (``get_run_config(tracing_disabled=False)``).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents.tracing import Span, Trace
+from agents.tracing.processor_interface import TracingProcessor
+
+from . import provider
+
+_queue_wait: contextvars.ContextVar[float | None] = contextvars.ContextVar("profiler_queue_wait", default=None)
+_first_token: contextvars.ContextVar[float | None] = contextvars.ContextVar("profiler_first_token", default=None)
+# The SDK invokes tools in a child task, so a plain value set there would not be visible
+# when the function span ends; the span start puts a mutable holder in the context instead
+_tool_queue_wait: contextvars.ContextVar[list[float | None] | None] = contextvars.ContextVar(
+    "profiler_tool_queue_wait", default=None
+)
+
+
+def mark_queue_wait(seconds: float) -> None:
+    """Report how long the model call about to start waited for an in-flight slot. Cheap
+    enough to call unconditionally."""
+    _queue_wait.set(seconds)
+
+
+def mark_tool_queue_wait(seconds: float) -> None:
+    """Report how long the current tool call waited for a slot and a worker."""
+    holder = _tool_queue_wait.get()
+    if holder is not None:
+        holder[0] = seconds
+
+
+def mark_first_token() -> None:
+    """Report that the current streamed model call produced its first delta."""
+    _first_token.set(time.perf_counter())
+
+
+# Registered with the pooled model by the first ProfilingProcessor
+MODEL_HOOKS = provider.ModelHooks(on_slot=mark_queue_wait, on_first_token=mark_first_token)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of microseconds: ``2**sub_bucket_bits`` linear buckets per power
+    of two, so values are kept to within about 1% with a fixed number of counters."""
+
+    def __init__(self, max_seconds: float = 3600.0, sub_bucket_bits: int = 7) -> None:
+        self._sub_bits = sub_bucket_bits
+        self._sub_count = 1 << sub_bucket_bits
+        self._half = self._sub_count // 2
+        self._max = int(max_seconds * 1e6)
+        self._counts = [0] * (self._index(self._max) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self._sub_bits
+        return self._sub_count + (shift - 1) * self._half + (value >> shift) - self._half
+
+    def _value(self, index: int) -> int:
+        if index < self._sub_count:
+            return index
+        shift, offset = divmod(index - self._sub_count, self._half)
+        shift += 1
+        # Midpoint of the bucket
+        return ((offset + self._half) << shift) + (1 << (shift - 1))
+
+    def record(self, seconds: float) -> None:
+        value = min(max(int(seconds * 1e6), 0), self._max)
+        self._counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent: float) -> float:
+        """Seconds at the given percentile (0-100)."""
+        if not self.count:
+            return 0.0
+        target = max(1, round(self.count * percent / 100))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= target:
+                return min(self._value(index), self.max) / 1e6
+        return self.max / 1e6
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count / 1e6 if self.count else 0.0
+
+
+STAGES = (
+    "run",
+    "model",
+    "time to first token",
+    "model queue",
+    "tool",
+    "tool queue",
+    "guardrail",
+    "handoff",
+    "local overhead",
+)
+
+
+@dataclass
+class _Open:
+    start: float
+    path: str
+    kind: str
+    children: list[tuple[float, float]] = field(default_factory=list)
+    queue_wait: float = 0.0
+    """Queue waits of model calls made directly inside this span."""
+
+
+def _frame(span: Span[Any]) -> tuple[str, str]:
+    """``(kind, frame)`` for a span: the stage it counts towards and its stack frame."""
+    data = span.span_data
+    kind = data.type
+    if kind in ("generation", "response"):
+        return "model", kind
+    if kind == "function":
+        return "tool", f"function:{data.name}"
+    if kind == "agent":
+        return "agent", f"agent:{data.name}"
+    if kind == "guardrail":
+        return "guardrail", f"guardrail:{data.name}"
+    if kind == "handoff":
+        return "handoff", f"handoff:{data.from_agent}->{data.to_agent}"
+    name = getattr(data, "name", None)
+    return kind, f"{kind}:{name}" if name else kind
+
+
+def _covered(intervals: list[tuple[float, float]]) -> float:
+    """Total length of the union of intervals (parallel tool calls overlap)."""
+    total, current_start, current_end = 0.0, None, None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+class ProfilingProcessor(TracingProcessor):
+    def __init__(self, max_stacks: int = 10_000) -> None:
+        provider.add_hooks(MODEL_HOOKS)
+        self.max_stacks = max_stacks
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self.stacks: dict[str, int] = {}
+        """Collapsed stack -> self time in microseconds."""
+
+        self._traces: dict[str, tuple[str, float]] = {}
+        self._open: dict[str, _Open] = {}
+        self._lock = threading.Lock()
+
+    def _add_stack(self, path: str, seconds: float) -> None:
+        if path not in self.stacks and len(self.stacks) >= self.max_stacks:
+            path = "(other)"
+        self.stacks[path] = self.stacks.get(path, 0) + int(seconds * 1e6)
+
+    def on_trace_start(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces[trace.trace_id] = (trace.name.replace(";", ","), time.perf_counter())
+
+    def on_trace_end(self, trace: Trace) -> None:
+        with self._lock:
+            started = self._traces.pop(trace.trace_id, None)
+            if started is not None:
+                self.histograms["run"].record(time.perf_counter() - started[1])
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        now = time.perf_counter()
+        kind, frame = _frame(span)
+        queue_wait = None
+        if kind == "model":
+            queue_wait = _queue_wait.get()
+            _queue_wait.set(None)
+            _first_token.set(None)
+        elif kind == "tool":
+            _tool_queue_wait.set([None])
+        with self._lock:
+            parent = self._open.get(span.parent_id) if span.parent_id else None
+            if parent is not None:
+                prefix = parent.path
+            else:
+                prefix = self._traces.get(span.trace_id, ("(no trace)", 0.0))[0]
+            self._open[span.span_id] = _Open(now, f"{prefix};{frame.replace(';', ',')}", kind)
+            if kind == "model" and queue_wait is not None:
+                self.histograms["model queue"].record(queue_wait)
+                if parent is not None:
+                    parent.queue_wait += queue_wait
+                self._add_stack(f"{prefix};model queue", queue_wait)
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        now = time.perf_counter()
+        first_token = tool_queue = None
+        kind = _frame(span)[0]
+        if kind == "model":
+            first_token = _first_token.get()
+        elif kind == "tool":
+            holder = _tool_queue_wait.get()
+            tool_queue = holder[0] if holder is not None else None
+        with self._lock:
+            state = self._open.pop(span.span_id, None)
+            if state is None:
+                return
+            duration = now - state.start
+            parent = self._open.get(span.parent_id) if span.parent_id else None
+            if parent is not None:
+                parent.children.append((state.start, now))
+
+            self_time = max(duration - _covered(state.children) - state.queue_wait, 0.0)
+            if kind in ("model", "tool", "guardrail", "handoff"):
+                self.histograms[kind].record(duration)
+            elif kind == "agent":
+                self.histograms["local overhead"].record(self_time)
+            if first_token is not None and first_token >= state.start:
+                self.histograms["time to first token"].record(first_token - state.start)
+            if tool_queue is not None:
+                self.histograms["tool queue"].record(tool_queue)
+                self._add_stack(f"{state.path};queue", tool_queue)
+                self_time = max(self_time - tool_queue, 0.0)
+            self._add_stack(state.path, self_time)
+
+    def force_flush(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+            self.stacks.clear()
+
+    def report(self) -> str:
+        """Summary table: count and latency percentiles in milliseconds per stage."""
+        lines = [f"{'stage':<22}{'count':>8}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"]
+        for stage, histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            lines.append(
+                f"{stage:<22}{histogram.count:>8}{histogram.mean * 1e3:>9.1f}"
+                f"{histogram.percentile(50) * 1e3:>9.1f}{histogram.percentile(90) * 1e3:>9.1f}"
+                f"{histogram.percentile(99) * 1e3:>9.1f}{histogram.max / 1e3:>9.1f}"
+            )
+        return "\n".join(lines)
+
+    def collapsed_stacks(self) -> str:
+        """One ``frame;frame;frame microseconds`` line per stack, heaviest first."""
+        stacks = sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)
+        return "\n".join(f"{path} {micros}" for path, micros in stacks if micros > 0)
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed_stacks() + "\n")
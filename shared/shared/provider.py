@@ -0,0 +1,383 @@
+"""A single pooled model client shared by every flow in the process.
+
+Each example used to build its own ``AsyncOpenAI`` client, ``OpenAIChatCompletionsModel``
+and ``RunConfig`` at import time. When several flows run in one process that means one
+connection pool per flow, repeated handshakes and no cap on concurrent requests. This
+module keeps one keep-alive client per process, limits connections per host and caps the
+number of in-flight model calls with an ``asyncio.Semaphore``.
+
+Usage:
+
+    from shared.provider import get_model, get_run_config
+
+    model = get_model()
+    config = get_run_config()
+
+Models and run configs can be created at import time: the client (and the API key check)
+is only needed by the first model call.
+
+Other modules add to the pooled model through ``add_hooks()`` (callbacks for slot waits,
+the first streamed token and the stream itself) and ``add_model_wrapper()`` (a ``Model``
+around every model ``get_model()`` returns), so the provider doesn't depend on them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import time
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, replace
+from typing import Any
+
+import httpx
+from dotenv import load_dotenv
+from agents import AsyncOpenAI, Model, ModelProvider, OpenAIChatCompletionsModel
+from agents.items import TResponseStreamEvent
+from agents.run import RunConfig
+
+# Load the environment variables from the .env file
+load_dotenv()
+
+#Reference: https://ai.google.dev/gemini-api/docs/openai
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+
+@dataclass(frozen=True)
+class ProviderSettings:
+    """Connection and concurrency settings for the shared client."""
+
+    api_key: str | None = None
+    """Defaults to the ``GEMINI_API_KEY`` environment variable."""
+
+    base_url: str | None = None
+    """Defaults to ``GEMINI_BASE_URL`` from the environment, then the Gemini endpoint."""
+
+    model: str = DEFAULT_MODEL
+    max_connections: int = 100
+    max_keepalive_connections: int = 50
+    max_connections_per_host: int = 50
+    keepalive_expiry: float = 30.0
+    max_in_flight: int = 64
+    """Maximum number of model calls awaiting a response at the same time."""
+
+    timeout: float = 60.0
+
+
+@dataclass
+class PoolStats:
+    """Contention on the shared client, since the last ``configure()`` or ``reset_pool_stats()``."""
+
+    model_calls: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    slot_waits: int = 0
+    """Model calls that found all ``max_in_flight`` slots taken."""
+
+    slot_wait_seconds: float = 0.0
+    max_slot_wait: float = 0.0
+    host_waits: int = 0
+    """HTTP requests that found all ``max_connections_per_host`` slots taken."""
+
+    host_wait_seconds: float = 0.0
+
+
+StreamWrapper = Callable[[AsyncIterator[TResponseStreamEvent]], AsyncIterator[TResponseStreamEvent]]
+
+
+@dataclass(frozen=True)
+class ModelHooks:
+    """Callbacks of the pooled model. They run in the context of the run making the call."""
+
+    on_slot: Callable[[float], None] | None = None
+    """Called with the seconds a model call waited for its in-flight slot."""
+
+    on_first_token: Callable[[], None] | None = None
+    """Called when a streamed model call produces its first delta."""
+
+    wrap_stream: StreamWrapper | None = None
+    """Wraps the events of a streamed model call, e.g. to filter them or pause the stream.
+    Returning the events unchanged costs nothing per event."""
+
+
+# Responses opened by the model call running in this context, so a stream that is
+# abandoned (its run cancelled) can close its HTTP response instead of leaving it to GC
+_open_responses: contextvars.ContextVar[list[httpx.Response] | None] = contextvars.ContextVar(
+    "open_responses", default=None
+)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release) -> None:
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class _PerHostLimitTransport(httpx.AsyncBaseTransport):
+    """Caps open requests per host. The slot is held until the response body is closed,
+    so streamed responses count against the limit for as long as they are being read."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, limit: int) -> None:
+        self._transport = transport
+        self._limit = limit
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        semaphore = self._semaphores.get(request.url.host)
+        if semaphore is None:
+            semaphore = self._semaphores[request.url.host] = asyncio.Semaphore(self._limit)
+
+        if semaphore.locked():
+            start = time.perf_counter()
+            await semaphore.acquire()
+            _pool_stats.host_waits += 1
+            _pool_stats.host_wait_seconds += time.perf_counter() - start
+        else:
+            await semaphore.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, semaphore.release)
+        responses = _open_responses.get()
+        if responses is not None:
+            responses.append(response)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+async def _report_first_token(
+    events: AsyncIterator[TResponseStreamEvent], callbacks: list[Callable[[], None]]
+) -> AsyncIterator[TResponseStreamEvent]:
+    async for event in events:
+        if event.type.endswith(".delta"):
+            for callback in callbacks:
+                callback()
+            yield event
+            break
+        yield event
+    async for event in events:
+        yield event
+
+
+class PooledChatCompletionsModel(OpenAIChatCompletionsModel):
+    """``OpenAIChatCompletionsModel`` that waits for an in-flight slot before calling the API.
+    The shared client and semaphore are looked up on each call, so a model created before
+    ``configure()`` or ``aclose()`` keeps working, and none is needed to create it."""
+
+    def __init__(self, model: str) -> None:
+        super().__init__(model=model, openai_client=None)
+
+    async def _acquire(self) -> asyncio.Semaphore:
+        # Before the slot wait, so a missing API key fails fast
+        self._client = get_client()
+        semaphore = _get_semaphore()
+        start = time.perf_counter()
+        contended = semaphore.locked()
+        await semaphore.acquire()
+        waited = time.perf_counter() - start
+        for hooks in _hooks:
+            if hooks.on_slot is not None:
+                hooks.on_slot(waited)
+        stats = _pool_stats
+        stats.model_calls += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        if contended:
+            stats.slot_waits += 1
+            stats.slot_wait_seconds += waited
+            stats.max_slot_wait = max(stats.max_slot_wait, waited)
+        return semaphore
+
+    def _release(self, semaphore: asyncio.Semaphore) -> None:
+        _pool_stats.in_flight -= 1
+        semaphore.release()
+
+    async def get_response(self, *args: Any, **kwargs: Any):
+        semaphore = await self._acquire()
+        try:
+            return await super().get_response(*args, **kwargs)
+        finally:
+            self._release(semaphore)
+
+    async def stream_response(self, *args: Any, **kwargs: Any):
+        semaphore = await self._acquire()
+        responses: list[httpx.Response] = []
+        token = _open_responses.set(responses)
+        try:
+            events = super().stream_response(*args, **kwargs)
+            first_token = [hooks.on_first_token for hooks in _hooks if hooks.on_first_token is not None]
+            if first_token:
+                events = _report_first_token(events, first_token)
+            for hooks in _hooks:
+                if hooks.wrap_stream is not None:
+                    events = hooks.wrap_stream(events)
+            async for event in events:
+                yield event
+        finally:
+            # A cancelled stream stops here: close the response so the server stops generating
+            for response in responses:
+                if not response.is_closed:
+                    await response.aclose()
+            try:
+                _open_responses.reset(token)
+            except ValueError:
+                # Closed by the garbage collector, from another context
+                pass
+            self._release(semaphore)
+
+
+_settings = ProviderSettings()
+_client: AsyncOpenAI | None = None
+_semaphore: asyncio.Semaphore | None = None
+_models: dict[str, Model] = {}
+_pool_stats = PoolStats()
+_hooks: list[ModelHooks] = []
+_model_wrappers: list[Callable[[Model], Model]] = []
+
+
+def configure(settings: ProviderSettings | None = None, **overrides: Any) -> ProviderSettings:
+    """Replace the shared settings. Must be called before the first model call, since
+    the existing client (if any) is dropped and rebuilt on next use."""
+    global _settings, _client, _semaphore
+    _settings = replace(settings or _settings, **overrides)
+    _client = None
+    _semaphore = None
+    _models.clear()
+    reset_pool_stats()
+    return _settings
+
+
+def pool_stats() -> PoolStats:
+    """Return the live contention counters of the shared client."""
+    return _pool_stats
+
+
+def reset_pool_stats() -> PoolStats:
+    """Start counting from zero; returns the counters up to now."""
+    global _pool_stats
+    # Calls still in flight will decrement the new counter when they finish
+    in_flight = _pool_stats.in_flight
+    previous, _pool_stats = _pool_stats, PoolStats(in_flight=in_flight, peak_in_flight=in_flight)
+    return previous
+
+
+def get_client() -> AsyncOpenAI:
+    """Return the process-wide pooled client, creating it on first use."""
+    global _client
+    if _client is None:
+        api_key = _settings.api_key or os.getenv("GEMINI_API_KEY")
+
+        # Check if the API key is present; if not, raise an error
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")
+
+        limits = httpx.Limits(
+            max_connections=_settings.max_connections,
+            max_keepalive_connections=_settings.max_keepalive_connections,
+            keepalive_expiry=_settings.keepalive_expiry,
+        )
+        transport = _PerHostLimitTransport(
+            httpx.AsyncHTTPTransport(limits=limits),
+            _settings.max_connections_per_host,
+        )
+        _client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=_settings.base_url or os.getenv("GEMINI_BASE_URL") or GEMINI_BASE_URL,
+            http_client=httpx.AsyncClient(
+                transport=transport,
+                timeout=_settings.timeout,
+                follow_redirects=True,
+            ),
+        )
+    return _client
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(_settings.max_in_flight)
+    return _semaphore
+
+
+def get_model(name: str | None = None) -> Model:
+    """Return the shared model for ``name`` (defaults to the configured model)."""
+    name = name or _settings.model
+    if name not in _models:
+        model: Model = PooledChatCompletionsModel(name)
+        for wrapper in _model_wrappers:
+            model = wrapper(model)
+        _models[name] = model
+    return _models[name]
+
+
+def add_hooks(hooks: ModelHooks) -> None:
+    """Call ``hooks`` on every pooled model call from now on."""
+    if hooks not in _hooks:
+        _hooks.append(hooks)
+
+
+def remove_hooks(hooks: ModelHooks) -> None:
+    if hooks in _hooks:
+        _hooks.remove(hooks)
+
+
+def add_model_wrapper(wrapper: Callable[[Model], Model]) -> None:
+    """Wrap every model ``get_model()`` returns from now on, e.g. ``lambda model:
+    CachedModel(model, cache)``. Models returned before keep their old wrapping."""
+    if wrapper not in _model_wrappers:
+        _model_wrappers.append(wrapper)
+        _models.clear()
+
+
+def remove_model_wrapper(wrapper: Callable[[Model], Model]) -> None:
+    if wrapper in _model_wrappers:
+        _model_wrappers.remove(wrapper)
+        _models.clear()
+
+
+class PooledModelProvider(ModelProvider):
+    """Resolves model names to the shared pooled models."""
+
+    def get_model(self, model_name: str | None) -> Model:
+        return get_model(model_name)
+
+
+def get_provider() -> PooledModelProvider:
+    return PooledModelProvider()
+
+
+def get_run_config(**kwargs: Any) -> RunConfig:
+    """Build a ``RunConfig`` that uses the shared model. Keyword arguments are passed to
+    ``RunConfig``; tracing is disabled unless ``tracing_disabled`` is given."""
+    kwargs.setdefault("model", get_model())
+    kwargs.setdefault("model_provider", get_provider())
+    kwargs.setdefault("tracing_disabled", True)
+    return RunConfig(**kwargs)
+
+
+async def aclose() -> None:
+    """Close the shared client and its connection pool. The next model call opens new
+    ones, with a new semaphore, so another event loop can use them."""
+    global _client, _semaphore
+    _semaphore = None
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -0,0 +1,330 @@
+"""Opt-in response cache at the model layer.
+
+Regression and replay jobs send the same prompts through the same agents many times a
+day. ``CachedModel`` wraps any ``Model`` (normally the shared
+``OpenAIChatCompletionsModel``) and stores its responses under a stable hash of
+everything that affects the answer: model name, instructions, input items, tool and
+handoff schemas, the output type schema and the model settings. Streamed responses are
+stored as their event sequence and replayed event by event.
+
+Backends:
+
+- ``MemoryCache``: an in-process LRU.
+- ``SQLiteCache``: a file on local disk (memory-mapped reads via ``PRAGMA mmap_size``),
+  shared between processes and runs.
+
+Usage:
+
+    model = CachedModel(get_model(), SQLiteCache(".cache/responses.sqlite"), ttl=86400)
+
+or call ``enable_response_cache()`` once at startup: every model ``get_model()`` returns
+from then on is cached in the backend named by ``RESPONSE_CACHE`` (a SQLite path, or
+``:memory:`` for the LRU), and nothing is cached while it is unset. Use
+``model.bypass = True`` or ``with bypass_response_cache(): ...`` to force real calls.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from agents import FunctionTool, Handoff, Model, ModelResponse, ModelSettings, ModelTracing, Tool, Usage
+from agents.agent_output import AgentOutputSchemaBase
+from agents.items import TResponseInputItem, TResponseStreamEvent
+from openai.types.responses import ResponseOutputItem, ResponseStreamEvent
+from pydantic import BaseModel, TypeAdapter
+
+from . import provider
+
+_output_items = TypeAdapter(list[ResponseOutputItem])
+_stream_events = TypeAdapter(list[ResponseStreamEvent])
+
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("bypass_response_cache", default=False)
+
+
+@contextlib.contextmanager
+def bypass_response_cache() -> Iterator[None]:
+    """Skip every response cache for model calls made inside this block."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> str | None: ...
+
+    def set(self, key: str, value: str, ttl: float | None) -> None: ...
+
+
+class MemoryCache:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: str, value: str, ttl: float | None) -> None:
+        self._entries[key] = (value, time.time() + ttl if ttl else math.inf)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLiteCache:
+    """Responses stored in a local SQLite file. Safe to share between processes."""
+
+    def __init__(self, path: str | os.PathLike[str], mmap_size: int = 256 * 1024 * 1024) -> None:
+        self.path = os.fspath(path)
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        self._db.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM responses WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: float | None) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl if ttl else None),
+            )
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def open_cache(spec: str) -> CacheBackend:
+    """``":memory:"`` for an in-process LRU, anything else is a SQLite file path."""
+    return MemoryCache() if spec == ":memory:" else SQLiteCache(spec)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", exclude_unset=True)
+    return repr(value)
+
+
+def _tool_key(tool: Tool) -> dict[str, Any]:
+    if isinstance(tool, FunctionTool):
+        return {
+            "name": tool.name,
+            "description": tool.description,
+            "parameters": tool.params_json_schema,
+            "strict": tool.strict_json_schema,
+        }
+    return {"type": type(tool).__name__, "name": getattr(tool, "name", None)}
+
+
+def cache_key(
+    model_name: str,
+    system_instructions: str | None,
+    input: str | list[TResponseInputItem],
+    model_settings: ModelSettings,
+    tools: list[Tool],
+    output_schema: AgentOutputSchemaBase | None,
+    handoffs: list[Handoff],
+    stream: bool,
+) -> str:
+    """A stable SHA-256 of everything that can change the model's answer."""
+    payload = {
+        "model": model_name,
+        "instructions": system_instructions,
+        "input": input,
+        "settings": model_settings.to_json_dict(),
+        "tools": [_tool_key(tool) for tool in tools],
+        "output_schema": (
+            None
+            if output_schema is None or output_schema.is_plain_text()
+            else {"schema": output_schema.json_schema(), "strict": output_schema.is_strict_json_schema()}
+        ),
+        "handoffs": [
+            {"name": h.tool_name, "description": h.tool_description, "parameters": h.input_json_schema}
+            for h in handoffs
+        ],
+        "stream": stream,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=_json_default)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    bypassed: int = 0
+
+
+@dataclass
+class CachedModel(Model):
+    model: Model
+    backend: CacheBackend = field(default_factory=MemoryCache)
+    ttl: float | None = None
+    """Seconds a stored response stays valid. ``None`` never expires."""
+
+    bypass: bool = False
+    stats: ResponseCacheStats = field(default_factory=ResponseCacheStats)
+
+    @property
+    def model_name(self) -> str:
+        return str(getattr(self.model, "model", type(self.model).__name__))
+
+    def _key(self, args: tuple[Any, ...], stream: bool) -> str | None:
+        if self.bypass or _bypass.get():
+            self.stats.bypassed += 1
+            return None
+        system_instructions, input, model_settings, tools, output_schema, handoffs = args[:6]
+        return cache_key(
+            self.model_name, system_instructions, input, model_settings, tools, output_schema, handoffs, stream
+        )
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any = None,
+    ) -> ModelResponse:
+        args = (system_instructions, input, model_settings, tools, output_schema, handoffs, tracing)
+        key = self._key(args, stream=False)
+        if key is not None:
+            cached = self.backend.get(key)
+            if cached is not None:
+                self.stats.hits += 1
+                data = json.loads(cached)
+                return ModelResponse(
+                    output=_output_items.validate_python(data["output"]),
+                    usage=Usage(**data["usage"]),
+                    response_id=data["response_id"],
+                )
+            self.stats.misses += 1
+
+        response = await self.model.get_response(
+            *args, previous_response_id=previous_response_id, prompt=prompt
+        )
+        if key is not None:
+            usage = response.usage
+            self.backend.set(
+                key,
+                json.dumps(
+                    {
+                        "output": [item.model_dump(mode="json") for item in response.output],
+                        "usage": {
+                            "requests": usage.requests,
+                            "input_tokens": usage.input_tokens,
+                            "output_tokens": usage.output_tokens,
+                            "total_tokens": usage.total_tokens,
+                        },
+                        "response_id": response.response_id,
+                    }
+                ),
+                self.ttl,
+            )
+            self.stats.stores += 1
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any = None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        args = (system_instructions, input, model_settings, tools, output_schema, handoffs, tracing)
+        key = self._key(args, stream=True)
+        if key is not None:
+            cached = self.backend.get(key)
+            if cached is not None:
+                self.stats.hits += 1
+                for event in _stream_events.validate_json(cached):
+                    yield event
+                return
+            self.stats.misses += 1
+
+        events: list[TResponseStreamEvent] = []
+        completed = False
+        async for event in self.model.stream_response(
+            *args, previous_response_id=previous_response_id, prompt=prompt
+        ):
+            if key is not None:
+                events.append(event)
+                completed = completed or event.type == "response.completed"
+            yield event
+
+        # Only store streams that ran to completion
+        if key is not None and completed:
+            self.backend.set(key, _stream_events.dump_json(events).decode(), self.ttl)
+            self.stats.stores += 1
+
+
+_installed: Callable[[Model], Model] | None = None
+
+
+def enable_response_cache(spec: str | None = None, ttl: float | None = None) -> CacheBackend | None:
+    """Wrap every model ``shared.provider.get_model()`` returns from now on in a
+    ``CachedModel``. ``spec`` is a SQLite file path or ``":memory:"`` and defaults to the
+    ``RESPONSE_CACHE`` environment variable; with neither, nothing is cached. Calling it
+    again replaces the previous cache. Returns the backend."""
+    global _installed
+    if _installed is not None:
+        provider.remove_model_wrapper(_installed)
+        _installed = None
+    spec = spec or os.getenv("RESPONSE_CACHE")
+    if not spec:
+        return None
+    backend = open_cache(spec)
+
+    def wrap(model: Model) -> Model:
+        return CachedModel(model, backend, ttl=ttl)
+
+    provider.add_model_wrapper(wrap)
+    _installed = wrap
+    return backend
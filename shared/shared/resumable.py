@@ -0,0 +1,429 @@
+"""Resumable streamed runs: numbered events checkpointed to a local store.
+
+When the client of a streamed run disconnects halfway through a long answer, the run is
+abandoned and the retry generates it again, paying for the same model calls twice.
+``ResumableRuns`` keeps the run going without the client (on a ``BroadcastStream``) and
+checkpoints it as it goes:
+
+- every event gets a sequence number and is stored as a JSON frame (``to_frame``);
+- the run's input, each completed item (messages, tool calls and outputs, handoffs), the
+  current agent, the status and finally the final output are stored in a ``RunRecord``.
+
+``events(run_id, after=seq)`` resumes a client after the last sequence number it saw:
+stored frames first, then live ones while the run is still going. A completed run is
+only replayed from the store; ``start`` never runs it again. A run left ``"running"`` by
+a process that stopped is continued by ``start`` from its input plus the completed
+items, on the agent it had handed off to, so only the unfinished model call is repeated.
+Store reads and writes run in a worker thread, off the event loop.
+
+Continuing a run deletes the stored frames of the unfinished model call and sends a
+``{"type": "run_reset", "after": seq}`` frame: clients drop what they received after
+``seq`` (the partial answer) before the regenerated one arrives. The continuation is
+numbered from ``RESUME_SEQ_GAP`` past the last stored frame, beyond any frame the stopped
+process sent but hadn't checkpointed yet, so a client resuming from one of those still
+gets the reset.
+
+Stores:
+
+- ``MemoryCheckpointStore``: in-process, for a single server.
+- ``SQLiteCheckpointStore``: a local file that survives restarts.
+
+Usage:
+
+    runs = ResumableRuns(SQLiteCheckpointStore(".cache/runs.sqlite"))
+    await runs.start(request_id, agent, input="...")
+    async for seq, frame in runs.events(request_id, after=last_seen_seq):
+        send(seq, frame)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Literal, Protocol
+
+from agents import Agent, Handoff, Runner
+from agents.items import TResponseInputItem
+from agents.stream_events import StreamEvent
+from pydantic import BaseModel
+
+from .streaming import BroadcastStream, Subscriber
+
+
+# How far past its last stored frame a continued run starts numbering. A live process
+# can't have sent this many frames beyond its last checkpoint
+RESUME_SEQ_GAP = 1_000_000
+
+
+class RunFailed(Exception):
+    """Raised to a resuming client at the end of a run that failed or was cancelled."""
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+def to_frame(event: StreamEvent) -> dict[str, Any]:
+    """The JSON-ready form of an event, as stored and as sent to clients."""
+    if event.type == "raw_response_event":
+        return {"type": event.type, "data": event.data.model_dump(mode="json", exclude_unset=True)}
+    if event.type == "run_item_stream_event":
+        return {"type": event.type, "name": event.name, "item": event.item.to_input_item()}
+    return {"type": event.type, "agent": event.new_agent.name}
+
+
+@dataclass
+class RunRecord:
+    run_id: str
+    input: str | list[TResponseInputItem]
+    status: Literal["running", "completed", "failed"] = "running"
+    agent: str | None = None
+    """Name of the agent the run is on: the starting agent until a handoff."""
+
+    items: list[TResponseInputItem] = field(default_factory=list)
+    """Input items of every item the run completed so far."""
+
+    last_seq: int = -1
+    items_seq: int = -1
+    """Sequence number of the last completed item. Later frames belong to a model call
+    that may not have finished."""
+
+    final_output: Any = None
+    """Structured outputs are stored as their JSON form."""
+
+    error: str | None = None
+    updated_at: float = field(default_factory=time.time)
+
+    def resume_input(self) -> list[TResponseInputItem]:
+        """The original input followed by the completed items."""
+        if isinstance(self.input, str):
+            return [{"role": "user", "content": self.input}, *self.items]
+        return [*self.input, *self.items]
+
+
+class CheckpointStore(Protocol):
+    def load(self, run_id: str) -> RunRecord | None: ...
+
+    def save(self, record: RunRecord, frames: list[tuple[int, str]]) -> None:
+        """Store ``record`` and append ``frames`` (sequence number, JSON) in one step."""
+
+    def frames(self, run_id: str, after: int) -> list[tuple[int, str]]: ...
+
+    def truncate(self, run_id: str, after: int) -> None:
+        """Delete the frames of ``run_id`` after sequence number ``after``."""
+
+
+class MemoryCheckpointStore:
+    """Records and frames of the last ``max_runs`` runs, in process."""
+
+    def __init__(self, max_runs: int = 1024) -> None:
+        self.max_runs = max_runs
+        # ResumableRuns calls the store from worker threads
+        self._lock = threading.Lock()
+        self._runs: OrderedDict[str, tuple[RunRecord, list[tuple[int, str]]]] = OrderedDict()
+
+    def load(self, run_id: str) -> RunRecord | None:
+        with self._lock:
+            entry = self._runs.get(run_id)
+            return replace(entry[0], items=list(entry[0].items)) if entry else None
+
+    def save(self, record: RunRecord, frames: list[tuple[int, str]]) -> None:
+        with self._lock:
+            stored = self._runs.pop(record.run_id, (None, []))[1]
+            stored.extend(frames)
+            self._runs[record.run_id] = (replace(record, items=list(record.items)), stored)
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+
+    def frames(self, run_id: str, after: int) -> list[tuple[int, str]]:
+        with self._lock:
+            entry = self._runs.get(run_id)
+            return [frame for frame in entry[1] if frame[0] > after] if entry else []
+
+    def truncate(self, run_id: str, after: int) -> None:
+        with self._lock:
+            entry = self._runs.get(run_id)
+            if entry is not None:
+                entry[1][:] = [frame for frame in entry[1] if frame[0] <= after]
+
+
+class SQLiteCheckpointStore:
+    """Records and frames in a local SQLite file. Runs older than ``ttl`` seconds are
+    removed when the store is opened."""
+
+    def __init__(self, path: str | os.PathLike[str], ttl: float | None = 7 * 86400) -> None:
+        self.path = os.fspath(path)
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, record TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS frames (run_id TEXT NOT NULL, seq INTEGER NOT NULL, frame TEXT NOT NULL,"
+            " PRIMARY KEY (run_id, seq)) WITHOUT ROWID"
+        )
+        if ttl:
+            expired = time.time() - ttl
+            self._db.execute(
+                "DELETE FROM frames WHERE run_id IN (SELECT run_id FROM runs WHERE updated_at <= ?)", (expired,)
+            )
+            self._db.execute("DELETE FROM runs WHERE updated_at <= ?", (expired,))
+
+    def load(self, run_id: str) -> RunRecord | None:
+        with self._lock:
+            row = self._db.execute("SELECT record FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return RunRecord(**json.loads(row[0])) if row else None
+
+    def save(self, record: RunRecord, frames: list[tuple[int, str]]) -> None:
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO frames (run_id, seq, frame) VALUES (?, ?, ?)",
+                    [(record.run_id, seq, frame) for seq, frame in frames],
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO runs (run_id, record, updated_at) VALUES (?, ?, ?)",
+                    (record.run_id, json.dumps(asdict(record), default=_json_default), record.updated_at),
+                )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def frames(self, run_id: str, after: int) -> list[tuple[int, str]]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT seq, frame FROM frames WHERE run_id = ? AND seq > ? ORDER BY seq", (run_id, after)
+            ).fetchall()
+
+    def truncate(self, run_id: str, after: int) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM frames WHERE run_id = ? AND seq > ?", (run_id, after))
+
+    def close(self) -> None:
+        self._db.close()
+
+
+@dataclass
+class ResumeStats:
+    runs_started: int = 0
+    runs_continued: int = 0
+    """Runs left unfinished by an earlier process, continued from their last completed item."""
+
+    runs_reused: int = 0
+    """``start`` calls for a run that was already live or finished: no model call."""
+
+    frames_stored: int = 0
+    frames_replayed: int = 0
+    """Frames sent to resuming clients from the store."""
+
+
+def find_agent(starting_agent: Agent[Any], name: str, agents: Sequence[Agent[Any]] = ()) -> Agent[Any] | None:
+    """The agent called ``name``: one of ``agents``, or one reachable from ``starting_agent``
+    through handoffs. A ``Handoff`` built with ``handoff()`` doesn't expose its agent, so
+    agents behind those have to be passed in ``agents``."""
+    seen: set[int] = set()
+    queue: list[Agent[Any]] = [*agents, starting_agent]
+    while queue:
+        agent = queue.pop(0)
+        if id(agent) in seen:
+            continue
+        seen.add(id(agent))
+        if agent.name == name:
+            return agent
+        queue.extend(target for target in agent.handoffs if not isinstance(target, Handoff))
+    return None
+
+
+class ResumableRuns:
+    """Streamed runs keyed by a caller-chosen ``run_id`` (a request or message id).
+
+    Frames are written every ``flush_every`` events and at every completed item.
+    ``stale_after`` is how long a ``"running"`` record must go without a checkpoint
+    before ``start`` treats its process as gone and continues the run here.
+    """
+
+    def __init__(
+        self,
+        store: CheckpointStore,
+        flush_every: int = 32,
+        replay_size: int = 1024,
+        stale_after: float = 300.0,
+        poll_interval: float = 0.5,
+    ) -> None:
+        self.store = store
+        self.flush_every = flush_every
+        self.replay_size = replay_size
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self.stats = ResumeStats()
+        self._live: dict[str, tuple[RunRecord, BroadcastStream, asyncio.Task[None]]] = {}
+        self._starting = asyncio.Lock()
+
+    async def get(self, run_id: str) -> RunRecord | None:
+        if run_id in self._live:
+            return self._live[run_id][0]
+        return await asyncio.to_thread(self.store.load, run_id)
+
+    async def start(
+        self,
+        run_id: str,
+        agent: Agent[Any],
+        input: str | list[TResponseInputItem],
+        agents: Sequence[Agent[Any]] = (),
+        **kwargs: Any,
+    ) -> RunRecord:
+        """Start ``run_id`` with ``Runner.run_streamed`` unless it is live, finished or
+        still checkpointed by another process. A continued run restarts on the agent it
+        was on, looked up with ``find_agent(agent, name, agents)``. ``kwargs`` go to
+        ``run_streamed``."""
+        # One start at a time decides whether a run goes live: two concurrent starts of
+        # the same stale run would otherwise both continue it
+        async with self._starting:
+            if run_id in self._live:
+                self.stats.runs_reused += 1
+                return self._live[run_id][0]
+            record = await asyncio.to_thread(self.store.load, run_id)
+            if record is not None and (
+                record.status != "running" or time.time() - record.updated_at < self.stale_after
+            ):
+                self.stats.runs_reused += 1
+                return record
+            if record is None:
+                record = RunRecord(run_id, input, agent=agent.name)
+                await asyncio.to_thread(self.store.save, record, [])
+                self.stats.runs_started += 1
+                run_agent, run_input = agent, input
+            else:
+                run_agent = find_agent(agent, record.agent, agents) if record.agent else agent
+                if run_agent is None:
+                    raise ValueError(
+                        f"Run {run_id!r} was on agent {record.agent!r}, which isn't reachable from {agent.name!r}"
+                    )
+                self.stats.runs_continued += 1
+                run_input = record.resume_input()
+                await asyncio.to_thread(self._reset, record)
+            broadcast = BroadcastStream(
+                Runner.run_streamed(run_agent, run_input, **kwargs), self.replay_size, first_seq=record.last_seq + 1
+            )
+            # The checkpoint subscriber is unbounded: it has to see every event
+            subscriber = broadcast.subscribe(max_queue=sys.maxsize)
+            task = asyncio.create_task(self._checkpoint(record, broadcast, subscriber))
+            self._live[run_id] = (record, broadcast, task)
+        return record
+
+    def _reset(self, record: RunRecord) -> None:
+        """The stopped process's partial answer is regenerated: tell clients to drop it."""
+        self.store.truncate(record.run_id, record.items_seq)
+        record.last_seq += RESUME_SEQ_GAP
+        record.updated_at = time.time()
+        reset = {"type": "run_reset", "after": record.items_seq}
+        self.store.save(record, [(record.last_seq, json.dumps(reset))])
+
+    async def _checkpoint(self, record: RunRecord, broadcast: BroadcastStream, subscriber: Subscriber) -> None:
+        pending: list[tuple[int, str]] = []
+
+        async def flush() -> None:
+            record.updated_at = time.time()
+            # Snapshots: the run goes on while the worker thread writes them
+            frames = list(pending)
+            pending.clear()
+            await asyncio.to_thread(self.store.save, replace(record, items=list(record.items)), frames)
+            self.stats.frames_stored += len(frames)
+
+        try:
+            async for event in subscriber:
+                frame = to_frame(event)
+                record.last_seq = subscriber.position
+                pending.append((record.last_seq, json.dumps(frame, default=_json_default)))
+                if event.type == "agent_updated_stream_event":
+                    record.agent = event.new_agent.name
+                elif event.type == "run_item_stream_event":
+                    record.items.append(frame["item"])
+                    record.items_seq = record.last_seq
+                    await flush()
+                elif len(pending) >= self.flush_every:
+                    await flush()
+        except Exception as e:
+            record.status = "failed"
+            record.error = f"{type(e).__name__}: {e}"
+        else:
+            if record.status == "running":
+                record.status = "completed"
+                record.final_output = broadcast.result.final_output
+        finally:
+            try:
+                await flush()
+            finally:
+                self._live.pop(record.run_id, None)
+
+    async def events(self, run_id: str, after: int = -1) -> AsyncIterator[tuple[int, dict[str, Any]]]:
+        """``(seq, frame)`` for every event of ``run_id`` after ``after``. Raises ``KeyError``
+        for an unknown run, and ``RunFailed`` (or the run's own error, while it is live
+        here) at the end of a failed one."""
+        position = after
+        if run_id in self._live:
+            record, broadcast, _ = self._live[run_id]
+            # Subscribe before reading the store so no event falls between the two
+            subscriber = broadcast.subscribe(replay=after + 1)
+            try:
+                for seq, frame in await asyncio.to_thread(self.store.frames, run_id, after):
+                    position = seq
+                    self.stats.frames_replayed += 1
+                    yield seq, json.loads(frame)
+                async for event in subscriber:
+                    if subscriber.position > position:
+                        position = subscriber.position
+                        yield position, to_frame(event)
+            finally:
+                subscriber.close()
+            if record.status == "failed":
+                raise RunFailed(record.error)
+            return
+
+        # Finished, or checkpointed by another process: follow the store
+        while True:
+            record = await asyncio.to_thread(self.store.load, run_id)
+            if record is None:
+                raise KeyError(run_id)
+            for seq, frame in await asyncio.to_thread(self.store.frames, run_id, position):
+                position = seq
+                self.stats.frames_replayed += 1
+                yield seq, json.loads(frame)
+            if record.status != "running":
+                break
+            await asyncio.sleep(self.poll_interval)
+        if record.status == "failed":
+            raise RunFailed(record.error)
+
+    async def wait(self, run_id: str) -> RunRecord:
+        """Wait for ``run_id`` to finish here, if it is live, and return its record."""
+        if run_id in self._live:
+            await asyncio.shield(self._live[run_id][2])
+        record = await asyncio.to_thread(self.store.load, run_id)
+        if record is None:
+            raise KeyError(run_id)
+        return record
+
+    def cancel(self, run_id: str) -> None:
+        """Stop a live run; it is recorded as failed and clients get ``RunFailed``."""
+        if run_id in self._live:
+            record, broadcast, _ = self._live[run_id]
+            record.status = "failed"
+            record.error = "Cancelled"
+            broadcast.cancel()
@@ -0,0 +1,212 @@
+"""Deterministic fast path for triage handoffs.
+
+A triage agent like the ``Assistant`` in 05_handoffs spends a whole model turn deciding
+to call ``transfer_to_urdu_agent``, and only then does the target agent answer.
+``FastPathRouter`` wraps the triage agent's model and runs cheap local checks (script
+detection, keywords, a small classifier; the same ``Check`` objects as
+``TieredGuardrail``) on the new user message first. When one route is confident, it
+returns the handoff call itself, without a request, so the SDK performs a normal handoff:
+``on_handoff`` callbacks, input filters, tracing and ``result.last_agent`` all behave as
+if the model had chosen it. Otherwise the wrapped model triages as usual.
+
+Usage:
+
+    router = FastPathRouter(get_model(), {
+        "Urdu Agent": [ScriptCheck(ARABIC_SCRIPT, Verdict.passed("Urdu script"), marker_chars=URDU_LETTERS)],
+        "Arabic Agent": [
+            ScriptCheck(ARABIC_SCRIPT, Verdict.passed("Arabic script"), marker_chars=ARABIC_LETTERS, excluded_chars=PERSO_URDU_LETTERS)
+        ],
+    })
+    triage = Agent(name="Assistant", model=router, handoffs=[urdu_agent, arabic_agent])
+
+Routes are keyed by the target agent's name and tried in order. Any verdict a check
+returns counts as a match; only its confidence matters.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from collections import Counter
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from agents import Handoff, Model, ModelResponse, ModelSettings, ModelTracing, Tool, Usage
+from agents.agent_output import AgentOutputSchemaBase
+from agents.items import TResponseInputItem, TResponseStreamEvent
+from agents.models.fake_id import FAKE_RESPONSES_ID
+from openai.types.responses import Response, ResponseCompletedEvent, ResponseFunctionToolCall
+
+from .guardrail_cache import input_text
+from .tiered_guardrail import Check, Verdict
+
+
+@dataclass
+class RouterStats:
+    routed: Counter[str] = field(default_factory=Counter)
+    """Fast-path handoffs, by target agent."""
+
+    fallbacks: int = 0
+    """Triage turns that went to the model."""
+
+    local_seconds: float = 0.0
+    triage_seconds: float = 0.0
+    """Time spent in model triage turns."""
+
+    @property
+    def mean_triage_seconds(self) -> float:
+        return self.triage_seconds / self.fallbacks if self.fallbacks else 0.0
+
+    @property
+    def saved_per_request(self) -> float:
+        """Estimated routing latency removed per routed request: a model triage turn
+        minus the local checks."""
+        total = sum(self.routed.values()) + self.fallbacks
+        return self.mean_triage_seconds - (self.local_seconds / total if total else 0.0)
+
+    @property
+    def saved_seconds(self) -> float:
+        return self.saved_per_request * sum(self.routed.values())
+
+
+def _new_message(input: str | list[TResponseInputItem]) -> str | None:
+    """The user message this turn answers, or ``None`` if the turn continues earlier
+    work (e.g. after a tool call)."""
+    if isinstance(input, str):
+        return input
+    if not input:
+        return None
+    last = input[-1]
+    role = last.get("role") if isinstance(last, dict) else getattr(last, "role", None)
+    return input_text([last]) if role == "user" else None
+
+
+@dataclass
+class FastPathRouter(Model):
+    model: Model
+    routes: dict[str, list[Check]]
+    """Target agent name -> checks that send the message straight to it."""
+
+    min_confidence: float = 0.9
+    stats: RouterStats = field(default_factory=RouterStats)
+
+    def route(self, text: str) -> tuple[str, Verdict] | None:
+        """The target agent name and the deciding verdict, or ``None`` to use the model."""
+        for agent_name, checks in self.routes.items():
+            for check in checks:
+                verdict = check(text)
+                if verdict is not None and verdict.confidence >= self.min_confidence:
+                    return agent_name, replace(verdict, check=check.name)
+        return None
+
+    def _fast_path(
+        self, input: str | list[TResponseInputItem], handoffs: list[Handoff]
+    ) -> ResponseFunctionToolCall | None:
+        text = _new_message(input)
+        if text is None:
+            return None
+        start = time.perf_counter()
+        decision = self.route(text)
+        self.stats.local_seconds += time.perf_counter() - start
+        if decision is None:
+            return None
+        for handoff in handoffs:
+            # Handoffs that need arguments from the model can't be routed locally
+            if handoff.agent_name == decision[0] and not handoff.input_json_schema.get("required"):
+                self.stats.routed[handoff.agent_name] += 1
+                return ResponseFunctionToolCall(
+                    id=FAKE_RESPONSES_ID,
+                    call_id=f"call_fastpath_{uuid.uuid4().hex[:24]}",
+                    name=handoff.tool_name,
+                    arguments="{}",
+                    type="function_call",
+                )
+        return None
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any = None,
+    ) -> ModelResponse:
+        call = self._fast_path(input, handoffs)
+        if call is not None:
+            return ModelResponse(output=[call], usage=Usage(), response_id=None)
+
+        start = time.perf_counter()
+        try:
+            return await self.model.get_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                previous_response_id=previous_response_id,
+                prompt=prompt,
+            )
+        finally:
+            self._record_fallback(input, start)
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any = None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        call = self._fast_path(input, handoffs)
+        if call is not None:
+            yield ResponseCompletedEvent(
+                type="response.completed",
+                sequence_number=0,
+                response=Response(
+                    id=FAKE_RESPONSES_ID,
+                    created_at=time.time(),
+                    model=str(getattr(self.model, "model", "fast-path")),
+                    object="response",
+                    output=[call],
+                    tool_choice="auto",
+                    tools=[],
+                    parallel_tool_calls=False,
+                ),
+            )
+            return
+
+        start = time.perf_counter()
+        try:
+            async for event in self.model.stream_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                previous_response_id=previous_response_id,
+                prompt=prompt,
+            ):
+                yield event
+        finally:
+            self._record_fallback(input, start)
+
+    def _record_fallback(self, input: str | list[TResponseInputItem], start: float) -> None:
+        # Only first turns on a new message are triage; later turns aren't comparable
+        if _new_message(input) is not None:
+            self.stats.fallbacks += 1
+            self.stats.triage_seconds += time.perf_counter() - start
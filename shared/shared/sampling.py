@@ -0,0 +1,330 @@
+"""Head and tail sampling in front of trace processors.
+
+Tracing is all or nothing by default: ``tracing_disabled=True`` or every span of every run.
+``SamplingTraceProcessor`` wraps the real processors (normally a
+``BatchingTraceProcessor``) and forwards only the traces it decides to keep:
+
+- Head sampling keeps a random ``head_rate`` share of traces. ``agent_rate_limits`` then
+  caps the kept traces per second for each starting agent (token buckets keyed by agent
+  name; agents without an entry share the ``"*"`` bucket). The decision is made at the first agent span, so the
+  agent's name is known.
+- Tail sampling (``tail=TailPolicy(...)``) buffers the traces that head sampling skipped
+  and keeps one at ``on_trace_end`` if it was slow, had a span error or tripped a
+  guardrail.
+
+Buffers are bounded. A trace keeps at most ``max_spans_per_trace`` spans, and the oldest
+buffered trace is evicted once ``max_buffered_spans`` is reached across all traces.
+
+A processor only sees spans after the SDK has built them: ids, timestamps and span data
+for every span of every run. ``install()`` replaces the SDK's trace provider with one that
+rolls the head decision when a trace is created. A trace that loses the roll is a no-op
+trace, so its spans are never created and it costs about as much as disabled tracing.
+Tail sampling has to see every span, so with ``tail`` set every trace is still recorded.
+The new provider starts from ``OPENAI_AGENTS_DISABLE_TRACING``, as the SDK's does, unless
+``install(tracing_disabled=...)`` says otherwise; ``set_tracing_disabled()`` and
+``RunConfig.tracing_disabled`` work on it as usual.
+
+Usage:
+
+    sampler = SamplingTraceProcessor(
+        [BatchingTraceProcessor(JSONLExporter("traces/traces.jsonl"))],
+        head_rate=0.01,
+        agent_rate_limits={"*": 5.0},
+    ).install()
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents.tracing import Span, Trace, set_trace_provider
+from agents.tracing.processor_interface import TracingProcessor
+from agents.tracing.provider import DefaultTraceProvider
+from agents.tracing.span_data import AgentSpanData, GuardrailSpanData
+from agents.tracing.traces import NoOpTrace
+
+
+@dataclass
+class TailPolicy:
+    slow_seconds: float | None = 5.0
+    """Keep traces that took at least this long. ``None`` disables the check."""
+
+    errors: bool = True
+    guardrail_trips: bool = True
+
+
+@dataclass
+class SamplingStats:
+    traces: int = 0
+    head_sampled: int = 0
+    rate_limited: int = 0
+    tail_kept: Counter[str] = field(default_factory=Counter)
+    """Traces kept by tail sampling, by reason: ``"slow"``, ``"error"``, ``"guardrail"``."""
+
+    dropped: int = 0
+    unrecorded: int = 0
+    """Dropped traces that were never recorded, because ``install()`` skipped them at creation."""
+
+    evicted: int = 0
+    """Buffered traces dropped to stay within ``max_buffered_spans``."""
+
+    truncated_spans: int = 0
+    peak_buffered_spans: int = 0
+
+
+class _TokenBucket:
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+@dataclass
+class _TraceState:
+    trace: Trace
+    started: float
+    decided: bool = False
+    sampled: bool = False
+    events: list[tuple[bool, Span[Any]]] = field(default_factory=list)
+    """Buffered ``(is_start, span)`` callbacks, replayed in order if the trace is kept."""
+
+    keep_reason: str | None = None
+
+
+class SamplingTraceProcessor(TracingProcessor):
+    def __init__(
+        self,
+        processors: Sequence[TracingProcessor],
+        head_rate: float = 1.0,
+        agent_rate_limits: dict[str, float] | None = None,
+        tail: TailPolicy | None = None,
+        max_buffered_spans: int = 10_000,
+        max_spans_per_trace: int = 1_000,
+        seed: int | None = None,
+    ) -> None:
+        self.processors = list(processors)
+        self.head_rate = head_rate
+        self.agent_rate_limits = agent_rate_limits or {}
+        self.tail = tail
+        self.max_buffered_spans = max_buffered_spans
+        self.max_spans_per_trace = max_spans_per_trace
+        self.stats = SamplingStats()
+
+        self._random = random.Random(seed)
+        self._buckets: dict[str, _TokenBucket] = {}
+        self._traces: OrderedDict[str, _TraceState] = OrderedDict()
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self._rolled_at_creation = False
+
+    def install(self, tracing_disabled: bool | None = None) -> SamplingTraceProcessor:
+        """Make this sampler the only trace processor, behind a provider that skips traces
+        losing the head roll before any of their spans are created. ``tracing_disabled``
+        defaults to the ``OPENAI_AGENTS_DISABLE_TRACING`` environment variable. Returns ``self``."""
+        if tracing_disabled is None:
+            tracing_disabled = os.environ.get("OPENAI_AGENTS_DISABLE_TRACING", "false").lower() in ("true", "1")
+        set_trace_provider(_SamplingTraceProvider(self, tracing_disabled))
+        # Without tail sampling, skipped traces need no recording at all
+        self._rolled_at_creation = self.tail is None
+        return self
+
+    def _record(self) -> bool:
+        """The head roll for a trace being created. ``False`` skips the whole trace."""
+        if not self._rolled_at_creation:
+            return True
+        with self._lock:
+            if self._random.random() < self.head_rate:
+                return True
+            self.stats.traces += 1
+            self.stats.dropped += 1
+            self.stats.unrecorded += 1
+            return False
+
+    def _head_decision(self, agent_name: str | None) -> bool:
+        # Traces recorded by the provider have already won the roll
+        if not self._rolled_at_creation and self._random.random() >= self.head_rate:
+            return False
+        # Agents without a limit of their own share the "*" bucket
+        key = agent_name if agent_name in self.agent_rate_limits else "*"
+        rate = self.agent_rate_limits.get(key)
+        if rate is None:
+            return True
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _TokenBucket(rate)
+        if bucket.take():
+            return True
+        self.stats.rate_limited += 1
+        return False
+
+    def _decide(self, state: _TraceState, agent_name: str | None) -> list[tuple[bool, Span[Any]]]:
+        """Make the head decision. Returns the buffered callbacks to forward, if sampled."""
+        state.decided = True
+        state.sampled = self._head_decision(agent_name)
+        if state.sampled:
+            self.stats.head_sampled += 1
+            events, state.events = state.events, []
+            self._buffered -= len(events)
+            return events
+        if self.tail is None:
+            self._buffered -= len(state.events)
+            state.events = []
+        return []
+
+    def _buffer(self, state: _TraceState, is_start: bool, span: Span[Any]) -> None:
+        if len(state.events) >= self.max_spans_per_trace:
+            self.stats.truncated_spans += 1
+            return
+        state.events.append((is_start, span))
+        self._buffered += 1
+        self.stats.peak_buffered_spans = max(self.stats.peak_buffered_spans, self._buffered)
+        while self._buffered > self.max_buffered_spans:
+            # Sampled traces hold no buffer and must stay, so skip past them
+            oldest = next((trace_id for trace_id, other in self._traces.items() if other.events), None)
+            if oldest is None:
+                break
+            self._buffered -= len(self._traces.pop(oldest).events)
+            self.stats.evicted += 1
+
+    def _tail_reason(self, state: _TraceState, span: Span[Any]) -> str | None:
+        if self.tail is None:
+            return None
+        if self.tail.errors and span.error is not None:
+            return "error"
+        if self.tail.guardrail_trips and isinstance(span.span_data, GuardrailSpanData) and span.span_data.triggered:
+            return "guardrail"
+        return None
+
+    def _replay(self, trace: Trace | None, events: list[tuple[bool, Span[Any]]]) -> None:
+        for processor in self.processors:
+            if trace is not None:
+                processor.on_trace_start(trace)
+            for is_start, span in events:
+                if is_start:
+                    processor.on_span_start(span)
+                else:
+                    processor.on_span_end(span)
+
+    def on_trace_start(self, trace: Trace) -> None:
+        with self._lock:
+            self.stats.traces += 1
+            self._traces[trace.trace_id] = _TraceState(trace, time.monotonic())
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        with self._lock:
+            state = self._traces.get(span.trace_id)
+            if state is None:
+                return
+            if not state.decided and isinstance(span.span_data, AgentSpanData):
+                replay = self._decide(state, span.span_data.name)
+                if not state.sampled:
+                    if self.tail is not None:
+                        self._buffer(state, True, span)
+                    return
+                forward = state.trace
+                replay.append((True, span))
+            elif state.sampled:
+                forward, replay = None, [(True, span)]
+            else:
+                if not state.decided or self.tail is not None:
+                    self._buffer(state, True, span)
+                return
+        self._replay(forward, replay)
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        with self._lock:
+            state = self._traces.get(span.trace_id)
+            if state is None:
+                return
+            if not state.sampled:
+                if state.decided and self.tail is None:
+                    return
+                state.keep_reason = state.keep_reason or self._tail_reason(state, span)
+                self._buffer(state, False, span)
+                return
+        for processor in self.processors:
+            processor.on_span_end(span)
+
+    def on_trace_end(self, trace: Trace) -> None:
+        with self._lock:
+            state = self._traces.pop(trace.trace_id, None)
+            if state is None:
+                return
+            forward_start = None
+            if not state.decided:
+                # No agent span: decide on the workflow as a whole
+                events = self._decide(state, None)
+                if state.sampled:
+                    forward_start = state.trace
+            else:
+                events = []
+            if not state.sampled:
+                if self.tail is not None and state.keep_reason is None:
+                    slow = self.tail.slow_seconds
+                    if slow is not None and time.monotonic() - state.started >= slow:
+                        state.keep_reason = "slow"
+                self._buffered -= len(state.events)
+                if state.keep_reason is None or self.tail is None:
+                    self.stats.dropped += 1
+                    return
+                self.stats.tail_kept[state.keep_reason] += 1
+                forward_start, events = state.trace, state.events
+        self._replay(forward_start, events)
+        for processor in self.processors:
+            processor.on_trace_end(trace)
+
+    def force_flush(self) -> None:
+        for processor in self.processors:
+            processor.force_flush()
+
+    def shutdown(self) -> None:
+        # Traces still open can't be judged; they are dropped
+        with self._lock:
+            self.stats.dropped += len(self._traces)
+            self._traces.clear()
+            self._buffered = 0
+        for processor in self.processors:
+            processor.shutdown()
+
+
+class _SamplingTraceProvider(DefaultTraceProvider):
+    """Returns a no-op trace, whose spans are no-ops too, for traces the sampler skips."""
+
+    def __init__(self, sampler: SamplingTraceProcessor, disabled: bool) -> None:
+        super().__init__()
+        self.sampler = sampler
+        self.set_processors([sampler])
+        self.set_disabled(disabled)
+
+    def set_disabled(self, disabled: bool) -> None:
+        super().set_disabled(disabled)
+        self.disabled = disabled
+
+    def create_trace(
+        self,
+        name: str,
+        trace_id: str | None = None,
+        group_id: str | None = None,
+        metadata: dict[str, Any] | None = None,
+        disabled: bool = False,
+    ) -> Trace:
+        if not (self.disabled or disabled) and not self.sampler._record():
+            return NoOpTrace()
+        return super().create_trace(name, trace_id=trace_id, group_id=group_id, metadata=metadata, disabled=disabled)
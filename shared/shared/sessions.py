@@ -0,0 +1,358 @@
+"""Persistent chat sessions that send a bounded history on every turn.
+
+Every example starts from a bare string, so a multi-turn chat means the caller keeps
+``result.to_input_list()`` and sends the whole transcript back on the next turn. Turn N
+then costs tokens, memory and conversion time in proportion to N. ``SessionMemory``
+keeps the history of each session in a backend and builds each turn's input from:
+
+- a rolling summary of the older messages (one system message, see ``shared/compaction.py``);
+- the most recent items verbatim, within ``window`` estimated tokens;
+- the new input.
+
+New items are appended to the backend after each turn; nothing is rewritten. When the
+recent items grow past ``window``, the oldest leave the window and are folded into the
+summary, which is saved with the sequence number it covers. A session that is not cached
+in the process loads only the summary and the items after it, so a turn costs the same
+at turn 1,000 as at turn 10. Tool calls leave the window together with their outputs:
+parallel calls of one model response and every output answering them fold as one group.
+
+Two local backends: ``SQLiteSessionBackend`` (one file for every session) and
+``LogSessionBackend`` (an append-only JSON-lines file per session, read from the end).
+
+Usage:
+
+    memory = SessionMemory(SQLiteSessionBackend(".cache/sessions.sqlite"))
+    result = await memory.run(agent, "user-42", "Hello how are you?", run_config=config)
+    result = await memory.run(agent, "user-42", "What did I just ask you?", run_config=config)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+from urllib.parse import quote
+
+from agents import Agent, Runner, RunResult, TResponseInputItem
+from pydantic import BaseModel
+
+from .compaction import SUMMARY_PREFIX, estimate_tokens, summarize_message
+from .guardrail_cache import input_text
+
+TOOL_CALL_TYPES = frozenset({"function_call", "computer_call"})
+TOOL_OUTPUT_TYPES = frozenset({"function_call_output", "computer_call_output"})
+
+
+@dataclass
+class SessionSummary:
+    upto: int = 0
+    """Sequence number of the last item folded into the summary."""
+
+    lines: list[str] = field(default_factory=list)
+
+
+class SessionBackend(Protocol):
+    def append(self, session_id: str, items: list[tuple[int, TResponseInputItem]]) -> None:
+        """Append ``items`` (sequence number, item) after the session's last item."""
+
+    def items_after(self, session_id: str, seq: int) -> list[tuple[int, TResponseInputItem]]: ...
+
+    def load_summary(self, session_id: str) -> SessionSummary | None: ...
+
+    def save_summary(self, session_id: str, summary: SessionSummary) -> None: ...
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+class SQLiteSessionBackend:
+    """Items and summaries of every session in a local SQLite file."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = os.fspath(path)
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS items (session_id TEXT NOT NULL, seq INTEGER NOT NULL, item TEXT NOT NULL,"
+            " PRIMARY KEY (session_id, seq)) WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS summaries (session_id TEXT PRIMARY KEY, upto INTEGER NOT NULL,"
+            " lines TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def append(self, session_id: str, items: list[tuple[int, TResponseInputItem]]) -> None:
+        rows = [(session_id, seq, json.dumps(item, default=_json_default)) for seq, item in items]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany("INSERT INTO items (session_id, seq, item) VALUES (?, ?, ?)", rows)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def items_after(self, session_id: str, seq: int) -> list[tuple[int, TResponseInputItem]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, item FROM items WHERE session_id = ? AND seq > ? ORDER BY seq", (session_id, seq)
+            ).fetchall()
+        return [(seq, json.loads(item)) for seq, item in rows]
+
+    def load_summary(self, session_id: str) -> SessionSummary | None:
+        with self._lock:
+            row = self._db.execute("SELECT upto, lines FROM summaries WHERE session_id = ?", (session_id,)).fetchone()
+        return SessionSummary(row[0], json.loads(row[1])) if row else None
+
+    def save_summary(self, session_id: str, summary: SessionSummary) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO summaries (session_id, upto, lines, updated_at) VALUES (?, ?, ?, ?)",
+                (session_id, summary.upto, json.dumps(summary.lines), time.time()),
+            )
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class LogSessionBackend:
+    """One append-only JSON-lines file per session, ``[seq, item]`` per line, plus a small
+    summary file replaced atomically. Items are read from the end of the log, so loading
+    the tail doesn't read the whole transcript. ``fsync`` makes every append durable."""
+
+    def __init__(self, directory: str | os.PathLike[str], fsync: bool = False, block_size: int = 65536) -> None:
+        self.directory = os.fspath(directory)
+        self.fsync = fsync
+        self.block_size = block_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, session_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, quote(session_id, safe="") + suffix)
+
+    def append(self, session_id: str, items: list[tuple[int, TResponseInputItem]]) -> None:
+        data = "".join(json.dumps([seq, item], default=_json_default) + "\n" for seq, item in items)
+        # One write per turn, so a crash leaves at most a partial last line
+        with open(self._path(session_id, ".jsonl"), "a+b") as log:
+            if log.seek(0, os.SEEK_END) and (log.seek(-1, os.SEEK_END), log.read(1))[1] != b"\n":
+                # Start on a line of our own after a partial line left by a crash
+                data = "\n" + data
+            log.write(data.encode())
+            if self.fsync:
+                log.flush()
+                os.fsync(log.fileno())
+
+    def items_after(self, session_id: str, seq: int) -> list[tuple[int, TResponseInputItem]]:
+        try:
+            log = open(self._path(session_id, ".jsonl"), "rb")
+        except FileNotFoundError:
+            return []
+        items: list[tuple[int, TResponseInputItem]] = []
+        with log:
+            position = log.seek(0, os.SEEK_END)
+            rest = b""
+            done = False
+            while position > 0 and not done:
+                step = min(self.block_size, position)
+                position -= step
+                log.seek(position)
+                lines = (log.read(step) + rest).split(b"\n")
+                # The first piece may be cut off; it is completed by the next block
+                rest = lines.pop(0) if position > 0 else b""
+                for line in reversed(lines):
+                    try:
+                        item_seq, item = json.loads(line)
+                    except ValueError:
+                        continue  # A partial line left by a crash, or the empty piece after the last newline
+                    if item_seq <= seq:
+                        done = True
+                        break
+                    items.append((item_seq, item))
+        items.reverse()
+        return items
+
+    def load_summary(self, session_id: str) -> SessionSummary | None:
+        try:
+            with open(self._path(session_id, ".summary.json")) as file:
+                return SessionSummary(**json.load(file))
+        except FileNotFoundError:
+            return None
+
+    def save_summary(self, session_id: str, summary: SessionSummary) -> None:
+        path = self._path(session_id, ".summary.json")
+        with open(path + ".tmp", "w") as file:
+            json.dump({"upto": summary.upto, "lines": summary.lines}, file)
+        os.replace(path + ".tmp", path)
+
+
+@dataclass
+class SessionStats:
+    turns: int = 0
+    items_appended: int = 0
+    cold_loads: int = 0
+    """Turns that loaded the session from the backend instead of the process cache."""
+
+    items_loaded: int = 0
+    summarized_items: int = 0
+    history_tokens: int = 0
+    """Estimated history tokens sent with the turns (summary and window)."""
+
+
+@dataclass
+class _Session:
+    summary: SessionSummary
+    window: deque[tuple[int, TResponseInputItem, int]]
+    """Recent items after ``summary.upto``: sequence number, item, estimated tokens."""
+
+    window_tokens: int
+    last_seq: int
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+def _item_tokens(item: TResponseInputItem, estimate: Callable[[str], int]) -> int:
+    if "content" in item:
+        return estimate(input_text([item]))
+    return estimate(" ".join(str(item.get(key, "")) for key in ("name", "arguments", "output")))
+
+
+@dataclass
+class SessionMemory:
+    backend: SessionBackend
+    window: int = 2000
+    """Estimated tokens of recent items sent verbatim each turn."""
+
+    summary_budget: int = 300
+    keep_last: int = 2
+    """Items at the end of the history that are always sent verbatim, even over ``window``."""
+
+    max_cached_sessions: int = 1024
+    estimate: Callable[[str], int] = estimate_tokens
+    summarize: Callable[[str, str], str] = summarize_message
+    stats: SessionStats = field(default_factory=SessionStats)
+
+    def __post_init__(self) -> None:
+        self._sessions: OrderedDict[str, _Session] = OrderedDict()
+
+    def _session(self, session_id: str) -> _Session:
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+            return session
+        summary = self.backend.load_summary(session_id) or SessionSummary()
+        items = self.backend.items_after(session_id, summary.upto)
+        self.stats.cold_loads += 1
+        self.stats.items_loaded += len(items)
+        window = deque((seq, item, _item_tokens(item, self.estimate)) for seq, item in items)
+        session = _Session(
+            summary=summary,
+            window=window,
+            window_tokens=sum(tokens for _, _, tokens in window),
+            last_seq=items[-1][0] if items else summary.upto,
+        )
+        # A log written without summaries is folded once, here
+        if self._fold(session):
+            self.backend.save_summary(session_id, session.summary)
+        while len(self._sessions) >= self.max_cached_sessions:
+            # A session with a turn in progress stays, or the next turn would load a second
+            # copy with its own lock and sequence numbers. Evicting before the new session is
+            # added keeps it too: its turn has not taken the lock yet
+            idle = next((key for key, cached in self._sessions.items() if not cached.lock.locked()), None)
+            if idle is None:
+                break
+            del self._sessions[idle]
+        self._sessions[session_id] = session
+        return session
+
+    def history(self, session_id: str) -> list[TResponseInputItem]:
+        """The input items for the session's next turn: the summary, then the window."""
+        return self._history(self._session(session_id))
+
+    def append(self, session_id: str, items: list[TResponseInputItem]) -> None:
+        """Record a turn's new items (its input, then the items the run generated)."""
+        self._append(session_id, self._session(session_id), items)
+
+    def _history(self, session: _Session) -> list[TResponseInputItem]:
+        items = [item for _, item, _ in session.window]
+        if session.summary.lines:
+            items.insert(0, {"role": "system", "content": "\n".join([SUMMARY_PREFIX, *session.summary.lines])})
+        return items
+
+    def _append(self, session_id: str, session: _Session, items: list[TResponseInputItem]) -> None:
+        numbered = [(session.last_seq + index, item) for index, item in enumerate(items, start=1)]
+        self.backend.append(session_id, numbered)
+        for seq, item in numbered:
+            tokens = _item_tokens(item, self.estimate)
+            session.window.append((seq, item, tokens))
+            session.window_tokens += tokens
+        session.last_seq += len(items)
+        self.stats.items_appended += len(items)
+        if self._fold(session):
+            self.backend.save_summary(session_id, session.summary)
+
+    def _fold(self, session: _Session) -> bool:
+        """Move the oldest items out of the window into the summary; ``True`` if any moved."""
+        folded = 0
+        window = session.window
+        while session.window_tokens > self.window and len(window) > self.keep_last:
+            # One group: the oldest item and, as a tool output can't be sent without the call
+            # that asked for it, every item up to the last output of the calls folded so far
+            unanswered: set[str] = set()
+            group = 0
+            while window:
+                kind = window[0][1].get("type")
+                if group and not unanswered and kind not in TOOL_OUTPUT_TYPES:
+                    break
+                seq, item, tokens = window.popleft()
+                session.window_tokens -= tokens
+                session.summary.upto = seq
+                group += 1
+                if kind in TOOL_CALL_TYPES:
+                    unanswered.add(item.get("call_id"))
+                elif kind in TOOL_OUTPUT_TYPES:
+                    unanswered.discard(item.get("call_id"))
+                elif "content" in item:
+                    session.summary.lines.append(self.summarize(str(item.get("role", "item")), input_text([item])))
+            folded += group
+        if not folded:
+            return False
+        lines = session.summary.lines
+        while len(lines) > 1 and self.estimate("\n".join(lines)) > self.summary_budget:
+            lines.pop(0)
+        self.stats.summarized_items += folded
+        return True
+
+    async def run(
+        self,
+        agent: Agent[Any],
+        session_id: str,
+        input: str | list[TResponseInputItem],
+        **kwargs: Any,
+    ) -> RunResult:
+        """One turn of the session: ``Runner.run`` on the history plus ``input``, then the
+        new items are appended. ``kwargs`` go to ``Runner.run``."""
+        new_input: list[TResponseInputItem] = [{"role": "user", "content": input}] if isinstance(input, str) else input
+        # One session object for the whole turn: the cache may evict and reload the id meanwhile
+        session = self._session(session_id)
+        # Turns of one session run one at a time, each on top of the last
+        async with session.lock:
+            history = self._history(session)
+            self.stats.turns += 1
+            self.stats.history_tokens += session.window_tokens
+            if session.summary.lines:
+                self.stats.history_tokens += _item_tokens(history[0], self.estimate)
+            result = await Runner.run(agent, [*history, *new_input], **kwargs)
+            self._append(session_id, session, [*new_input, *(item.to_input_item() for item in result.new_items)])
+        return result
@@ -0,0 +1,489 @@
+"""Filtered, coalesced and bounded event streams for ``Runner.run_streamed``.
+
+``result.stream_events()`` yields every event the run produces: one
+``RawResponsesStreamEvent`` per token, plus the ``response.created`` / ``completed`` /
+``content_part`` events most consumers skip with ``continue``. All of them sit in an
+unbounded queue, so a slow consumer (a congested socket) lets the queue grow for as long
+as the model keeps talking, and a fast one wakes up and flushes once per token.
+
+``StreamPolicy.run_streamed`` starts the run as usual and replaces its event queue with
+one that:
+
+- drops events the consumer didn't ``subscribe`` to before they are queued. With the
+  pooled model in ``shared.provider``, a stream hook skips unsubscribed raw events before
+  the run wraps them; with other models they are dropped at the queue;
+- merges consecutive text deltas until ``coalesce_seconds`` have passed or
+  ``coalesce_chars`` have collected, whichever comes first;
+- holds at most ``max_queue`` events. When it is full, ``overflow="block"`` pauses the
+  model stream (through the pooled model in ``shared.provider``), so the HTTP response is
+  no longer read and the slowdown reaches the server, for up to ``block_timeout``
+  seconds. ``"coalesce"`` (and ``"block"`` after the timeout, or with other models)
+  merges new deltas into the last queued one instead. Nothing is lost either way.
+
+The result is the SDK's own ``RunResultStreaming``; ``stream_events()`` works unchanged.
+The policy swaps in its queue through the private ``RunResultStreaming._event_queue``,
+which is why ``pyproject.toml`` pins the SDK version and ``tests/test_streaming.py``
+checks the internals this module relies on.
+
+None of this lowers client CPU much. The OpenAI client parses every chunk into a model
+before any of the above sees it, and that is about 70% of the client's CPU per stream.
+What changes is how many events are queued, woken up for and delivered, and how far the
+queue of a slow consumer can grow.
+
+``stream_events()`` can only be iterated once. ``BroadcastStream`` reads it once and fans
+the events out to any number of ``Subscriber``s (the user's socket, an audit log, a live
+guardrail). Each has its own filter, bounded queue and overflow policy, and none of the
+policies wait, so a slow subscriber never holds up the others. Events are numbered and
+the last ``replay_size`` are kept in a ring buffer, so a subscriber that attaches late can
+replay from the start or from a sequence number.
+
+Usage:
+
+    policy = StreamPolicy(subscribe={TEXT_DELTA}, coalesce_seconds=0.05)
+    result = policy.run_streamed(agent, input="...")
+    async for event in result.stream_events():
+        print(event.data.delta, end="", flush=True)
+
+    broadcast = BroadcastStream(Runner.run_streamed(agent, input="..."))
+    user = broadcast.subscribe(subscribe={TEXT_DELTA}, overflow="coalesce")
+    audit = broadcast.subscribe(subscribe={RUN_ITEMS}, overflow="drop_oldest")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Collection
+from dataclasses import dataclass, field, replace
+from typing import Any, Literal
+
+from agents import Agent, Runner, RunResultStreaming
+from agents._run_impl import QueueCompleteSentinel
+from agents.items import TResponseStreamEvent
+from agents.stream_events import RawResponsesStreamEvent, StreamEvent
+from openai.types.responses import ResponseTextDeltaEvent
+
+from . import provider
+
+TEXT_DELTA = "response.output_text.delta"
+RUN_ITEMS = "run_item_stream_event"
+AGENT_UPDATES = "agent_updated_stream_event"
+
+# The queue of the streamed run started in this context, for the pooled model to wait on
+_consumer: contextvars.ContextVar[_PolicyQueue | None] = contextvars.ContextVar("stream_consumer", default=None)
+
+
+def event_key(event: StreamEvent) -> str:
+    """What ``subscribe`` matches besides ``event.type``: the raw event's type
+    (``"response.output_text.delta"``) or the run item event's name (``"tool_called"``)."""
+    if isinstance(event, RawResponsesStreamEvent):
+        return event.data.type
+    return getattr(event, "name", event.type)
+
+
+def _is_text_delta(event: Any) -> bool:
+    # Compares type strings: isinstance on a pydantic model class is slow, and this runs per token
+    return event.__class__ is RawResponsesStreamEvent and event.data.type == TEXT_DELTA
+
+
+def _merge_deltas(first: Any, second: RawResponsesStreamEvent) -> RawResponsesStreamEvent | None:
+    """``first`` with ``second``'s text appended, if both are deltas of the same content part."""
+    if not _is_text_delta(first):
+        return None
+    if first.data.item_id != second.data.item_id or first.data.content_index != second.data.content_index:
+        return None
+    return replace(first, data=first.data.model_copy(update={"delta": first.data.delta + second.data.delta}))
+
+
+def _policy_stream(events: AsyncIterator[TResponseStreamEvent]) -> AsyncIterator[TResponseStreamEvent]:
+    """Stream hook of the pooled model: feeds the policy queue of the run it serves, if any."""
+    queue = _consumer.get()
+    return events if queue is None else queue.feed(events)
+
+
+# Registered with the pooled model by the first StreamPolicy
+MODEL_HOOKS = provider.ModelHooks(wrap_stream=_policy_stream)
+
+
+@dataclass
+class StreamStats:
+    streams: int = 0
+    filtered: int = 0
+    """Events dropped because no consumer subscribed to them."""
+
+    queued: int = 0
+    coalesced: int = 0
+    """Text deltas merged into another one instead of being queued on their own."""
+
+    peak_queue: int = 0
+    producer_waits: int = 0
+    producer_wait_seconds: float = 0.0
+    block_timeouts: int = 0
+
+
+class _PolicyQueue(asyncio.Queue):
+    """Stands in for ``RunResultStreaming._event_queue``. The run only calls ``put_nowait``;
+    ``stream_events()`` calls ``get`` (which uses ``get_nowait``), ``empty`` and ``task_done``."""
+
+    def __init__(self, policy: StreamPolicy) -> None:
+        super().__init__()
+        self.policy = policy
+        self.stats = policy.stats
+        self.blocking = policy.overflow == "block"
+        self._subscribe = frozenset(policy.subscribe) if policy.subscribe is not None else None
+        self._deltas_wanted = self._subscribe is None or not self._subscribe.isdisjoint({TEXT_DELTA, "raw_response_event"})
+        self._pending: RawResponsesStreamEvent | None = None
+        self._pending_parts: list[str] = []
+        self._pending_chars = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._space = asyncio.Event()
+        self._space.set()
+
+    @property
+    def at_capacity(self) -> bool:
+        return not self._space.is_set()
+
+    def put_nowait(self, item: Any) -> None:
+        if _is_text_delta(item):
+            if not self._deltas_wanted:
+                self.stats.filtered += 1
+            elif self.policy.coalescing:
+                self._coalesce(item)
+            elif self.qsize() >= self.policy.max_queue:
+                # A blocking producer waits before its next event, so only one that doesn't gets here
+                self._merge_into_tail(item)
+            else:
+                self._enqueue(item)
+            return
+        # A text part has ended (or something else happened): send what was merged so far
+        self._flush()
+        if isinstance(item, QueueCompleteSentinel) or self.wants(item):
+            self._enqueue(item)
+        else:
+            self.stats.filtered += 1
+
+    def wants(self, item: Any) -> bool:
+        subscribe = self._subscribe
+        return subscribe is None or item.type in subscribe or event_key(item) in subscribe
+
+    def wants_raw(self, event: TResponseStreamEvent) -> bool:
+        """Whether a raw model event is worth wrapping and queueing. The model skips the
+        others, except ``response.completed``, which the run itself needs."""
+        subscribe = self._subscribe
+        return (
+            subscribe is None
+            or "raw_response_event" in subscribe
+            or event.type in subscribe
+            or event.type == "response.completed"
+        )
+
+    def get_nowait(self) -> Any:
+        item = super().get_nowait()
+        if not self._space.is_set() and self.qsize() < self.policy.max_queue:
+            self._space.set()
+        return item
+
+    async def feed(self, events: AsyncIterator[TResponseStreamEvent]) -> AsyncIterator[TResponseStreamEvent]:
+        """The model's raw events minus the unsubscribed ones. Stops reading them while the
+        queue is full, so the response is not read any further either."""
+        async for event in events:
+            if not self.wants_raw(event):
+                # Nobody subscribed: don't let the run wrap and queue it
+                self.stats.filtered += 1
+                continue
+            yield event
+            if self.at_capacity:
+                await self.wait_for_space()
+
+    async def wait_for_space(self) -> None:
+        if not self.blocking or self._space.is_set():
+            return
+        start = time.perf_counter()
+        self.stats.producer_waits += 1
+        try:
+            await asyncio.wait_for(self._space.wait(), self.policy.block_timeout)
+        except asyncio.TimeoutError:
+            # The consumer may be gone; stop holding the model call open and coalesce instead
+            self.stats.block_timeouts += 1
+            self.blocking = False
+        finally:
+            self.stats.producer_wait_seconds += time.perf_counter() - start
+
+    def _enqueue(self, item: Any) -> None:
+        super().put_nowait(item)
+        stats = self.stats
+        stats.queued += 1
+        size = self.qsize()
+        if size > stats.peak_queue:
+            stats.peak_queue = size
+        if size >= self.policy.max_queue:
+            self._space.clear()
+
+    def _coalesce(self, item: RawResponsesStreamEvent) -> None:
+        data: ResponseTextDeltaEvent = item.data
+        pending = self._pending
+        if pending is not None and (
+            pending.data.item_id != data.item_id or pending.data.content_index != data.content_index
+        ):
+            self._flush()
+            pending = None
+        if pending is None:
+            self._pending = item
+            self._pending_parts = [data.delta]
+            self._pending_chars = len(data.delta)
+            if self.policy.coalesce_seconds is not None:
+                self._timer = asyncio.get_running_loop().call_later(self.policy.coalesce_seconds, self._flush)
+        else:
+            self._pending_parts.append(data.delta)
+            self._pending_chars += len(data.delta)
+            self.stats.coalesced += 1
+        if self.policy.coalesce_chars is not None and self._pending_chars >= self.policy.coalesce_chars:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        if len(self._pending_parts) > 1:
+            pending = replace(pending, data=pending.data.model_copy(update={"delta": "".join(self._pending_parts)}))
+        self._pending_parts = []
+        if self.qsize() >= self.policy.max_queue:
+            self._merge_into_tail(pending)
+        else:
+            self._enqueue(pending)
+
+    def _merge_into_tail(self, item: RawResponsesStreamEvent) -> None:
+        merged = _merge_deltas(self._queue[-1], item) if self._queue else None
+        if merged is not None:
+            self._queue[-1] = merged
+            self.stats.coalesced += 1
+        else:
+            # Only non-delta events at the tail: they are few, so queue past the bound
+            self._enqueue(item)
+
+
+@dataclass
+class StreamPolicy:
+    subscribe: Collection[str] | None = None
+    """Event types (``"run_item_stream_event"``), raw event types (``TEXT_DELTA``) or run
+    item event names (``"tool_called"``) to deliver. ``None`` delivers everything."""
+
+    coalesce_seconds: float | None = None
+    coalesce_chars: int | None = None
+    """Merge consecutive text deltas until this much time has passed or this many
+    characters have collected. Both ``None`` disables coalescing (except on overflow)."""
+
+    max_queue: int = 256
+    overflow: Literal["block", "coalesce"] = "block"
+    block_timeout: float = 30.0
+    stats: StreamStats = field(default_factory=StreamStats)
+
+    def __post_init__(self) -> None:
+        provider.add_hooks(MODEL_HOOKS)
+
+    @property
+    def coalescing(self) -> bool:
+        return self.coalesce_seconds is not None or self.coalesce_chars is not None
+
+    def run_streamed(self, starting_agent: Agent[Any], input: Any, **kwargs: Any) -> RunResultStreaming:
+        """``Runner.run_streamed`` with this policy applied to the returned result."""
+        queue = _PolicyQueue(self)
+        # The run's task copies the context when it is created, so the model inside sees the queue
+        token = _consumer.set(queue)
+        try:
+            result = Runner.run_streamed(starting_agent, input, **kwargs)
+        finally:
+            _consumer.reset(token)
+        # Nothing has been queued yet: the run task only starts at the next await
+        result._event_queue = queue
+        self.stats.streams += 1
+        return result
+
+
+class SubscriberLagged(Exception):
+    """Raised to an ``overflow="disconnect"`` subscriber that fell ``max_queue`` events behind."""
+
+
+@dataclass
+class SubscriberStats:
+    delivered: int = 0
+    replayed: int = 0
+    missed: int = 0
+    """Events asked for on replay that had already left the ring buffer."""
+
+    coalesced: int = 0
+    dropped: int = 0
+    peak_queue: int = 0
+
+
+class Subscriber:
+    """One listener of a ``BroadcastStream``; iterate it like ``stream_events()``. When the
+    queue holds ``max_queue`` events, ``overflow`` decides:
+
+    - ``"coalesce"``: merge new text deltas into the last queued one (other events are
+      still queued, they are few). Nothing is lost.
+    - ``"drop_oldest"``: drop the oldest queued event, e.g. for a best-effort audit feed.
+    - ``"disconnect"``: end the subscription with ``SubscriberLagged``.
+    """
+
+    def __init__(
+        self,
+        broadcast: BroadcastStream,
+        subscribe: Collection[str] | None,
+        max_queue: int,
+        overflow: Literal["coalesce", "drop_oldest", "disconnect"],
+    ) -> None:
+        if overflow not in ("coalesce", "drop_oldest", "disconnect"):
+            raise ValueError(f"Unknown overflow policy: {overflow!r}")
+        self._broadcast = broadcast
+        self._subscribe = frozenset(subscribe) if subscribe is not None else None
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.stats = SubscriberStats()
+        self.position = -1
+        """Sequence number of the last event delivered."""
+
+        self._items: deque[tuple[int, StreamEvent]] = deque()
+        self._ready = asyncio.Event()
+        self._finished = False
+        self._error: BaseException | None = None
+
+    def wants(self, event: StreamEvent) -> bool:
+        return self._subscribe is None or event.type in self._subscribe or event_key(event) in self._subscribe
+
+    def _offer(self, seq: int, event: StreamEvent) -> None:
+        if self._finished or not self.wants(event):
+            return
+        if len(self._items) >= self.max_queue:
+            if self.overflow == "coalesce":
+                merged = _merge_deltas(self._items[-1][1], event) if _is_text_delta(event) else None
+                if merged is not None:
+                    self._items[-1] = (seq, merged)
+                    self.stats.coalesced += 1
+                    return
+            elif self.overflow == "drop_oldest":
+                self._items.popleft()
+                self.stats.dropped += 1
+            else:
+                self._items.clear()
+                self._broadcast._subscribers.discard(self)
+                self._finish(SubscriberLagged(f"Subscriber fell {self.max_queue} events behind at event {seq}"))
+                return
+        self._items.append((seq, event))
+        self.stats.peak_queue = max(self.stats.peak_queue, len(self._items))
+        self._ready.set()
+
+    def _finish(self, error: BaseException | None = None) -> None:
+        if not self._finished:
+            self._finished = True
+            self._error = error
+            self._ready.set()
+
+    def close(self) -> None:
+        """Stop receiving events. The run and the other subscribers carry on."""
+        self._broadcast._subscribers.discard(self)
+        self._items.clear()
+        self._finish()
+
+    def __aiter__(self) -> Subscriber:
+        return self
+
+    async def __anext__(self) -> StreamEvent:
+        while not self._items:
+            if self._finished:
+                error, self._error = self._error, None
+                if error is not None:
+                    raise error
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        seq, event = self._items.popleft()
+        self.position = seq
+        self.stats.delivered += 1
+        return event
+
+
+class BroadcastStream:
+    """Reads one streamed run and delivers every event to each subscriber. Events are
+    numbered from ``first_seq``."""
+
+    def __init__(self, result: RunResultStreaming, replay_size: int = 1024, first_seq: int = 0) -> None:
+        self.result = result
+        self.first_seq = first_seq
+        self.error: BaseException | None = None
+        """What ``stream_events()`` raised (e.g. a guardrail tripwire); every subscriber gets it too."""
+
+        self._ring: deque[tuple[int, StreamEvent]] = deque(maxlen=replay_size)
+        self._next_seq = first_seq
+        self._subscribers: set[Subscriber] = set()
+        self._task: asyncio.Task[None] | None = None
+        if result._run_impl_task is not None:
+            # After result.cancel() (a subscriber's guardrail tripping, say) the queue is
+            # cleared and nothing else would ever wake the reader up
+            result._run_impl_task.add_done_callback(lambda _: result._event_queue.put_nowait(QueueCompleteSentinel()))
+
+    @property
+    def done(self) -> bool:
+        return self._task is not None and self._task.done()
+
+    def subscribe(
+        self,
+        subscribe: Collection[str] | None = None,
+        max_queue: int = 256,
+        overflow: Literal["coalesce", "drop_oldest", "disconnect"] = "coalesce",
+        replay: bool | int = False,
+    ) -> Subscriber:
+        """Attach a subscriber. ``replay=True`` starts with the buffered events, an ``int``
+        with the buffered events from that sequence number on; ``False`` only gets new ones."""
+        subscriber = Subscriber(self, subscribe, max_queue, overflow)
+        if replay is not False:
+            start = self.first_seq if replay is True else replay
+            oldest = self._ring[0][0] if self._ring else self._next_seq
+            subscriber.stats.missed = max(0, oldest - start)
+            for seq, event in self._ring:
+                if seq >= start and subscriber.wants(event):
+                    subscriber.stats.replayed += 1
+                    subscriber._offer(seq, event)
+        if self.done:
+            subscriber._finish(self.error)
+        else:
+            self._subscribers.add(subscriber)
+            self._start()
+        return subscriber
+
+    def _start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._pump())
+
+    async def _pump(self) -> None:
+        try:
+            async for event in self.result.stream_events():
+                seq = self._next_seq
+                self._next_seq += 1
+                self._ring.append((seq, event))
+                for subscriber in tuple(self._subscribers):
+                    subscriber._offer(seq, event)
+        except Exception as e:
+            self.error = e
+        finally:
+            for subscriber in self._subscribers:
+                subscriber._finish(self.error)
+            self._subscribers.clear()
+
+    async def wait(self) -> RunResultStreaming:
+        """Wait for the run to finish, whether or not anyone is subscribed."""
+        self._start()
+        await self._task
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def cancel(self) -> None:
+        """Cancel the run; every subscriber's iteration ends."""
+        self.result.cancel()
+
@@ -0,0 +1,178 @@
+"""Output guardrails that check a streamed answer while it is being generated.
+
+A normal output guardrail only runs once the whole final output exists, so an off-policy
+answer is fully generated (and paid for) before the tripwire fires.
+``StreamingOutputGuardrail`` reads the ``Runner.run_streamed`` event stream, accumulates
+the ``ResponseTextDeltaEvent`` deltas and runs the guardrails on the text so far at
+sentence (or fixed-size window) boundaries. When a tripwire fires the run is cancelled,
+which closes the in-flight model stream, and ``OutputGuardrailTripwireTriggered`` is raised.
+
+Guardrail checks run in the background so they never stall the stream. While one check
+is running, further boundaries are coalesced into a single follow-up check on the latest
+text.
+
+Usage:
+
+    guard = StreamingOutputGuardrail([output_guardrail])
+    result = Runner.run_streamed(agent, input="...")
+
+    async for event in guard.stream(result):
+        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+            print(event.data.delta, end="", flush=True)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from agents import OutputGuardrail, OutputGuardrailTripwireTriggered, RunResultStreaming
+from agents.guardrail import OutputGuardrailResult
+from agents.stream_events import StreamEvent
+from openai.types.responses import ResponseTextDeltaEvent
+
+# Latin and Urdu/Arabic sentence endings, plus line breaks
+_SENTENCE_END = re.compile(r"[.!?۔؟\n]\s*$")
+
+_DONE = object()
+
+
+async def _next_event(events: AsyncIterator[StreamEvent]) -> Any:
+    try:
+        return await anext(events)
+    except StopAsyncIteration:
+        return _DONE
+
+
+@dataclass
+class StreamingGuardrailStats:
+    checks: int = 0
+    coalesced: int = 0
+    """Boundaries folded into a later check because one was already running."""
+
+    trips: int = 0
+    chars_at_trip: int = 0
+    seconds_to_trip: float = 0.0
+
+
+@dataclass
+class StreamingOutputGuardrail:
+    guardrails: list[OutputGuardrail[Any]]
+    boundary: Literal["sentence", "window"] = "sentence"
+    window_chars: int = 200
+    """With ``boundary="window"``, check every ``window_chars`` new characters. With
+    ``"sentence"`` it is the upper bound if no sentence ends in that span."""
+
+    min_chars: int = 20
+    """Don't check before this many characters have been generated."""
+
+    check_final: bool = True
+    """Also check the complete text once the stream ends."""
+
+    stats: StreamingGuardrailStats = field(default_factory=StreamingGuardrailStats)
+
+    async def stream(
+        self, result: RunResultStreaming, events: AsyncIterator[StreamEvent] | None = None
+    ) -> AsyncIterator[StreamEvent]:
+        """Yield events from ``result.stream_events()``, checking the text as it arrives.
+        ``events`` replaces ``stream_events()``, e.g. with a ``BroadcastStream`` subscriber."""
+        start = time.perf_counter()
+        events = (events if events is not None else result.stream_events()).__aiter__()
+        text = ""
+        # Length of the text at the last boundary, and of the text the last check started on
+        boundary_len = checked_len = 0
+        pending: asyncio.Task[list[OutputGuardrailResult]] | None = None
+        waiting = False
+        next_event: asyncio.Task[Any] | None = None
+
+        def start_check() -> asyncio.Task[list[OutputGuardrailResult]]:
+            nonlocal checked_len
+            self.stats.checks += 1
+            checked_len = len(text)
+            return asyncio.ensure_future(self._run_guardrails(result, text))
+
+        try:
+            while True:
+                if next_event is None:
+                    next_event = asyncio.ensure_future(_next_event(events))
+                done, _ = await asyncio.wait(
+                    [task for task in (next_event, pending) if task is not None],
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if pending is not None and pending in done:
+                    self._raise_if_tripped(result, pending.result(), text, start)
+                    pending = None
+                    if waiting:
+                        waiting = False
+                        pending = start_check()
+
+                if next_event not in done:
+                    continue
+                event = next_event.result()
+                next_event = None
+                if event is _DONE:
+                    break
+
+                if event.type == "raw_response_event":
+                    if event.data.type == "response.created":
+                        # A new model response; guard the new message, not the previous one
+                        text, boundary_len, checked_len = "", 0, 0
+                    elif isinstance(event.data, ResponseTextDeltaEvent):
+                        text += event.data.delta
+                        if self._at_boundary(text, boundary_len):
+                            boundary_len = len(text)
+                            if pending is None:
+                                pending = start_check()
+                            else:
+                                self.stats.coalesced += 1
+                                waiting = True
+                yield event
+
+            if pending is not None:
+                self._raise_if_tripped(result, await pending, text, start)
+                pending = None
+            if waiting:
+                # The last boundary came while a check was running: it was never checked
+                waiting = False
+                pending = start_check()
+                self._raise_if_tripped(result, await pending, text, start)
+                pending = None
+            if self.check_final and text and len(text) != checked_len:
+                self.stats.checks += 1
+                self._raise_if_tripped(result, await self._run_guardrails(result, text), text, start)
+        finally:
+            for task in (next_event, pending):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def _at_boundary(self, text: str, boundary_len: int) -> bool:
+        if len(text) < self.min_chars:
+            return False
+        if len(text) - boundary_len >= self.window_chars:
+            return True
+        return self.boundary == "sentence" and bool(_SENTENCE_END.search(text))
+
+    async def _run_guardrails(self, result: RunResultStreaming, text: str) -> list[OutputGuardrailResult]:
+        return await asyncio.gather(
+            *(guardrail.run(result.context_wrapper, result.current_agent, text) for guardrail in self.guardrails)
+        )
+
+    def _raise_if_tripped(
+        self,
+        result: RunResultStreaming,
+        guardrail_results: list[OutputGuardrailResult],
+        text: str,
+        start: float,
+    ) -> None:
+        for guardrail_result in guardrail_results:
+            if guardrail_result.output.tripwire_triggered:
+                result.cancel()
+                self.stats.trips += 1
+                self.stats.chars_at_trip += len(text)
+                self.stats.seconds_to_trip += time.perf_counter() - start
+                raise OutputGuardrailTripwireTriggered(guardrail_result)
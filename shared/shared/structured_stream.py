@@ -0,0 +1,224 @@
+"""Incremental parsing of structured output.
+
+An ``output_type`` agent has a value only once the whole JSON reply has arrived and the
+model has been validated from the buffered string. For a guardrail verdict like
+``WeatherInputGuardrail`` the ``is_weather_query`` boolean comes in the first few tokens
+and everything after it is the ``reasoning`` text. ``StructuredStream`` runs the agent
+streamed and feeds the text deltas to ``PartialJSONParser``, which completes each
+top-level field of the JSON object as soon as its value closes. Every field is
+validated against its own annotation on the output type, so callers can
+``await stream.field("is_weather_query")`` and decide without waiting for the rest.
+
+The parser looks at each character once, and only the top-level field being written is
+buffered. Fields arrive in the order the model writes them, which is the schema's
+property order, so the deciding field should be declared first. ``cancel()`` stops the
+generation once the rest of the reply is not needed.
+
+Usage:
+
+    stream = StructuredStream(guardrail_agent, input, run_config=config)
+    try:
+        is_weather_query = await stream.field("is_weather_query")
+    finally:
+        stream.cancel()
+    return GuardrailFunctionOutput(
+        output_info=stream.partial(reasoning=""), tripwire_triggered=not is_weather_query
+    )
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import re
+import time
+from typing import Any
+
+from agents import Agent, Runner, TResponseInputItem
+from openai.types.responses import ResponseTextDeltaEvent
+from pydantic import BaseModel, TypeAdapter
+
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class PartialJSONParser:
+    """Scans a JSON object chunk by chunk and returns each top-level field once its value
+    is complete. Text before the opening brace (e.g. a code fence) is skipped."""
+
+    def __init__(self) -> None:
+        self.fields: dict[str, Any] = {}
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._scalar = False
+        self._pieces: list[str] = []
+        self._capturing = False
+        self._key: str | None = None
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """Consume ``chunk`` and return the fields it completed, in order."""
+        completed: list[tuple[str, Any]] = []
+        start = 0 if self._capturing else None
+        i = 0
+        while i < len(chunk) and not self.done:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    i += 1
+                    continue
+                # Jump over the string's contents to the next quote or backslash
+                match = _STRING_SPECIAL.search(chunk, i)
+                if match is None:
+                    break
+                i = match.start()
+                if chunk[i] == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                    if self._depth == 1:
+                        start = self._close(chunk, start, i + 1, completed)
+                i += 1
+                continue
+            char = chunk[i]
+            if self._scalar and (char in ",}" or char.isspace()):
+                start = self._close(chunk, start, i, completed)
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    start = self._open(i)
+            elif char in "{[":
+                if self._depth == 1:
+                    start = self._open(i)
+                if self._depth > 0 or char == "{":
+                    self._depth += 1
+            elif char in "}]":
+                if self._depth > 0:
+                    self._depth -= 1
+                if self._depth == 1:
+                    start = self._close(chunk, start, i + 1, completed)
+                elif self._depth == 0:
+                    self.done = True
+            elif self._depth == 1 and not self._capturing and char not in ",:" and not char.isspace():
+                self._scalar = True
+                start = self._open(i)
+            i += 1
+        if self._capturing and start is not None:
+            self._pieces.append(chunk[start:])
+        return completed
+
+    def _open(self, index: int) -> int:
+        self._capturing = True
+        return index
+
+    def _close(self, chunk: str, start: int | None, end: int, completed: list[tuple[str, Any]]) -> None:
+        self._pieces.append(chunk[start or 0 : end])
+        text = "".join(self._pieces)
+        self._pieces.clear()
+        self._capturing = False
+        self._scalar = False
+        if self._key is None:
+            self._key = json.loads(text)
+        else:
+            key, self._key = self._key, None
+            self.fields[key] = json.loads(text)
+            completed.append((key, self.fields[key]))
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _field_adapters(output_type: type[BaseModel]) -> dict[str, TypeAdapter[Any]]:
+    return {
+        field.alias or name: TypeAdapter(field.annotation) for name, field in output_type.model_fields.items()
+    }
+
+
+class StructuredStream:
+    """Runs an ``output_type`` agent streamed, with each field available as soon as it is
+    complete. ``kwargs`` go to ``Runner.run_streamed``."""
+
+    def __init__(self, agent: Agent[Any], input: str | list[TResponseInputItem], **kwargs: Any) -> None:
+        output_type = agent.output_type
+        if not (isinstance(output_type, type) and issubclass(output_type, BaseModel)):
+            raise TypeError("StructuredStream needs an agent whose output_type is a pydantic model")
+        self.output_type = output_type
+        self.fields: dict[str, Any] = {}
+        self.field_seconds: dict[str, float] = {}
+        """Seconds from the start of the run until each field was complete."""
+
+        self.result = Runner.run_streamed(agent, input, **kwargs)
+        self._adapters = _field_adapters(output_type)
+        self._parser = PartialJSONParser()
+        self._waiters: dict[str, asyncio.Future[Any]] = {}
+        self._error: BaseException | None = None
+        self._cancelled = False
+        self._streaming = False
+        self._start = time.perf_counter()
+        self._task = asyncio.create_task(self._pump())
+
+    async def _pump(self) -> None:
+        try:
+            self._streaming = True
+            async for event in self.result.stream_events():
+                if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                    if not self._parser.done:
+                        for key, value in self._parser.feed(event.data.delta):
+                            self._set(key, value)
+        except Exception as e:
+            self._error = e
+        finally:
+            for name, waiter in self._waiters.items():
+                if waiter.done():
+                    continue
+                if self._error is not None:
+                    waiter.set_exception(self._error)
+                elif self._cancelled:
+                    waiter.cancel()
+                else:
+                    waiter.set_exception(KeyError(name))
+
+    def _set(self, key: str, value: Any) -> None:
+        adapter = self._adapters.get(key)
+        if adapter is None:
+            return
+        self.fields[key] = adapter.validate_python(value)
+        self.field_seconds[key] = time.perf_counter() - self._start
+        waiter = self._waiters.get(key)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(self.fields[key])
+
+    async def field(self, name: str) -> Any:
+        """The validated value of ``name`` as soon as the model has written it. Raises
+        ``KeyError`` if the reply ends without it, or the run's error."""
+        if name in self.fields:
+            return self.fields[name]
+        if self._task.done():
+            if self._error is not None:
+                raise self._error
+            raise KeyError(name)
+        if name not in self._waiters:
+            self._waiters[name] = asyncio.get_running_loop().create_future()
+        # Shielded so one cancelled caller doesn't cancel the value for the others
+        return await asyncio.shield(self._waiters[name])
+
+    def partial(self, **defaults: Any) -> BaseModel:
+        """The output type validated from the fields complete so far, with ``defaults`` for
+        the ones not written yet. Raises ``ValidationError`` if a required field has neither."""
+        return self.output_type.model_validate({**defaults, **self.fields})
+
+    async def final_output(self) -> BaseModel:
+        """Wait for the whole reply and return the validated output."""
+        await asyncio.shield(self._task)
+        if self._error is not None:
+            raise self._error
+        return self.result.final_output
+
+    def cancel(self) -> None:
+        """Stop the generation; fields not complete yet are never set."""
+        self._cancelled = True
+        if not self._streaming:
+            self.result.cancel()
+        # stream_events() cancels the run itself when this interrupts it. Cancelling the run
+        # twice can cut short httpcore closing the connection, which then never returns to the pool
+        self._task.cancel()
@@ -0,0 +1,299 @@
+"""Cheap, in-process checks in front of LLM guardrails.
+
+Many guardrail decisions are obvious: Urdu script can be detected from Unicode ranges and
+"hi"/"hello" from a keyword list. ``TieredGuardrail`` runs a list of deterministic checks
+first, in order. The first check that returns a verdict with at least ``min_confidence``
+decides. Only inputs that no check is sure about escalate to the wrapped guardrail (the
+LLM guardrail agent).
+
+Prefer checks that only trip. A local pass skips the guardrail agent, so a check that
+passes on a keyword ("weather") lets through anything that mentions it ("it's raining,
+now write my essay"). Give passing checks a strict condition (``whole_input``, a high
+``min_ratio``, marker letters) or a confidence below ``min_confidence``.
+
+A local decision puts its ``Verdict`` in ``output_info``, unless ``output_info`` builds
+something else from it: the wrapped guardrail's own output type, so callers read one type
+whichever tier decided.
+
+Usage:
+
+    prefilter = TieredGuardrail([
+        KeywordCheck(GREETINGS, Verdict.trip("greeting only"), whole_input=True),
+        RegexCheck(r"ignore (all|previous) instructions", Verdict.trip("prompt injection")),
+    ])
+
+    @input_guardrail
+    @prefilter.tiered
+    async def weather_guardrail(ctx, agent, input) -> GuardrailFunctionOutput:
+        ...
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import re
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field, replace
+from typing import Any, Protocol
+
+from agents import GuardrailFunctionOutput
+
+from .guardrail_cache import input_text, normalize
+
+# Arabic, Arabic Supplement and the two Arabic presentation-form blocks (used by Urdu too)
+ARABIC_SCRIPT = ((0x0600, 0x06FF), (0x0750, 0x077F), (0xFB50, 0xFDFF), (0xFE70, 0xFEFF))
+
+# Letters used in Urdu but not in Arabic: ٹ ڈ ڑ ں ھ ہ ے
+URDU_LETTERS = frozenset("ٹڈڑںھہے")
+
+# Letters used in Arabic but not in Urdu or Persian, which write ک and ی: ة ى ك ي
+ARABIC_LETTERS = frozenset("ةىكي")
+
+# Letters used in Urdu or Persian but not in Arabic: the Urdu letters plus پ چ ژ گ ک ی
+PERSO_URDU_LETTERS = URDU_LETTERS | frozenset("پچژگکی")
+
+
+@dataclass(frozen=True)
+class Verdict:
+    tripwire_triggered: bool
+    confidence: float = 1.0
+    reason: str = ""
+    check: str = ""
+
+    @classmethod
+    def trip(cls, reason: str, confidence: float = 0.99) -> Verdict:
+        return cls(tripwire_triggered=True, confidence=confidence, reason=reason)
+
+    @classmethod
+    def passed(cls, reason: str, confidence: float = 0.99) -> Verdict:
+        return cls(tripwire_triggered=False, confidence=confidence, reason=reason)
+
+
+class Check(Protocol):
+    name: str
+
+    def __call__(self, text: str) -> Verdict | None:
+        """Return a verdict, or ``None`` if the check cannot tell."""
+        ...
+
+
+@dataclass
+class RegexCheck:
+    pattern: str | re.Pattern[str]
+    verdict: Verdict
+    name: str = "regex"
+
+    def __post_init__(self) -> None:
+        self._pattern = re.compile(self.pattern, re.IGNORECASE) if isinstance(self.pattern, str) else self.pattern
+
+    def __call__(self, text: str) -> Verdict | None:
+        return self.verdict if self._pattern.search(text) else None
+
+
+class _TokenTrie:
+    """Trie over words, so multi-word phrases are matched in one pass over the input."""
+
+    _END = ""
+
+    def __init__(self, phrases: Iterable[str]) -> None:
+        self._root: dict[str, Any] = {}
+        for phrase in phrases:
+            node = self._root
+            for word in normalize(phrase).split():
+                node = node.setdefault(word, {})
+            node[self._END] = True
+
+    def matches(self, words: list[str]) -> list[tuple[int, int]]:
+        """Longest match starting at each position, as (start, end) word offsets."""
+        found = []
+        for start in range(len(words)):
+            node, end = self._root, None
+            for index in range(start, len(words)):
+                node = node.get(words[index])
+                if node is None:
+                    break
+                if self._END in node:
+                    end = index + 1
+            if end is not None:
+                found.append((start, end))
+        return found
+
+
+@dataclass
+class KeywordCheck:
+    """Matches keywords or phrases.
+
+    By default any match returns ``verdict``. With ``whole_input=True`` the input must
+    consist only of keywords (e.g. a bare "hi there"). With ``min_ratio`` the share of
+    words covered by keywords must be at least that ratio.
+    """
+
+    keywords: Iterable[str]
+    verdict: Verdict
+    whole_input: bool = False
+    min_ratio: float | None = None
+    name: str = "keywords"
+
+    def __post_init__(self) -> None:
+        self._trie = _TokenTrie(self.keywords)
+
+    def __call__(self, text: str) -> Verdict | None:
+        words = normalize(text).split()
+        if not words:
+            return None
+        matches = self._trie.matches(words)
+        if not matches:
+            return None
+        if not self.whole_input and self.min_ratio is None:
+            return self.verdict
+
+        covered = set()
+        for start, end in matches:
+            covered.update(range(start, end))
+        ratio = len(covered) / len(words)
+        if self.whole_input:
+            return self.verdict if ratio == 1.0 else None
+        return self.verdict if ratio >= (self.min_ratio or 0.0) else None
+
+
+@dataclass
+class ScriptCheck:
+    """Returns ``verdict`` when at least ``min_ratio`` of the letters fall in ``ranges``.
+    If ``marker_chars`` is given, at least one of them must also appear (for example the
+    Urdu-only letters, to tell Urdu from Arabic), and none of ``excluded_chars`` may.
+
+    Several languages share the Arabic script, so a check on the ranges alone can't tell
+    Arabic from Urdu or Persian. Pair ``ARABIC_SCRIPT`` with marker letters."""
+
+    ranges: tuple[tuple[int, int], ...]
+    verdict: Verdict
+    min_ratio: float = 0.6
+    marker_chars: frozenset[str] = frozenset()
+    excluded_chars: frozenset[str] = frozenset()
+    name: str = "script"
+
+    def __call__(self, text: str) -> Verdict | None:
+        letters = [char for char in text if char.isalpha()]
+        if not letters:
+            return None
+        in_script = sum(1 for char in letters if any(lo <= ord(char) <= hi for lo, hi in self.ranges))
+        if in_script / len(letters) < self.min_ratio:
+            return None
+        if self.marker_chars and not any(char in self.marker_chars for char in text):
+            return None
+        if self.excluded_chars and any(char in self.excluded_chars for char in text):
+            return None
+        return self.verdict
+
+
+@dataclass
+class NaiveBayesCheck:
+    """A tiny multinomial naive Bayes classifier trained on labelled examples.
+
+    ``examples`` are ``(text, tripwire_triggered)`` pairs. The verdict's confidence is the
+    posterior probability of the predicted label, so weak predictions fall below the
+    pipeline's ``min_confidence`` and escalate.
+    """
+
+    examples: Iterable[tuple[str, bool]]
+    name: str = "naive_bayes"
+
+    def __post_init__(self) -> None:
+        self._counts = {True: Counter(), False: Counter()}
+        self._docs = {True: 0, False: 0}
+        for text, label in self.examples:
+            self._counts[label].update(normalize(text).split())
+            self._docs[label] += 1
+        self._totals = {label: sum(counts.values()) for label, counts in self._counts.items()}
+        self._vocabulary = len(set(self._counts[True]) | set(self._counts[False])) or 1
+
+    def __call__(self, text: str) -> Verdict | None:
+        words = normalize(text).split()
+        total_docs = sum(self._docs.values())
+        if not words or not total_docs:
+            return None
+
+        scores = {}
+        for label in (True, False):
+            score = math.log((self._docs[label] + 1) / (total_docs + 2))
+            denominator = self._totals[label] + self._vocabulary
+            for word in words:
+                score += math.log((self._counts[label][word] + 1) / denominator)
+            scores[label] = score
+
+        best = max(scores, key=scores.__getitem__)
+        other = scores[not best]
+        confidence = 1.0 / (1.0 + math.exp(other - scores[best]))
+        return Verdict(tripwire_triggered=best, confidence=confidence, reason="local classifier")
+
+
+@dataclass
+class TierStats:
+    local: Counter[str] = field(default_factory=Counter)
+    """Decisions made by each local check."""
+
+    escalated: int = 0
+    local_seconds: float = 0.0
+    escalated_seconds: float = 0.0
+
+    @property
+    def decided_locally(self) -> int:
+        return sum(self.local.values())
+
+    @property
+    def escalation_rate(self) -> float:
+        total = self.decided_locally + self.escalated
+        return self.escalated / total if total else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"local={self.decided_locally} {dict(self.local)} escalated={self.escalated} "
+            f"escalation_rate={self.escalation_rate:.1%}"
+        )
+
+
+@dataclass
+class TieredGuardrail:
+    checks: list[Check]
+    min_confidence: float = 0.9
+    output_info: Callable[[Verdict], Any] | None = None
+    """Builds ``output_info`` from a local verdict; by default the ``Verdict`` itself."""
+
+    stats: TierStats = field(default_factory=TierStats)
+
+    def evaluate(self, text: str) -> Verdict | None:
+        """Run the local checks. Returns ``None`` if the input needs the LLM guardrail."""
+        for check in self.checks:
+            verdict = check(text)
+            if verdict is not None and verdict.confidence >= self.min_confidence:
+                return replace(verdict, check=check.name)
+        return None
+
+    def tiered(
+        self,
+        func: Callable[[Any, Any, Any], Awaitable[GuardrailFunctionOutput]],
+    ) -> Callable[[Any, Any, Any], Awaitable[GuardrailFunctionOutput]]:
+        """Wrap an async guardrail function so it only runs when no local check decides.
+        Local decisions put the ``Verdict``, or ``output_info(verdict)``, in ``output_info``."""
+
+        @functools.wraps(func)
+        async def wrapper(ctx: Any, agent: Any, value: Any) -> GuardrailFunctionOutput:
+            start = time.perf_counter()
+            verdict = self.evaluate(input_text(value))
+            self.stats.local_seconds += time.perf_counter() - start
+            if verdict is not None:
+                self.stats.local[verdict.check] += 1
+                info = self.output_info(verdict) if self.output_info is not None else verdict
+                return GuardrailFunctionOutput(output_info=info, tripwire_triggered=verdict.tripwire_triggered)
+
+            self.stats.escalated += 1
+            start = time.perf_counter()
+            try:
+                return await func(ctx, agent, value)
+            finally:
+                self.stats.escalated_seconds += time.perf_counter() - start
+
+        return wrapper
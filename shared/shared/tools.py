@@ -0,0 +1,362 @@
+"""``function_tool`` with result caching and execution modes.
+
+A drop-in for ``agents.function_tool`` that accepts ``cache=`` and ``execution=``.
+
+Deterministic tools like
+``get_weather`` or ``get_user_info`` are called again every time the model asks, even
+with the same arguments. With a ``ToolCache`` the result is kept for ``ttl`` seconds,
+keyed on the tool arguments plus selected context fields (``key_context``), and
+concurrent identical calls share one execution. If the run that started the shared
+execution is cancelled, the runs waiting on it call the tool again instead of being
+cancelled with it.
+
+Usage:
+
+    @function_tool(cache=ToolCache(ttl=300, key_context=("city",)))
+    def get_weather(ctx: RunContextWrapper[CityInfo]) -> dict:
+        ...
+
+Errors are never cached: the call raises into the tool's ``failure_error_function`` as
+usual, and the next call tries again.
+
+The SDK calls sync tools directly on the event loop, so one slow tool stalls every other
+run in the process. ``execution=`` picks where the tool runs instead:
+
+- ``"async"``: on the event loop (for ``async def`` tools, or sync tools that are cheap).
+- ``"thread"``: in a shared, bounded ``ThreadPoolExecutor``, for blocking I/O.
+- ``"process"``: in a shared ``ProcessPoolExecutor``, for CPU-heavy work. The function,
+  its arguments and its result must be picklable, and it can't take the run context.
+
+    @function_tool(execution=Execution("thread", max_concurrency=4, timeout=10))
+    def get_user_info(user_name: str) -> str:
+        ...
+
+Each ``Execution`` limits the tool's concurrent calls, times them out and records queue
+wait separately from execution time in ``execution.stats``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import importlib
+import inspect
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from agents import FunctionTool
+from agents import function_tool as _function_tool
+from agents.tool import ToolErrorFunction, default_tool_error_function
+from agents.function_schema import function_schema
+from agents.tool_context import ToolContext
+
+from .profiler import mark_tool_queue_wait
+
+
+class _OwnerCancelled(Exception):
+    """Set on a coalesced call whose owner was cancelled; waiters retry the call."""
+
+
+@dataclass
+class ToolCacheStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    """Calls that waited for an identical call already in flight."""
+
+    evictions: int = 0
+
+
+@dataclass
+class ToolCache:
+    ttl: float | None = 300.0
+    """Seconds a result stays valid. ``None`` keeps results until they are evicted."""
+
+    max_entries: int = 1024
+    key_context: tuple[str, ...] = ()
+    """Attributes of ``ctx.context`` that are part of the key, e.g. ``("city",)``."""
+
+    coalesce: bool = True
+    stats: ToolCacheStats = field(default_factory=ToolCacheStats)
+
+    def __post_init__(self) -> None:
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future[Any]] = {}
+
+    def key(self, tool_name: str, ctx: ToolContext[Any], arguments: str) -> str:
+        try:
+            arguments = json.dumps(json.loads(arguments or "{}"), sort_keys=True)
+        except json.JSONDecodeError:
+            pass
+        context = {name: repr(getattr(ctx.context, name, None)) for name in self.key_context}
+        return json.dumps([tool_name, arguments, context], sort_keys=True)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def call(self, key: str, invoke: Callable[[], Any]) -> Any:
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return entry[0]
+                del self._entries[key]
+
+            if not (self.coalesce and key in self._in_flight):
+                break
+            self.stats.coalesced += 1
+            try:
+                return await asyncio.shield(self._in_flight[key])
+            except _OwnerCancelled:
+                # The run that owned the call was cancelled, not this one: call again
+                continue
+
+        self.stats.misses += 1
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        if self.coalesce:
+            self._in_flight[key] = future
+        try:
+            result = await invoke()
+        except asyncio.CancelledError:
+            # Cancelling the future would cancel the waiters' runs too
+            self._release(key, future)
+            future.set_exception(_OwnerCancelled())
+            future.exception()
+            raise
+        except BaseException as e:
+            self._release(key, future)
+            future.set_exception(e)
+            # Waiters still get the exception; this only stops the "never retrieved" warning
+            future.exception()
+            raise
+        self._release(key, future)
+        future.set_result(result)
+        self._entries[key] = (result, time.monotonic() + self.ttl if self.ttl else math.inf)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        return result
+
+    def _release(self, key: str, future: asyncio.Future[Any]) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+
+def _apply_cache(tool: FunctionTool, cache: ToolCache, failure_error_function: ToolErrorFunction | None) -> FunctionTool:
+    invoke = tool.on_invoke_tool
+
+    async def on_invoke_tool(ctx: ToolContext[Any], arguments: str) -> Any:
+        try:
+            return await cache.call(cache.key(tool.name, ctx, arguments), lambda: invoke(ctx, arguments))
+        except Exception as e:
+            if failure_error_function is None:
+                raise
+            result = failure_error_function(ctx, e)
+            return await result if inspect.isawaitable(result) else result
+
+    tool.on_invoke_tool = on_invoke_tool
+    return tool
+
+
+_thread_pool: ThreadPoolExecutor | None = None
+_process_pool: ProcessPoolExecutor | None = None
+_max_threads = 32
+_max_processes: int | None = None
+
+# Functions for process-mode tools, by "module:qualname". The decorator replaces the module
+# attribute with a FunctionTool, so worker processes look the raw function up here instead.
+_process_functions: dict[str, Callable[..., Any]] = {}
+
+
+def configure_executors(max_threads: int = 32, max_processes: int | None = None) -> None:
+    """Size the shared pools (``max_processes`` defaults to the CPU count). Existing pools
+    are shut down and recreated on next use."""
+    global _max_threads, _max_processes
+    shutdown_executors(wait=False)
+    _max_threads, _max_processes = max_threads, max_processes
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    global _thread_pool, _process_pool
+    for pool in (_thread_pool, _process_pool):
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+    _thread_pool = _process_pool = None
+
+
+def _executor(mode: str) -> Executor:
+    global _thread_pool, _process_pool
+    if mode == "thread":
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(_max_threads, thread_name_prefix="tool")
+        return _thread_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(_max_processes or os.cpu_count())
+    return _process_pool
+
+
+def _timed_call(func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> tuple[Any, float]:
+    start = time.perf_counter()
+    return func(*args, **kwargs), time.perf_counter() - start
+
+
+def _process_key(func: Callable[..., Any]) -> str:
+    module = "__main__" if func.__module__ == "__mp_main__" else func.__module__
+    return f"{module}:{func.__qualname__}"
+
+
+def _call_registered(key: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> tuple[Any, float]:
+    if key not in _process_functions:
+        # Spawned workers start empty; importing the module runs the decorator again
+        importlib.import_module(key.split(":", 1)[0])
+    return _timed_call(_process_functions[key], args, kwargs)
+
+
+@dataclass
+class ExecutionStats:
+    calls: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    queue_seconds: float = 0.0
+    """Time spent waiting for a concurrency slot and a free worker."""
+
+    exec_seconds: float = 0.0
+    max_queue_seconds: float = 0.0
+    max_exec_seconds: float = 0.0
+
+    @property
+    def mean_queue_seconds(self) -> float:
+        return self.queue_seconds / self.calls if self.calls else 0.0
+
+    @property
+    def mean_exec_seconds(self) -> float:
+        return self.exec_seconds / self.calls if self.calls else 0.0
+
+    def record(self, queue: float, execution: float) -> None:
+        self.calls += 1
+        self.queue_seconds += queue
+        self.exec_seconds += execution
+        self.max_queue_seconds = max(self.max_queue_seconds, queue)
+        self.max_exec_seconds = max(self.max_exec_seconds, execution)
+
+
+@dataclass
+class Execution:
+    mode: Literal["async", "thread", "process"] = "thread"
+    max_concurrency: int | None = None
+    """Calls of this tool running at once. ``None`` is only bounded by the shared pool."""
+
+    timeout: float | None = None
+    """Seconds from the call until the result, queue wait included. A timed-out thread
+    can't be interrupted, so its slot stays taken until it actually returns."""
+
+    stats: ExecutionStats = field(default_factory=ExecutionStats)
+
+    def __post_init__(self) -> None:
+        if self.mode not in ("async", "thread", "process"):
+            raise ValueError(f"Unknown execution mode: {self.mode!r}")
+        self._semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+
+    async def run(self, func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+        called = time.perf_counter()
+        try:
+            result, execution = await asyncio.wait_for(self._start(func, args, kwargs), self.timeout)
+        except TimeoutError:
+            self.stats.timeouts += 1
+            raise TimeoutError(f"Tool {func.__name__} timed out after {self.timeout}s") from None
+        except Exception:
+            self.stats.errors += 1
+            raise
+        queue = time.perf_counter() - called - execution
+        self.stats.record(queue, execution)
+        mark_tool_queue_wait(queue)
+        return result
+
+    async def _start(self, func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> tuple[Any, float]:
+        if self._semaphore is not None:
+            await self._semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            if self.mode == "async":
+                work: asyncio.Future[tuple[Any, float]] = asyncio.ensure_future(self._run_async(func, args, kwargs))
+            else:
+                concurrent: Future[tuple[Any, float]] = (
+                    _executor("thread").submit(_timed_call, func, args, kwargs)
+                    if self.mode == "thread"
+                    else _executor("process").submit(_call_registered, _process_key(func), args, kwargs)
+                )
+                work = asyncio.wrap_future(concurrent)
+        except BaseException:
+            if self._semaphore is not None:
+                self._semaphore.release()
+            raise
+        if self._semaphore is not None:
+            # Release when the work really ends, not when the caller stops waiting
+            if self.mode == "async":
+                work.add_done_callback(lambda _: self._semaphore.release())
+            else:
+                concurrent.add_done_callback(lambda _: loop.call_soon_threadsafe(self._semaphore.release))
+        # On timeout this cancels the task, or drops the call if it hasn't reached a worker yet
+        return await work
+
+    @staticmethod
+    async def _run_async(func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> tuple[Any, float]:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result, time.perf_counter() - start
+
+
+def _apply_execution(func: Callable[..., Any], execution: Execution) -> Callable[..., Any]:
+    if execution.mode == "process":
+        if function_schema(func).takes_context:
+            raise ValueError(f"Tool {func.__name__} takes the run context and can't run in a process.")
+        if inspect.iscoroutinefunction(func):
+            raise ValueError(f"Tool {func.__name__} is async; use the async mode instead.")
+        _process_functions[_process_key(func)] = func
+    elif execution.mode == "thread" and inspect.iscoroutinefunction(func):
+        raise ValueError(f"Tool {func.__name__} is async; use the async mode instead.")
+
+    # Same signature and docstring, so the SDK builds the same schema
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await execution.run(func, args, kwargs)
+
+    return wrapper
+
+
+def function_tool(
+    func: Callable[..., Any] | None = None,
+    *,
+    cache: ToolCache | None = None,
+    execution: Execution | Literal["async", "thread", "process"] | None = None,
+    failure_error_function: ToolErrorFunction | None = default_tool_error_function,
+    **kwargs: Any,
+) -> FunctionTool | Callable[[Callable[..., Any]], FunctionTool]:
+    """``agents.function_tool`` plus ``cache=`` and ``execution=``. Other keyword arguments
+    are passed through."""
+    if isinstance(execution, str):
+        execution = Execution(execution)
+
+    def decorator(f: Callable[..., Any]) -> FunctionTool:
+        if execution is not None:
+            f = _apply_execution(f, execution)
+        if cache is None:
+            return _function_tool(f, failure_error_function=failure_error_function, **kwargs)
+        # Let errors propagate to the cache wrapper so they are reported but never stored
+        tool = _function_tool(f, failure_error_function=None, **kwargs)
+        return _apply_cache(tool, cache, failure_error_function)
+
+    if func is not None:
+        return decorator(func)
+    return decorator
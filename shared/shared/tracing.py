@@ -0,0 +1,290 @@
+"""Non-blocking, batched trace export.
+
+A ``TracingProcessor`` is called synchronously on the hot path of every run: once per span
+start and end. A processor that prints there, or keeps every span in lists until
+``shutdown()``, slows every run and grows without bound. ``BatchingTraceProcessor``
+appends each trace as it starts and each span as it ends to a bounded ``deque``, whose
+appends are atomic without taking a lock. Like the SDK's own processor, it exports a
+trace before its spans, so an exporter can label the spans with the workflow name.
+A background thread serializes and exports them in batches of up to ``max_batch_size``,
+as soon as a batch is waiting (or half the queue, if that is smaller) and at least every
+``schedule_delay`` seconds.
+
+When the queue is full, ``drop_policy`` decides which item is lost: the new one
+(``"drop_newest"``) or the oldest queued one (``"drop_oldest"``). Memory stays bounded
+either way, and ``stats.dropped`` counts the losses. ``force_flush()`` blocks until
+everything queued before the call has been handed to the exporter.
+
+Exporters:
+
+- ``JSONLExporter``: one JSON object per line in a local file.
+- ``OTLPExporter``: OTLP/HTTP JSON to a collector, by default a local one on port 4318.
+
+Usage:
+
+    processor = BatchingTraceProcessor(JSONLExporter("traces/traces.jsonl"))
+    set_trace_processors([processor])
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Literal
+
+import httpx
+from agents.tracing import Span, Trace
+from agents.tracing.processor_interface import TracingExporter, TracingProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class JSONLExporter(TracingExporter):
+    """Appends each exported trace or span as one JSON line."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = os.fspath(path)
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def export(self, items: list[Trace | Span[Any]]) -> None:
+        lines = [json.dumps(exported, default=str) for item in items if (exported := item.export())]
+        if lines:
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        self._file.close()
+
+
+def _unix_nanos(timestamp: str | None) -> str:
+    if not timestamp:
+        return "0"
+    return str(int(datetime.fromisoformat(timestamp).timestamp() * 1e9))
+
+
+def _attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    if not isinstance(value, str):
+        value = json.dumps(value, default=str)
+    return {"key": key, "value": {"stringValue": value}}
+
+
+class OTLPExporter(TracingExporter):
+    """Posts spans as OTLP/HTTP JSON (``/v1/traces``). Traces carry no timing of their own
+    in the SDK, so only spans are sent; the workflow name goes on each span."""
+
+    def __init__(
+        self,
+        endpoint: str = "http://localhost:4318/v1/traces",
+        service_name: str = "openai-agents",
+        timeout: float = 10.0,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._client = httpx.Client(timeout=timeout, headers=headers)
+        self._workflows: dict[str, str] = {}
+
+    def _span(self, span: Span[Any]) -> dict[str, Any]:
+        data = span.span_data.export()
+        kind = data.pop("type", "span")
+        name = data.get("name") or kind
+        otlp: dict[str, Any] = {
+            # SDK ids are "trace_<32 hex>" and "span_<24 hex>"; OTLP wants 32 and 16 hex digits
+            "traceId": span.trace_id.removeprefix("trace_")[-32:],
+            "spanId": span.span_id.removeprefix("span_")[-16:],
+            "name": f"{kind}: {name}" if name != kind else kind,
+            "kind": 1,
+            "startTimeUnixNano": _unix_nanos(span.started_at),
+            "endTimeUnixNano": _unix_nanos(span.ended_at),
+            "attributes": [_attribute(f"agents.{key}", value) for key, value in data.items() if value is not None]
+            + [_attribute("agents.span_type", kind)],
+        }
+        if span.parent_id:
+            otlp["parentSpanId"] = span.parent_id.removeprefix("span_")[-16:]
+        if span.trace_id in self._workflows:
+            otlp["attributes"].append(_attribute("agents.workflow_name", self._workflows[span.trace_id]))
+        if span.error:
+            otlp["status"] = {"code": 2, "message": span.error.get("message", "")}
+        return otlp
+
+    def export(self, items: list[Trace | Span[Any]]) -> None:
+        spans = []
+        for item in items:
+            if isinstance(item, Trace):
+                self._workflows[item.trace_id] = item.name
+                # Keep the lookup bounded: the oldest workflows are long finished
+                while len(self._workflows) > 10_000:
+                    self._workflows.pop(next(iter(self._workflows)))
+            else:
+                spans.append(self._span(item))
+        if not spans:
+            return
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_attribute("service.name", self.service_name)]},
+                    "scopeSpans": [{"scope": {"name": "openai-agents"}, "spans": spans}],
+                }
+            ]
+        }
+        self._client.post(self.endpoint, json=payload).raise_for_status()
+
+    def shutdown(self) -> None:
+        self._client.close()
+
+
+@dataclass
+class TraceExportStats:
+    enqueued: int = 0
+    dropped: int = 0
+    exported: int = 0
+    batches: int = 0
+    export_errors: int = 0
+    export_seconds: float = 0.0
+
+
+class BatchingTraceProcessor(TracingProcessor):
+    def __init__(
+        self,
+        exporter: TracingExporter,
+        max_queue_size: int = 8192,
+        max_batch_size: int = 256,
+        schedule_delay: float = 2.0,
+        drop_policy: Literal["drop_newest", "drop_oldest"] = "drop_newest",
+    ) -> None:
+        if drop_policy not in ("drop_newest", "drop_oldest"):
+            raise ValueError(f"Unknown drop policy: {drop_policy!r}")
+        self.exporter = exporter
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.schedule_delay = schedule_delay
+        self.drop_policy = drop_policy
+        self.stats = TraceExportStats()
+
+        # Wake the worker early enough that a small queue doesn't fill before the timer
+        self._export_trigger = max(1, min(max_batch_size, max_queue_size // 2))
+        self._queue: deque[Trace | Span[Any]] = deque(maxlen=max_queue_size)
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._flush_requests: list[threading.Event] = []
+        self._worker: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def _enqueue(self, item: Trace | Span[Any]) -> None:
+        if self._stopping.is_set():
+            self.stats.dropped += 1
+            return
+        if self._worker is None:
+            self._start_worker()
+        if len(self._queue) >= self.max_queue_size:
+            self.stats.dropped += 1
+            if self.drop_policy == "drop_newest":
+                return
+        # With drop_oldest the deque's maxlen evicts the oldest item
+        self._queue.append(item)
+        self.stats.enqueued += 1
+        if len(self._queue) >= self._export_trigger and not self._wake.is_set():
+            self._wake.set()
+
+    def _start_worker(self) -> None:
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._worker.start()
+
+    def on_trace_start(self, trace: Trace) -> None:
+        self._enqueue(trace)
+
+    def on_trace_end(self, trace: Trace) -> None:
+        # Exported at the start: a trace carries no timing, and its spans need its name
+        pass
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        pass
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        self._enqueue(span)
+
+    def force_flush(self, timeout: float | None = None) -> bool:
+        """Export everything queued before this call. Returns ``False`` on timeout."""
+        if self._worker is None or not self._worker.is_alive():
+            self._drain()
+            return True
+        done = threading.Event()
+        with self._flush_lock:
+            self._flush_requests.append(done)
+        self._wake.set()
+        return done.wait(timeout)
+
+    def shutdown(self, timeout: float | None = None) -> bool:
+        """Stop accepting items, export what is queued and close the exporter. Returns
+        ``False`` if the worker is still exporting after ``timeout``; it then closes the
+        exporter itself once its last batch is done."""
+        self._stopping.set()
+        self._wake.set()
+        if self._worker is None:
+            self._drain()
+            self._close_exporter()
+            return True
+        self._worker.join(timeout)
+        if self._worker.is_alive():
+            logger.warning("Trace exporter still busy after %ss; it will close when done", timeout)
+            return False
+        return True
+
+    def _close_exporter(self) -> None:
+        shutdown = getattr(self.exporter, "shutdown", None)
+        if callable(shutdown):
+            shutdown()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.schedule_delay)
+            self._wake.clear()
+            with self._flush_lock:
+                requests, self._flush_requests = self._flush_requests, []
+            self._drain()
+            for request in requests:
+                request.set()
+            if self._stopping.is_set():
+                # Flushes requested while stopping are satisfied by the final drain
+                self._drain()
+                with self._flush_lock:
+                    for request in self._flush_requests:
+                        request.set()
+                # Only here: closing from shutdown() could race an export still running
+                self._close_exporter()
+                return
+
+    def _drain(self) -> None:
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < self.max_batch_size:
+                batch.append(self._queue.popleft())
+            start = time.perf_counter()
+            try:
+                self.exporter.export(batch)
+            except Exception:
+                # The batch is lost; retrying would let a dead collector grow memory
+                self.stats.export_errors += 1
+                logger.exception("Trace export failed, dropping %d items", len(batch))
+            else:
+                self.stats.exported += len(batch)
+                self.stats.batches += 1
+            finally:
+                self.stats.export_seconds += time.perf_counter() - start
@@ -0,0 +1,39 @@
+"""Shared fixtures: tests run their flows against ``MockOpenAIServer``.
+
+The suite has no async plugin, so each test drives its own event loop with
+``asyncio.run`` and opens the server with the ``serve`` fixture inside it.
+"""
+
+from __future__ import annotations
+
+import contextlib
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+from agents import set_tracing_disabled
+
+from shared import provider
+from shared.mock_server import MockOpenAIServer, Responder, echo_responder
+
+
+@contextlib.asynccontextmanager
+async def _serve(responder: Responder = echo_responder, **kwargs: Any) -> AsyncIterator[MockOpenAIServer]:
+    async with MockOpenAIServer(responder, **kwargs) as server:
+        provider.configure(base_url=server.base_url, api_key="mock", model="mock-model")
+        try:
+            yield server
+        finally:
+            # The pooled client belongs to this test's event loop
+            await provider.aclose()
+
+
+@pytest.fixture(autouse=True)
+def _no_tracing() -> None:
+    set_tracing_disabled(True)
+
+
+@pytest.fixture
+def serve():
+    """``async with serve(responder, latency=...) as server``: the provider points at it."""
+    return _serve
@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+from agents import Agent
+
+from shared import provider
+from shared.batch_translate import BatchTranslator
+
+
+def responder(seen_instructions: list[str]):
+    def reply(body):
+        instructions, text = body["messages"][0]["content"], body["messages"][-1]["content"]
+        seen_instructions.append(instructions)
+        if "JSON array" not in instructions:
+            return f"[es] {text}"
+        # The model never returns item 3 in a batch reply
+        return json.dumps([{"id": item["id"], "translation": f"[es] {item['text']}"} for item in json.loads(text) if item["id"] != 3])
+
+    return reply
+
+
+def translate(serve, agent: Agent, seen: list[str]) -> tuple[list, BatchTranslator]:
+    async def main():
+        async with serve(responder(seen)):
+            translator = BatchTranslator({"Spanish": agent}, batch_size=4, max_retries=1)
+            return [result async for result in translator.translate(f"text {i}" for i in range(6))], translator
+
+    return asyncio.run(main())
+
+
+def test_item_missing_from_every_batch_reply_is_translated_alone(serve):
+    agent = Agent(name="Spanish Agent", instructions="Translate English to Spanish.", model=provider.get_model())
+    results, translator = translate(serve, agent, [])
+    assert [result.translations["Spanish"] for result in results] == [f"[es] text {i}" for i in range(6)]
+    assert not any(result.errors for result in results)
+    assert translator.stats.single_items == 1
+    assert translator.stats.failed_items == 0
+
+
+def test_dynamic_and_missing_instructions_are_kept(serve):
+    def instructions(ctx, agent) -> str:
+        return f"You are {agent.name}. Translate English to Spanish."
+
+    seen: list[str] = []
+    results, _ = translate(serve, Agent(name="Dynamic", instructions=instructions, model=provider.get_model()), seen)
+    assert all(result.translations for result in results)
+    assert seen[0].startswith("You are Dynamic. Translate English to Spanish.\n")
+    assert "JSON array" in seen[0]
+
+    seen.clear()
+    translate(serve, Agent(name="Bare", model=provider.get_model()), seen)
+    assert seen[0].lstrip().startswith("You will receive a JSON array")
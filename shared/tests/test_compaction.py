@@ -0,0 +1,53 @@
+from agents import HandoffInputData
+
+from shared.compaction import SUMMARY_PREFIX, HandoffCompactor
+
+
+def message(role: str, text: str) -> dict:
+    return {"role": role, "content": text}
+
+
+def conversation(turns: int) -> tuple:
+    history = []
+    for turn in range(turns):
+        history.append(message("user", f"Question {turn}. " + "Tell me more about Lahore. " * 10))
+        history.append(message("assistant", f"Answer {turn}. " + "Lahore is a city in Punjab. " * 10))
+    return tuple(history)
+
+
+def compact(compactor: HandoffCompactor, history: tuple) -> tuple:
+    return compactor(HandoffInputData(input_history=history, pre_handoff_items=(), new_items=())).input_history
+
+
+def test_short_history_is_forwarded_unchanged():
+    history = conversation(1)
+    assert compact(HandoffCompactor(budget=2000), history) == history
+
+
+def test_tool_items_are_dropped():
+    history = (
+        message("user", "weather in lahore?"),
+        {"type": "function_call", "call_id": "call_1", "name": "get_weather", "arguments": '{"city": "Lahore"}'},
+        {"type": "function_call_output", "call_id": "call_1", "output": "sunny"},
+        message("assistant", "It is sunny."),
+    )
+    compactor = HandoffCompactor()
+    assert compact(compactor, history) == (history[0], history[3])
+    assert compactor.stats.dropped_tool_items == 2
+
+
+def test_older_messages_fold_into_a_summary_that_is_carried_forward():
+    compactor = HandoffCompactor(budget=400, summary_budget=150)
+    first = compact(compactor, conversation(6))
+    summary = first[0]
+    assert summary["role"] == "system" and summary["content"].startswith(SUMMARY_PREFIX)
+    assert "- user: Question 0." in summary["content"]
+    assert first[-1] == conversation(6)[-1]
+    assert compactor.stats.tokens_after < compactor.stats.tokens_before
+
+    # The next handoff extends the summary instead of rebuilding it from scratch
+    second = compact(compactor, first + conversation(8)[12:])
+    assert second[0]["content"].count(SUMMARY_PREFIX) == 1
+    assert "- user: Question 6." in second[0]["content"]
+    assert second[-1] == conversation(8)[-1]
+    assert sum(compactor.estimate(item["content"]) for item in second) <= 400
@@ -0,0 +1,53 @@
+import copy
+import pickle
+from dataclasses import dataclass
+
+import pytest
+
+from shared.context import ContextOverlay, TenantState, TenantStore
+
+
+@dataclass(frozen=True, slots=True)
+class CityInfo:
+    city: str
+    country: str = "Pakistan"
+
+
+def test_overlay_reads_through_and_keeps_writes_to_itself():
+    session = CityInfo(city="Karachi")
+    overlay = ContextOverlay(session)
+    assert overlay.city == "Karachi"
+    overlay.city = "Lahore"
+    assert overlay.city == "Lahore" and session.city == "Karachi"
+    assert dict(overlay.changes) == {"city": "Lahore"}
+    assert overlay.commit() == CityInfo(city="Lahore")
+    with pytest.raises(AttributeError, match="no field"):
+        overlay.tenant = "acme"
+
+
+def test_overlay_can_be_copied_and_pickled():
+    overlay = ContextOverlay(CityInfo(city="Karachi"))
+    overlay.city = "Lahore"
+
+    shallow = copy.copy(overlay)
+    shallow.country = "India"
+    assert shallow.city == "Lahore"
+    assert "country" not in overlay.changes
+
+    for restored in (copy.deepcopy(overlay), pickle.loads(pickle.dumps(overlay))):
+        assert restored.city == "Lahore"
+        assert restored.commit() == CityInfo(city="Lahore")
+
+    # Before __init__ has run, the overlay's own slots are missing, not looked up on the base
+    with pytest.raises(AttributeError):
+        ContextOverlay.__new__(ContextOverlay).city
+
+
+def test_tenant_store_shares_and_evicts_snapshots():
+    store = TenantStore(lambda tenant_id: TenantState(tenant_id, profile={"plan": "pro"}), max_size=1)
+    assert store.get("acme") is store.get("acme")
+    store.get("globex")
+    assert len(store) == 1
+    assert store.stats.evictions == 1
+    with pytest.raises(TypeError):
+        store.get("globex").profile["plan"] = "free"
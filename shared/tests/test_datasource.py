@@ -0,0 +1,39 @@
+import pytest
+
+from shared.datasource import DataSource, Index
+
+
+def test_records_with_different_keys():
+    source = DataSource.from_records([{"a": 1}, {"a": 2, "b": 3}], indexes=[Index("b"), Index("a")])
+    assert source.get("b", 3) == {"a": 2, "b": 3}
+    assert source.get("a", 1) == {"a": 1, "b": None}
+    assert source.get("b", None) is None
+    assert list(source) == [{"a": 1, "b": None}, {"a": 2, "b": 3}]
+
+
+def test_lookups_are_case_insensitive_and_prefix_sorted():
+    source = DataSource.from_records(
+        [{"user_name": "JimBeam789"}, {"user_name": "jimmy"}, {"user_name": "ali"}, {"city": "Lahore"}],
+        indexes=[Index("user_name", case_insensitive=True, prefix=True)],
+    )
+    assert source.get("user_name", "jimbeam789") == {"user_name": "JimBeam789", "city": None}
+    assert [row["user_name"] for row in source.find_prefix("user_name", "JIM")] == ["JimBeam789", "jimmy"]
+    # The row without a user name isn't indexed as "none"
+    assert source.find_prefix("user_name", "no") == []
+
+
+def test_reload_swaps_in_the_changed_file(tmp_path):
+    path = tmp_path / "users.csv"
+    path.write_text("user_name,age\nali,30\n", encoding="utf-8")
+    source = DataSource.from_file(path, indexes=[Index("user_name")])
+    assert source.get("user_name", "ali") == {"user_name": "ali", "age": "30"}
+
+    path.write_text("user_name,age\nsara,25\n", encoding="utf-8")
+    source.reload()
+    assert source.get("user_name", "ali") is None
+    assert source.get("user_name", "sara") == {"user_name": "sara", "age": "25"}
+
+
+def test_unsupported_files_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported"):
+        DataSource.from_file(tmp_path / "users.txt")
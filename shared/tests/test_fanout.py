@@ -0,0 +1,79 @@
+import asyncio
+
+from agents import Agent, GuardrailFunctionOutput, RunContextWrapper, Runner, input_guardrail
+
+from shared import provider
+from shared.fanout import FanOut
+from shared.mock_server import Script, ScriptedResponder
+
+
+@input_guardrail
+async def always_trips(ctx, agent, input) -> GuardrailFunctionOutput:
+    return GuardrailFunctionOutput(output_info="blocked", tripwire_triggered=True)
+
+
+def tool_outputs(result) -> list[str]:
+    return [item.output for item in result.new_items if item.type == "tool_call_output_item"]
+
+
+def test_fan_out_reports_failing_and_unknown_targets(serve):
+    script = Script(
+        tool_calls={"translate": '{"input": "hello", "targets": ["Spanish", "French", "Klingon"]}'},
+        reply="All done.",
+    )
+
+    async def main():
+        async with serve(ScriptedResponder(script)):
+            model = provider.get_model()
+            spanish = Agent(name="Spanish", instructions="translate to spanish", model=model)
+            french = Agent(name="French", instructions="translate to french", model=model, input_guardrails=[always_trips])
+            fan_out = FanOut()
+            orchestrator = Agent(
+                name="Orchestrator",
+                tools=[fan_out.fan_out_tool({"Spanish": spanish, "French": french}, "translate", "Translate.")],
+                model=model,
+            )
+            result = await Runner.run(orchestrator, "translate hello")
+
+            assert result.final_output == "All done."
+            [output] = tool_outputs(result)
+            spanish_line, french_line, klingon_line = output.splitlines()
+            assert spanish_line == "Spanish: All done."
+            assert french_line.startswith("French: Error: ")
+            assert klingon_line == "Klingon: Error: unknown target 'Klingon', expected one of Spanish, French."
+            assert fan_out.stats.errors == 2
+
+    asyncio.run(main())
+
+
+def test_as_tool_returns_errors_to_the_model(serve):
+    async def main():
+        async with serve(ScriptedResponder(Script(tool_calls={"translate_to_spanish": '{"input": "hello"}'}))):
+            model = provider.get_model()
+            fan_out = FanOut()
+            failing = Agent(name="Spanish", model=model, input_guardrails=[always_trips])
+            tool = fan_out.as_tool(failing, "translate_to_spanish", "Translate to Spanish.")
+
+            # A failing sub-agent doesn't end the orchestrator's run
+            result = await Runner.run(Agent(name="Orchestrator", tools=[tool], model=model), "translate hello")
+            assert result.final_output == "Done."
+            assert tool_outputs(result)[0].startswith("An error occurred while running the tool.")
+
+            # Nor do malformed arguments
+            output = await tool.on_invoke_tool(RunContextWrapper(context=None), "not json")
+            assert output.startswith("An error occurred while running the tool.")
+            assert fan_out.stats.errors == 2
+
+    asyncio.run(main())
+
+
+def test_timed_out_target_answers_with_an_error(serve):
+    async def main():
+        async with serve(latency=0.5):
+            fan_out = FanOut(timeout=0.05)
+            slow = Agent(name="Spanish", model=provider.get_model())
+            output = await fan_out.run_agent(slow, "hello")
+            assert output == "Error: Spanish did not answer within 0.05 seconds."
+            assert fan_out.stats.timeouts == 1
+
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+import asyncio
+
+from agents import Agent, GuardrailFunctionOutput
+from pydantic import BaseModel
+
+from shared.guardrail_batch import GuardrailBatcher
+
+
+class WeatherCheck(BaseModel):
+    is_weather_query: bool
+
+
+def test_followers_judge_alone_when_their_leader_is_cancelled():
+    async def main():
+        batcher = GuardrailBatcher(
+            Agent(name="Guardrail", instructions="Is it a weather query?", output_type=WeatherCheck),
+            tripwire=lambda verdict: not verdict.is_weather_query,
+        )
+        calls = []
+
+        async def check(ctx, agent, input):
+            calls.append(input)
+            return GuardrailFunctionOutput(output_info=None, tripwire_triggered=False)
+
+        run = batcher._run
+
+        async def run_then_cancel_leader(batch):
+            await run(batch)
+            # The leader's future is set, but it hasn't woken up to judge the input yet
+            leader.cancel()
+
+        batcher._run = run_then_cancel_leader
+        guarded = batcher.batched(check)
+        # Identical inputs: no batch call, the first judges alone and the others follow it
+        leader = asyncio.create_task(guarded(None, None, "weather in lahore?"))
+        followers = [asyncio.create_task(guarded(None, None, "weather in lahore?")) for _ in range(2)]
+
+        outputs = await asyncio.wait_for(asyncio.gather(*followers), timeout=1)
+        assert leader.cancelled()
+        assert all(not output.tripwire_triggered for output in outputs)
+        assert batcher.stats.coalesced == 2
+        # Cancelled before judging: each follower judged its input itself
+        assert len(calls) == 2
+
+    asyncio.run(main())
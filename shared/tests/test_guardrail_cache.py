@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+
+from agents import GuardrailFunctionOutput
+
+from shared.guardrail_cache import GuardrailCache, normalize
+
+
+def verdict(tripped: bool) -> GuardrailFunctionOutput:
+    return GuardrailFunctionOutput(output_info=None, tripwire_triggered=tripped)
+
+
+def test_similar_inputs_share_a_verdict():
+    cache = GuardrailCache(similarity_threshold=0.85)
+    cache.put("what is the weather in islamabad?", verdict(False))
+    assert cache.get("islamabad: what is the weather in") is not None
+    assert cache.stats.similar_hits == 1
+
+
+def test_negated_input_never_matches():
+    cache = GuardrailCache(similarity_threshold=0.85)
+    cache.put("is it raining in islamabad", verdict(False))
+    assert cache.get("is it not raining in islamabad") is None
+    assert cache.get("isn't it raining in islamabad") is None
+    assert normalize("Isn't it raining?") == "is not it raining"
+    assert cache.stats.misses == 2
+
+
+def test_exact_matches_only_by_default():
+    cache = GuardrailCache()
+    cache.put("weather in lahore", verdict(False))
+    assert cache.get("Weather in Lahore!") is not None
+    assert cache.get("weather in lahore today") is None
+
+
+def test_cache_key_keeps_tenants_apart():
+    cache = GuardrailCache(similarity_threshold=0.85, cache_key=lambda ctx: ctx.context.tenant)
+    calls: list[str] = []
+
+    @cache.cached
+    async def guardrail(ctx, agent, input):
+        calls.append(ctx.context.tenant)
+        return verdict(ctx.context.tenant == "strict")
+
+    async def main():
+        for tenant in ("strict", "lenient", "strict", "lenient"):
+            ctx = SimpleNamespace(context=SimpleNamespace(tenant=tenant))
+            result = await guardrail(ctx, None, "weather in lahore")
+            assert result.tripwire_triggered == (tenant == "strict")
+
+    asyncio.run(main())
+    assert calls == ["strict", "lenient"]
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from agents import Agent, GuardrailFunctionOutput, InputGuardrailTripwireTriggered, input_guardrail
+
+from shared import provider
+from shared.guardrail_scheduling import GuardrailScheduler
+
+
+def guarded_agent(*guardrails) -> Agent:
+    return Agent(name="Assistant", instructions="Answer.", model=provider.get_model(), input_guardrails=list(guardrails))
+
+
+def verdict(tripped: bool, delay: float = 0.0):
+    @input_guardrail
+    async def check(ctx, agent, input):
+        await asyncio.sleep(delay)
+        return GuardrailFunctionOutput(output_info="checked", tripwire_triggered=tripped)
+
+    return check
+
+
+def test_blocking_runs_the_agent_only_after_every_guardrail_passed(serve):
+    async def main():
+        async with serve() as server:
+            scheduler = GuardrailScheduler("blocking")
+            result = await scheduler.run(guarded_agent(verdict(False), verdict(False, delay=0.01)), "hello")
+            assert result.final_output == "You said: hello"
+            assert len(result.input_guardrail_results) == 2
+
+            with pytest.raises(InputGuardrailTripwireTriggered):
+                await scheduler.run(guarded_agent(verdict(True)), "hello")
+            # The rejected input never reached the model
+            assert server.stats.requests == 1
+            assert scheduler.stats.trips == 1
+
+    asyncio.run(main())
+
+
+def test_speculative_trip_cancels_the_running_agent(serve):
+    async def main():
+        async with serve(latency=0.5) as server:
+
+            @input_guardrail
+            async def trips_once_the_agent_is_waiting(ctx, agent, input):
+                while not server.stats.requests:
+                    await asyncio.sleep(0.01)
+                return GuardrailFunctionOutput(output_info="not allowed", tripwire_triggered=True)
+
+            scheduler = GuardrailScheduler("speculative")
+            with pytest.raises(InputGuardrailTripwireTriggered):
+                await scheduler.run(guarded_agent(trips_once_the_agent_is_waiting), "hello")
+            assert scheduler.stats.agents_cancelled == 1
+
+    asyncio.run(main())
+
+
+def test_deadline_fails_open_or_closed(serve):
+    async def main():
+        async with serve():
+            agent = guarded_agent(verdict(False, delay=5))
+            fail_open = GuardrailScheduler("deadline", deadline=0.05)
+            result = await fail_open.run(agent, "hello")
+            assert result.final_output == "You said: hello"
+            assert fail_open.stats.timeouts == 1
+
+            fail_closed = GuardrailScheduler(
+                "deadline", deadline=0.05, on_timeout="trip", timeout_info=lambda guardrail: "too slow"
+            )
+            with pytest.raises(InputGuardrailTripwireTriggered) as tripped:
+                await fail_closed.run(agent, "hello")
+            assert tripped.value.guardrail_result.output.output_info == "too slow"
+
+    asyncio.run(main())
+
+
+def test_deadline_policy_needs_a_deadline():
+    with pytest.raises(ValueError, match="deadline"):
+        GuardrailScheduler("deadline")
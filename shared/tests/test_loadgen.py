@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+from agents import Agent, Runner
+
+from shared import provider
+from shared.loadgen import LoadResult, LoopLagMonitor, closed_loop, format_results, open_loop, saturation, sweep
+
+
+def test_closed_loop_keeps_every_session_busy():
+    async def request(session: int) -> None:
+        await asyncio.sleep(0.01)
+        if session == 0:
+            raise RuntimeError("boom")
+
+    result = asyncio.run(closed_loop(request, sessions=4, duration=0.2))
+    assert result.peak_in_flight == 4
+    assert result.completed >= 3 * 10
+    assert result.errors >= 10 and result.last_error == "RuntimeError: boom"
+    assert result.latency.count == result.completed
+
+
+def test_open_loop_sheds_arrivals_beyond_max_in_flight():
+    async def request(session: int) -> None:
+        await asyncio.sleep(0.1)
+
+    result = asyncio.run(open_loop(request, rps=200, duration=0.2, max_in_flight=5, seed=1))
+    assert result.peak_in_flight == 5
+    assert result.shed > 0
+    assert result.completed + result.shed > 20
+
+
+def test_loop_lag_shows_blocking_calls():
+    async def main():
+        async with LoopLagMonitor(interval=0.005) as monitor:
+            await asyncio.sleep(0.02)
+            time.sleep(0.05)
+            await asyncio.sleep(0.02)
+        return monitor.lag
+
+    lag = asyncio.run(main())
+    # Histogram values are microseconds
+    assert lag.max >= 40_000
+
+
+def test_saturation_is_the_last_level_that_still_added_throughput():
+    def closed(level: int, completed: int) -> LoadResult:
+        return LoadResult("closed", level, elapsed=1.0, completed=completed)
+
+    results = [closed(1, 10), closed(8, 70), closed(64, 72)]
+    assert saturation(results) is results[1]
+    assert saturation(results[:2]) is None
+    served = LoadResult("open", 10, elapsed=1.0, completed=10)
+    shedding = LoadResult("open", 100, elapsed=1.0, completed=60, shed=40)
+    assert saturation([served, shedding]) is served
+
+
+def test_sweep_against_the_mock_server(serve):
+    async def main():
+        async with serve(latency=0.01):
+            agent = Agent(name="Assistant", instructions="Answer.", model=provider.get_model())
+
+            async def request(session: int) -> None:
+                await Runner.run(agent, "Hello how are you?")
+
+            return await sweep(request, [1, 4], duration=0.2)
+
+    results = asyncio.run(main())
+    assert [result.level for result in results] == [1, 4]
+    for result in results:
+        assert result.errors == 0
+        assert result.pool.model_calls == result.completed > 0
+        assert result.memory_per_session > 0
+    assert results[1].throughput > results[0].throughput
+    table = format_results(results)
+    assert table.splitlines()[0].split()[:2] == ["level", "runs/s"]
+    assert len(table.splitlines()) == 3
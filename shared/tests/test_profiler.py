@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from agents import Agent, Runner
+from agents.tracing import get_trace_provider, set_trace_provider
+from agents.tracing.provider import DefaultTraceProvider
+
+from shared import provider
+from shared.profiler import LatencyHistogram, ProfilingProcessor
+
+
+def test_histogram_percentiles_stay_within_one_percent():
+    histogram = LatencyHistogram()
+    for millis in range(1, 1001):
+        histogram.record(millis / 1000)
+    assert histogram.count == 1000
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=0.01)
+    assert histogram.percentile(99) == pytest.approx(0.99, rel=0.01)
+    assert histogram.max == 1_000_000
+
+
+@pytest.fixture
+def profiler():
+    previous = get_trace_provider()
+    trace_provider = DefaultTraceProvider()
+    profiler = ProfilingProcessor()
+    trace_provider.set_processors([profiler])
+    set_trace_provider(trace_provider)
+    yield profiler
+    set_trace_provider(previous)
+
+
+def test_streamed_runs_report_queue_wait_and_first_token(serve, profiler):
+    async def main():
+        async with serve(latency=0.02, token_delay=0.001):
+            provider.configure(max_in_flight=1)
+            agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=provider.get_model())
+            config = provider.get_run_config(tracing_disabled=False)
+
+            async def streamed(text: str) -> None:
+                result = Runner.run_streamed(agent, text, run_config=config)
+                async for _ in result.stream_events():
+                    pass
+
+            await asyncio.gather(streamed("hello"), streamed("hello again"))
+
+    asyncio.run(main())
+    histograms = profiler.histograms
+    assert histograms["run"].count == 2
+    assert histograms["model"].count == 2
+    assert histograms["time to first token"].count == 2
+    assert histograms["model queue"].count == 2
+    # One run waited for the other's slot
+    assert histograms["model queue"].max >= 10_000
+    assert any(path.endswith("agent:Assistant;model queue") for path in profiler.stacks)
+    assert "time to first token" in profiler.report()
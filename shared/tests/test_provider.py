@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from agents import Agent, Runner
+
+from shared import provider
+from shared.mock_server import MockOpenAIServer
+
+
+def agent() -> Agent:
+    return Agent(name="Assistant", instructions="You are a helpful assistant", model=provider.get_model())
+
+
+def test_models_need_no_api_key_until_the_first_call(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    provider.configure(api_key=None)
+    model = provider.get_model()
+    config = provider.get_run_config()
+    assert config.model is model
+
+    with pytest.raises(ValueError, match="GEMINI_API_KEY"):
+        asyncio.run(Runner.run(agent(), "hello", run_config=config))
+
+
+def test_models_outlive_aclose_and_their_event_loop(serve):
+    port = None
+
+    async def contended_calls() -> None:
+        await asyncio.gather(*(Runner.run(agent(), f"hello {i}") for i in range(4)))
+
+    async def first():
+        nonlocal port
+        async with serve(latency=0.01) as server:
+            provider.configure(max_in_flight=1)
+            port = server.port
+            await contended_calls()
+        assert provider.pool_stats().slot_waits
+
+    async def second():
+        # Same server address and settings, a new event loop: only aclose() has run since
+        async with MockOpenAIServer(port=port, latency=0.01):
+            try:
+                await contended_calls()
+            finally:
+                await provider.aclose()
+
+    asyncio.run(first())
+    asyncio.run(second())
+    assert provider.pool_stats().model_calls == 8
+
+
+def test_hooks_see_slot_waits_first_tokens_and_stream_events(serve):
+    waits: list[float] = []
+    first_tokens: list[int] = []
+    seen: list[str] = []
+
+    def wrap_stream(events):
+        async def wrapped():
+            async for event in events:
+                seen.append(event.type)
+                yield event
+
+        return wrapped()
+
+    hooks = provider.ModelHooks(
+        on_slot=waits.append, on_first_token=lambda: first_tokens.append(len(seen)), wrap_stream=wrap_stream
+    )
+
+    async def main():
+        async with serve():
+            result = Runner.run_streamed(agent(), "hello there")
+            async for _ in result.stream_events():
+                pass
+            await Runner.run(agent(), "hello again")
+
+    provider.add_hooks(hooks)
+    try:
+        asyncio.run(main())
+    finally:
+        provider.remove_hooks(hooks)
+    assert len(waits) == 2
+    # Reported before the wrapped stream sees the delta
+    assert first_tokens == [seen.index("response.output_text.delta")]
+
+
+def test_model_wrappers_apply_to_models_returned_after_them():
+    provider.configure(model="mock-model")
+    before = provider.get_model()
+    wrapped: list[object] = []
+
+    def wrapper(model):
+        wrapped.append(model)
+        return model
+
+    provider.add_model_wrapper(wrapper)
+    try:
+        after = provider.get_model()
+        assert wrapped == [after]
+        assert after is not before
+    finally:
+        provider.remove_model_wrapper(wrapper)
@@ -0,0 +1,56 @@
+import asyncio
+
+from agents import Agent, Runner
+
+from shared import provider
+from shared.response_cache import CachedModel, bypass_response_cache, enable_response_cache
+
+
+def agent() -> Agent:
+    return Agent(name="Assistant", instructions="You are a helpful assistant", model=provider.get_model())
+
+
+def test_enabled_cache_wraps_pooled_models_and_replays_responses(serve, monkeypatch):
+    monkeypatch.delenv("RESPONSE_CACHE", raising=False)
+
+    async def main():
+        async with serve() as server:
+            assert isinstance(provider.get_model(), CachedModel)
+            first = await Runner.run(agent(), "hello")
+            second = await Runner.run(agent(), "hello")
+            assert second.final_output == first.final_output
+
+            streamed = Runner.run_streamed(agent(), "hello stream")
+            async for _ in streamed.stream_events():
+                pass
+            replayed = Runner.run_streamed(agent(), "hello stream")
+            async for _ in replayed.stream_events():
+                pass
+            assert replayed.final_output == streamed.final_output
+            assert server.stats.requests == 2
+
+            with bypass_response_cache():
+                await Runner.run(agent(), "hello")
+            assert server.stats.requests == 3
+
+    assert enable_response_cache(":memory:") is not None
+    try:
+        asyncio.run(main())
+    finally:
+        # RESPONSE_CACHE is unset: this removes the wrapper again
+        assert enable_response_cache() is None
+    assert not isinstance(provider.get_model(), CachedModel)
+
+
+def test_environment_variable_picks_the_backend(monkeypatch, tmp_path):
+    monkeypatch.setenv("RESPONSE_CACHE", str(tmp_path / "responses.sqlite"))
+    try:
+        backend = enable_response_cache(ttl=60)
+        model = provider.get_model()
+        assert isinstance(model, CachedModel)
+        assert model.backend is backend
+        assert model.ttl == 60
+    finally:
+        monkeypatch.delenv("RESPONSE_CACHE")
+        enable_response_cache()
+        backend.close()
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import threading
+import time
+
+from agents import Agent
+
+from shared import provider
+from shared.mock_server import Script, ScriptedResponder
+from shared.resumable import RESUME_SEQ_GAP, MemoryCheckpointStore, ResumableRuns, RunRecord, SQLiteCheckpointStore
+
+
+def delta(text: str) -> str:
+    return json.dumps({"type": "raw_response_event", "data": {"type": "response.output_text.delta", "delta": text}})
+
+
+def message(text: str) -> dict:
+    return {"type": "message", "role": "assistant", "content": [{"type": "output_text", "text": text}]}
+
+
+async def collect(runs: ResumableRuns, run_id: str, after: int = -1) -> list[tuple[int, dict]]:
+    return [frame async for frame in runs.events(run_id, after=after)]
+
+
+def test_completed_run_is_replayed_not_run_again(serve, tmp_path):
+    async def main():
+        async with serve(lambda body: "the answer") as server:
+            runs = ResumableRuns(SQLiteCheckpointStore(tmp_path / "runs.sqlite"))
+            agent = Agent(name="Assistant", model=provider.get_model())
+            await runs.start("r1", agent, "hello")
+            record = await runs.wait("r1")
+            assert record.status == "completed"
+            assert record.final_output == "the answer"
+
+            frames = await collect(runs, "r1")
+            seqs = [seq for seq, _ in frames]
+            assert seqs == list(range(len(frames)))
+            # A client that saw half the frames gets exactly the rest
+            assert await collect(runs, "r1", after=seqs[len(seqs) // 2]) == frames[len(seqs) // 2 + 1 :]
+
+            requests = server.stats.requests
+            await runs.start("r1", agent, "hello")
+            assert server.stats.requests == requests
+            assert runs.stats.runs_reused == 1
+
+    asyncio.run(main())
+
+
+def test_stale_run_continues_after_its_last_completed_item(serve):
+    async def main():
+        async with serve(lambda body: "the answer") as server:
+            store = MemoryCheckpointStore()
+            # A process stopped halfway through its second model call: frames 0-4 and the
+            # message item at 5 are complete, 6-9 are a partial answer
+            frames = [(seq, delta(f"first {seq}")) for seq in range(5)]
+            frames.append((5, json.dumps({"type": "run_item_stream_event", "name": "message_output_created"})))
+            frames += [(seq, delta(f"partial {seq}")) for seq in range(6, 10)]
+            stale = RunRecord("r1", "hello", items=[message("first")], last_seq=9, items_seq=5)
+            stale.updated_at = time.time() - 3600
+            store.save(stale, frames)
+
+            runs = ResumableRuns(store, stale_after=60)
+            await runs.start("r1", Agent(name="Assistant", model=provider.get_model()), "hello")
+            record = await runs.wait("r1")
+            assert record.status == "completed"
+            assert runs.stats.runs_continued == 1
+
+            # Only the unfinished model call was repeated, on top of the completed item
+            assert server.stats.requests == 1
+            replayed = await collect(runs, "r1")
+            seqs = [seq for seq, _ in replayed]
+            assert seqs[:6] == list(range(6))
+            assert all("partial" not in json.dumps(frame) for _, frame in replayed)
+            assert replayed[6] == (9 + RESUME_SEQ_GAP, {"type": "run_reset", "after": 5})
+            assert seqs == sorted(seqs)
+
+            # A client that got frames the stopped process never checkpointed still gets the reset
+            after_unsaved = await collect(runs, "r1", after=12)
+            assert after_unsaved[0] == (9 + RESUME_SEQ_GAP, {"type": "run_reset", "after": 5})
+
+    asyncio.run(main())
+
+
+def test_run_continues_on_the_agent_it_handed_off_to(serve):
+    instructions = []
+
+    def responder(body: dict) -> str:
+        instructions.append(body["messages"][0]["content"])
+        return "the answer"
+
+    async def main():
+        async with serve(responder):
+            urdu_agent = Agent(name="Urdu Agent", instructions="Answer in Urdu.", model=provider.get_model())
+            agent = Agent(name="Assistant", instructions="Triage.", model=provider.get_model(), handoffs=[urdu_agent])
+            store = MemoryCheckpointStore()
+            stale = RunRecord("r1", "hello", agent="Urdu Agent", items=[message("first")], last_seq=5, items_seq=5)
+            stale.updated_at = time.time() - 3600
+            store.save(stale, [])
+
+            runs = ResumableRuns(store, stale_after=60)
+            await runs.start("r1", agent, "hello")
+            record = await runs.wait("r1")
+            assert record.status == "completed"
+            assert record.agent == "Urdu Agent"
+            assert instructions == ["Answer in Urdu."]
+
+    asyncio.run(main())
+
+
+def test_handoff_is_checkpointed(serve):
+    async def main():
+        async with serve(ScriptedResponder(Script(handoff="transfer_to_urdu_agent", reply="the answer"))):
+            urdu_agent = Agent(name="Urdu Agent", model=provider.get_model())
+            agent = Agent(name="Assistant", model=provider.get_model(), handoffs=[urdu_agent])
+            runs = ResumableRuns(MemoryCheckpointStore())
+            record = await runs.start("r1", agent, "hello")
+            assert record.agent == "Assistant"
+            record = await runs.wait("r1")
+            assert record.agent == "Urdu Agent"
+
+    asyncio.run(main())
+
+
+def test_store_is_called_off_the_event_loop(serve):
+    class ThreadRecordingStore(MemoryCheckpointStore):
+        def save(self, record, frames):
+            threads.add(threading.get_ident())
+            super().save(record, frames)
+
+    threads = set()
+
+    async def main():
+        async with serve(lambda body: "the answer"):
+            runs = ResumableRuns(ThreadRecordingStore())
+            await runs.start("r1", Agent(name="Assistant", model=provider.get_model()), "hello")
+            await runs.wait("r1")
+
+    asyncio.run(main())
+    assert threads and threading.get_ident() not in threads
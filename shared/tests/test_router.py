@@ -0,0 +1,63 @@
+import asyncio
+
+from agents import Agent, Runner
+
+from shared import provider
+from shared.router import FastPathRouter
+from shared.tiered_guardrail import ARABIC_LETTERS, ARABIC_SCRIPT, PERSO_URDU_LETTERS, URDU_LETTERS, ScriptCheck, Verdict
+
+
+def triage() -> tuple[Agent, FastPathRouter]:
+    model = provider.get_model()
+    urdu_agent = Agent(name="Urdu Agent", instructions="Answer in Urdu.", model=model)
+    arabic_agent = Agent(name="Arabic Agent", instructions="Answer in Arabic.", model=model)
+    router = FastPathRouter(
+        model,
+        {
+            "Urdu Agent": [ScriptCheck(ARABIC_SCRIPT, Verdict.passed("Urdu script"), marker_chars=URDU_LETTERS)],
+            "Arabic Agent": [
+                ScriptCheck(
+                    ARABIC_SCRIPT,
+                    Verdict.passed("Arabic script"),
+                    marker_chars=ARABIC_LETTERS,
+                    excluded_chars=PERSO_URDU_LETTERS,
+                )
+            ],
+        },
+    )
+    agent = Agent(name="Assistant", instructions="Triage.", model=router, handoffs=[urdu_agent, arabic_agent])
+    return agent, router
+
+
+def test_obvious_message_is_handed_off_without_a_triage_turn(serve):
+    async def main():
+        async with serve() as server:
+            agent, router = triage()
+            result = await Runner.run(agent, "آپ کیسے ہیں؟")
+            assert result.last_agent.name == "Urdu Agent"
+            assert server.stats.requests == 1
+
+            streamed = Runner.run_streamed(agent, "كيف حالك؟")
+            async for _ in streamed.stream_events():
+                pass
+            assert streamed.last_agent.name == "Arabic Agent"
+            assert server.stats.requests == 2
+            assert router.stats.routed == {"Urdu Agent": 1, "Arabic Agent": 1}
+
+    asyncio.run(main())
+
+
+def test_unclear_message_goes_to_the_model(serve):
+    async def main():
+        async with serve() as server:
+            agent, router = triage()
+            # Arabic script shared by Urdu and Arabic, with no marker letter of either
+            result = await Runner.run(agent, "سلام")
+            assert result.last_agent.name == "Assistant"
+            result = await Runner.run(agent, "hello, how are you?")
+            assert result.last_agent.name == "Assistant"
+            assert server.stats.requests == 2
+            assert router.stats.fallbacks == 2
+            assert not router.stats.routed
+
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+from typing import Any
+
+import pytest
+from agents import set_tracing_disabled
+from agents.tracing import Span, Trace, agent_span, get_trace_provider, set_trace_provider, trace
+from agents.tracing.processor_interface import TracingProcessor
+
+from shared.sampling import SamplingTraceProcessor
+
+
+class Collector(TracingProcessor):
+    def __init__(self) -> None:
+        self.traces: list[str] = []
+
+    def on_trace_start(self, trace: Trace) -> None:
+        pass
+
+    def on_trace_end(self, trace: Trace) -> None:
+        self.traces.append(trace.name)
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        pass
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        pass
+
+    def force_flush(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+@pytest.fixture
+def restore_provider():
+    previous = get_trace_provider()
+    yield
+    set_trace_provider(previous)
+
+
+def run(agent_name: str) -> None:
+    with trace(f"workflow {agent_name}"):
+        with agent_span(name=agent_name):
+            pass
+
+
+def test_agents_without_a_limit_share_the_fallback_bucket(restore_provider):
+    collector = Collector()
+    sampler = SamplingTraceProcessor([collector], agent_rate_limits={"*": 1.0, "Triage": 2.0})
+    sampler.install(tracing_disabled=False)
+    for name in ("Assistant", "Urdu Agent", "Arabic Agent", "Triage", "Triage", "Triage"):
+        run(name)
+    assert collector.traces == ["workflow Assistant", "workflow Triage", "workflow Triage"]
+    assert sampler.stats.rate_limited == 3
+
+
+def test_installed_provider_follows_the_public_disabled_setting(restore_provider):
+    collector = Collector()
+    sampler = SamplingTraceProcessor([collector], head_rate=0.0, seed=0)
+    sampler.install(tracing_disabled=True)
+    run("Assistant")
+    assert sampler.stats.traces == 0
+
+    set_tracing_disabled(False)
+    run("Assistant")
+    assert collector.traces == []
+    # Lost the head roll before any span was built
+    assert sampler.stats.unrecorded == 1
+
+    with trace("disabled run", disabled=True):
+        pass
+    assert sampler.stats.traces == 1
+
+
+def test_install_defaults_to_the_environment(restore_provider, monkeypatch):
+    monkeypatch.setenv("OPENAI_AGENTS_DISABLE_TRACING", "1")
+    collector = Collector()
+    SamplingTraceProcessor([collector]).install()
+    run("Assistant")
+    assert collector.traces == []
+
+    monkeypatch.delenv("OPENAI_AGENTS_DISABLE_TRACING")
+    SamplingTraceProcessor([collector]).install()
+    run("Assistant")
+    assert collector.traces == ["workflow Assistant"]
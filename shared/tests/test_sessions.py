@@ -0,0 +1,84 @@
+import asyncio
+
+from agents import Agent, function_tool
+
+from shared import provider
+from shared.mock_server import Script, ScriptedResponder
+from shared.sessions import LogSessionBackend, SessionMemory, SQLiteSessionBackend
+
+
+def call(call_id: str, arguments: str = "{}") -> dict:
+    return {"type": "function_call", "call_id": call_id, "name": "get_weather", "arguments": arguments}
+
+
+def output(call_id: str) -> dict:
+    return {"type": "function_call_output", "call_id": call_id, "output": "sunny"}
+
+
+def assert_no_orphans(history: list[dict]) -> None:
+    calls = {item["call_id"] for item in history if item.get("type") == "function_call"}
+    outputs = {item["call_id"] for item in history if item.get("type") == "function_call_output"}
+    assert outputs <= calls
+    assert calls <= outputs
+
+
+def test_parallel_tool_calls_fold_as_one_group(tmp_path):
+    memory = SessionMemory(SQLiteSessionBackend(tmp_path / "sessions.sqlite"), window=20, keep_last=1)
+    memory.append(
+        "s1",
+        [
+            {"role": "user", "content": "weather in lahore and karachi?"},
+            call("a", " ".join(["lahore"] * 60)),
+            call("b"),
+            output("a"),
+            output("b"),
+            {"role": "assistant", "content": "Both are sunny."},
+        ],
+    )
+    history = memory.history("s1")
+    assert_no_orphans(history)
+    assert history[-1] == {"role": "assistant", "content": "Both are sunny."}
+
+    # A cold load reads the same history back
+    reloaded = SessionMemory(SQLiteSessionBackend(tmp_path / "sessions.sqlite"), window=20, keep_last=1)
+    assert reloaded.history("s1") == history
+
+
+def test_turns_keep_tool_calls_with_their_outputs(serve, tmp_path):
+    script = Script(tool_calls={"get_weather": '{"city": "Lahore"}', "get_time": '{"city": "Lahore"}'}, reply="Sunny, noon.")
+
+    @function_tool
+    def get_weather(city: str) -> str:
+        """returns the weather of a city"""
+        return f"The weather of {city} is sunny"
+
+    @function_tool
+    def get_time(city: str) -> str:
+        """returns the time in a city"""
+        return f"It is noon in {city}"
+
+    async def main():
+        async with serve(ScriptedResponder(script)):
+            agent = Agent(name="Assistant", tools=[get_weather, get_time], model=provider.get_model())
+            memory = SessionMemory(LogSessionBackend(tmp_path / "sessions"), window=40, keep_last=2)
+            for turn in range(6):
+                await memory.run(agent, "s1", f"weather and time in lahore, turn {turn}?")
+                assert_no_orphans(memory.history("s1"))
+            assert memory.stats.summarized_items > 0
+
+    asyncio.run(main())
+
+
+def test_turns_survive_eviction_of_their_session(serve, tmp_path):
+    async def main():
+        async with serve(latency=0.05):
+            agent = Agent(name="Assistant", model=provider.get_model())
+            memory = SessionMemory(SQLiteSessionBackend(tmp_path / "sessions.sqlite"), max_cached_sessions=1)
+            # Each new session evicts the cached one while turns of it are still running
+            session_ids = ["a", "b", "a", "c", "a", "b"]
+            await asyncio.gather(*(memory.run(agent, session_id, f"hello {i}") for i, session_id in enumerate(session_ids)))
+            assert len(memory.history("a")) == 6
+            assert len(memory.history("b")) == 4
+            assert len(memory.history("c")) == 2
+
+    asyncio.run(main())
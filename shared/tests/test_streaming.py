@@ -0,0 +1,77 @@
+import asyncio
+import dataclasses
+
+from agents import Agent, RunResultStreaming, Runner
+
+from shared import provider
+from shared.streaming import TEXT_DELTA, BroadcastStream, StreamPolicy, _PolicyQueue
+
+ANSWER = " ".join(f"word{i}" for i in range(200))
+
+
+def answer(body: dict) -> str:
+    return ANSWER
+
+
+def test_sdk_internals_the_policy_relies_on():
+    # StreamPolicy and BroadcastStream swap and wake the result's private event queue;
+    # if this fails, the SDK changed them and the pin in pyproject.toml can't move yet
+    fields = {field.name for field in dataclasses.fields(RunResultStreaming)}
+    assert {"_event_queue", "_run_impl_task"} <= fields
+    from agents._run_impl import QueueCompleteSentinel
+
+    assert isinstance(QueueCompleteSentinel(), QueueCompleteSentinel)
+
+
+def test_subscribed_and_coalesced_deltas(serve):
+    async def main():
+        async with serve(answer):
+            agent = Agent(name="Assistant", instructions="Answer.", model=provider.get_model())
+            policy = StreamPolicy(subscribe={TEXT_DELTA}, coalesce_chars=64)
+            result = policy.run_streamed(agent, "hello")
+            assert isinstance(result._event_queue, _PolicyQueue)
+            text = ""
+            async for event in result.stream_events():
+                assert event.data.type == TEXT_DELTA
+                text += event.data.delta
+            assert text == result.final_output == ANSWER
+            assert policy.stats.filtered > 0
+            assert policy.stats.coalesced > 0
+            assert policy.stats.queued < 200
+
+    asyncio.run(main())
+
+
+def test_full_queue_holds_back_the_model_stream(serve):
+    async def main():
+        async with serve(answer):
+            agent = Agent(name="Assistant", instructions="Answer.", model=provider.get_model())
+            policy = StreamPolicy(subscribe={TEXT_DELTA}, max_queue=4)
+            result = policy.run_streamed(agent, "hello")
+            text = ""
+            async for event in result.stream_events():
+                text += event.data.delta
+                await asyncio.sleep(0.001)
+            assert text == ANSWER
+            assert policy.stats.producer_waits > 0
+            assert policy.stats.peak_queue <= 5
+
+    asyncio.run(main())
+
+
+def test_broadcast_delivers_the_run_to_every_subscriber(serve):
+    async def main():
+        async with serve(answer):
+            agent = Agent(name="Assistant", instructions="Answer.", model=provider.get_model())
+            broadcast = BroadcastStream(Runner.run_streamed(agent, "hello"))
+            first = broadcast.subscribe(subscribe={TEXT_DELTA})
+            second = broadcast.subscribe(subscribe={TEXT_DELTA})
+
+            async def read(subscriber) -> str:
+                return "".join([event.data.delta async for event in subscriber])
+
+            assert await asyncio.gather(read(first), read(second)) == [ANSWER, ANSWER]
+            late = broadcast.subscribe(subscribe={TEXT_DELTA}, replay=True)
+            assert await read(late) == ANSWER
+
+    asyncio.run(main())
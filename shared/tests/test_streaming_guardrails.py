@@ -0,0 +1,71 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from agents import GuardrailFunctionOutput, OutputGuardrail, OutputGuardrailTripwireTriggered
+from agents.stream_events import RawResponsesStreamEvent
+from openai.types.responses import ResponseTextDeltaEvent
+
+from shared.streaming_guardrails import StreamingOutputGuardrail
+
+
+def delta(text: str) -> RawResponsesStreamEvent:
+    return RawResponsesStreamEvent(
+        data=ResponseTextDeltaEvent.model_construct(
+            type="response.output_text.delta", delta=text, item_id="msg", output_index=0, content_index=0
+        )
+    )
+
+
+def forbidden_guardrail(checked: list[str], release: asyncio.Event) -> OutputGuardrail:
+    async def check(ctx, agent, output: str) -> GuardrailFunctionOutput:
+        checked.append(output)
+        if len(checked) == 1:
+            # The first check is still running when the rest of the answer arrives
+            await release.wait()
+        return GuardrailFunctionOutput(output_info=None, tripwire_triggered="FORBIDDEN" in output)
+
+    return OutputGuardrail(guardrail_function=check)
+
+
+async def drain(guard: StreamingOutputGuardrail, result, events) -> list:
+    return [event async for event in guard.stream(result, events)]
+
+
+@pytest.mark.parametrize("check_final", [True, False])
+def test_boundary_queued_behind_a_running_check_is_checked(check_final):
+    checked: list[str] = []
+    cancelled: list[bool] = []
+    release = asyncio.Event()
+    guard = StreamingOutputGuardrail([forbidden_guardrail(checked, release)], check_final=check_final)
+    result = SimpleNamespace(context_wrapper=None, current_agent=None, cancel=lambda: cancelled.append(True))
+
+    async def events():
+        yield delta("The weather in Lahore is sunny. ")
+        await asyncio.sleep(0)
+        yield delta("Now the FORBIDDEN part.")
+        release.set()
+
+    with pytest.raises(OutputGuardrailTripwireTriggered):
+        asyncio.run(drain(guard, result, events()))
+    assert checked == ["The weather in Lahore is sunny. ", "The weather in Lahore is sunny. Now the FORBIDDEN part."]
+    assert guard.stats.coalesced == 1
+    assert guard.stats.trips == 1
+    assert cancelled == [True]
+
+
+def test_clean_answer_is_checked_once_per_boundary_and_at_the_end():
+    checked: list[str] = []
+    release = asyncio.Event()
+    release.set()
+    guard = StreamingOutputGuardrail([forbidden_guardrail(checked, release)])
+    result = SimpleNamespace(context_wrapper=None, current_agent=None, cancel=lambda: None)
+
+    async def events():
+        yield delta("The weather in Lahore is sunny. ")
+        yield delta("It will rain tomorrow")
+
+    out = asyncio.run(drain(guard, result, events()))
+    assert len(out) == 2
+    assert checked[-1] == "The weather in Lahore is sunny. It will rain tomorrow"
+    assert guard.stats.trips == 0
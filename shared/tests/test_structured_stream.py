@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import pytest
+from agents import Agent
+from pydantic import BaseModel
+
+from shared import provider
+from shared.mock_server import Script, ScriptedResponder
+from shared.structured_stream import PartialJSONParser, StructuredStream
+
+REASONING = "The user asks about the weather in Lahore. " * 20
+
+
+class WeatherCheck(BaseModel):
+    is_weather_query: bool
+    reasoning: str
+
+
+def guardrail_agent() -> Agent:
+    return Agent(name="Guardrail", instructions="Is it a weather query?", output_type=WeatherCheck, model=provider.get_model())
+
+
+def weather_responder() -> ScriptedResponder:
+    return ScriptedResponder(Script(structured={"is_weather_query": True, "reasoning": REASONING}))
+
+
+def test_parser_completes_fields_char_by_char():
+    value = {"ok": True, "n": -1.5e3, "text": 'say "hi" \\ {not a brace}', "items": [1, {"a": [2]}], "none": None}
+    parser = PartialJSONParser()
+    completed = []
+    for char in "```json\n" + json.dumps(value) + "\n```":
+        completed += parser.feed(char)
+    assert completed == list(value.items())
+    assert parser.done
+
+
+def test_first_field_arrives_before_the_reply_ends(serve):
+    async def main():
+        async with serve(weather_responder(), token_delay=0.002):
+            stream = StructuredStream(guardrail_agent(), "weather in lahore?")
+            try:
+                assert await stream.field("is_weather_query") is True
+            finally:
+                stream.cancel()
+            assert "reasoning" not in stream.fields
+            assert stream.partial(reasoning="") == WeatherCheck(is_weather_query=True, reasoning="")
+
+    asyncio.run(main())
+
+
+def test_final_output_and_missing_fields(serve):
+    async def main():
+        async with serve(weather_responder()):
+            stream = StructuredStream(guardrail_agent(), "weather in lahore?")
+            assert await stream.final_output() == WeatherCheck(is_weather_query=True, reasoning=REASONING)
+            assert await stream.field("reasoning") == REASONING
+            with pytest.raises(KeyError):
+                await stream.field("city")
+
+    asyncio.run(main())
+
+
+def test_cancelled_caller_stops_the_stream(serve):
+    async def main():
+        async with serve(weather_responder(), latency=0.5) as server:
+            stream = StructuredStream(guardrail_agent(), "weather in lahore?")
+
+            async def guardrail():
+                try:
+                    return await stream.field("is_weather_query")
+                finally:
+                    stream.cancel()
+
+            task = asyncio.create_task(guardrail())
+            # Cancelled while waiting for the reply; a cancel mid-connect leaks httpcore's socket
+            while not server.stats.requests:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await asyncio.wait_for(asyncio.gather(stream._task, return_exceptions=True), timeout=1)
+            assert stream._task.done()
+            assert not stream.fields
+
+    asyncio.run(main())
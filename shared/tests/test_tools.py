@@ -0,0 +1,82 @@
+import asyncio
+
+from agents import Agent, Runner
+
+from shared import provider
+from shared.mock_server import Script, ScriptedResponder
+from shared.tools import ToolCache, function_tool
+
+SCRIPT = Script(tool_calls={"get_weather": '{"city": "Lahore"}'}, reply="It is sunny.")
+
+
+def weather_agent(cache: ToolCache, calls: list[str], release: asyncio.Event) -> Agent:
+    @function_tool(cache=cache)
+    async def get_weather(city: str) -> str:
+        """returns the weather of a city"""
+        calls.append(city)
+        await release.wait()
+        return f"The weather of {city} is sunny"
+
+    return Agent(name="Assistant", instructions="give weather information", tools=[get_weather], model=provider.get_model())
+
+
+async def until(condition) -> None:
+    while not condition():
+        await asyncio.sleep(0.005)
+
+
+def test_waiter_calls_again_when_owner_run_is_cancelled(serve):
+    async def main():
+        async with serve(ScriptedResponder(SCRIPT)):
+            cache = ToolCache(ttl=60)
+            calls: list[str] = []
+            release = asyncio.Event()
+            agent = weather_agent(cache, calls, release)
+
+            owner = asyncio.create_task(Runner.run(agent, "weather in lahore?"))
+            await until(lambda: calls)
+            waiter = asyncio.create_task(Runner.run(agent, "weather in lahore?"))
+            await until(lambda: cache.stats.coalesced)
+            owner.cancel()
+            await until(lambda: len(calls) == 2)
+            release.set()
+
+            result = await waiter
+            assert result.final_output == "It is sunny."
+            assert owner.cancelled()
+            assert cache.stats.misses == 2
+
+            # The waiter's own call was cached
+            await Runner.run(agent, "weather in lahore?")
+            assert len(calls) == 2
+            assert cache.stats.hits == 1
+
+    asyncio.run(main())
+
+
+def test_errors_are_not_cached(serve):
+    async def main():
+        async with serve(ScriptedResponder(SCRIPT)):
+            cache = ToolCache(ttl=60)
+            attempts = 0
+
+            @function_tool(cache=cache)
+            async def get_weather(city: str) -> str:
+                """returns the weather of a city"""
+                nonlocal attempts
+                attempts += 1
+                if attempts == 1:
+                    raise RuntimeError("weather service down")
+                return f"The weather of {city} is sunny"
+
+            agent = Agent(name="Assistant", tools=[get_weather], model=provider.get_model())
+            first = await Runner.run(agent, "weather in lahore?")
+            outputs = [item.output for item in first.new_items if item.type == "tool_call_output_item"]
+            assert "weather service down" in outputs[0]
+
+            second = await Runner.run(agent, "weather in lahore?")
+            outputs = [item.output for item in second.new_items if item.type == "tool_call_output_item"]
+            assert outputs == ["The weather of Lahore is sunny"]
+            assert attempts == 2
+
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+import json
+import threading
+
+import httpx
+from agents.tracing.span_data import AgentSpanData
+from agents.tracing.spans import SpanImpl
+from agents.tracing.traces import TraceImpl
+
+from shared.tracing import BatchingTraceProcessor, JSONLExporter, OTLPExporter
+
+
+class ListExporter:
+    def __init__(self, block: threading.Event | None = None) -> None:
+        self.batches: list[list] = []
+        self.started = threading.Event()
+        self.block = block
+
+    def export(self, items: list) -> None:
+        self.started.set()
+        if self.block is not None:
+            self.block.wait(5)
+        self.batches.append(list(items))
+
+
+def run(processor, agent_name: str = "Assistant") -> None:
+    trace = TraceImpl(f"workflow {agent_name}", None, None, None, processor)
+    trace.start()
+    span = SpanImpl(trace.trace_id, None, None, processor, AgentSpanData(name=agent_name))
+    span.start()
+    span.finish()
+    trace.finish()
+
+
+def test_items_are_exported_in_bounded_batches():
+    exporter = ListExporter()
+    processor = BatchingTraceProcessor(exporter, max_batch_size=4, schedule_delay=60)
+    for index in range(5):
+        run(processor, f"Agent {index}")
+    assert processor.force_flush(timeout=5)
+    assert sum(len(batch) for batch in exporter.batches) == 10
+    assert all(len(batch) <= 4 for batch in exporter.batches)
+    assert processor.stats.exported == processor.stats.enqueued == 10
+    assert processor.shutdown(timeout=5)
+
+
+def test_full_queue_drops_by_policy():
+    for policy, kept in (("drop_newest", ["Agent 1", "Agent 2"]), ("drop_oldest", ["Agent 2", "Agent 3"])):
+        release = threading.Event()
+        exporter = ListExporter(block=release)
+        processor = BatchingTraceProcessor(exporter, max_queue_size=2, schedule_delay=60, drop_policy=policy)
+        spans = [SpanImpl("trace_1", None, None, processor, AgentSpanData(name=f"Agent {i}")) for i in range(4)]
+        spans[0].finish()
+        # The worker is stuck exporting the first span while the others queue up
+        assert exporter.started.wait(5)
+        for span in spans[1:]:
+            span.finish()
+        release.set()
+        assert processor.shutdown(timeout=5)
+        names = [item.span_data.name for batch in exporter.batches for item in batch]
+        assert names == ["Agent 0", *kept]
+        assert processor.stats.dropped == 1
+
+
+def test_failed_exports_are_counted_not_retried():
+    class FailingExporter:
+        def export(self, items):
+            raise ConnectionError("collector down")
+
+    processor = BatchingTraceProcessor(FailingExporter(), schedule_delay=60)
+    run(processor)
+    assert processor.force_flush(timeout=5)
+    assert processor.stats.export_errors == 1
+    assert processor.stats.exported == 0
+    assert processor.shutdown(timeout=5)
+
+
+def test_jsonl_exporter_writes_one_line_per_item(tmp_path):
+    path = tmp_path / "traces" / "traces.jsonl"
+    processor = BatchingTraceProcessor(JSONLExporter(path), schedule_delay=60)
+    run(processor)
+    assert processor.shutdown(timeout=5)
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["object"] for line in lines] == ["trace", "trace.span"]
+    assert lines[1]["span_data"]["name"] == "Assistant"
+
+
+def test_otlp_exporter_posts_spans_with_their_workflow():
+    payloads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200)
+
+    exporter = OTLPExporter()
+    exporter._client = httpx.Client(transport=httpx.MockTransport(handler))
+    processor = BatchingTraceProcessor(exporter, max_batch_size=1, schedule_delay=60)
+    run(processor, "Assistant")
+    run(processor, "Urdu Agent")
+    assert processor.shutdown(timeout=5)
+
+    spans = [span for payload in payloads for span in payload["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+    assert [span["name"] for span in spans] == ["agent: Assistant", "agent: Urdu Agent"]
+    assert len(spans[0]["traceId"]) == 32 and len(spans[0]["spanId"]) == 16
+    # The trace is exported first, even in a batch of its own
+    for span, workflow in zip(spans, ["workflow Assistant", "workflow Urdu Agent"]):
+        attributes = {attribute["key"]: attribute["value"] for attribute in span["attributes"]}
+        assert attributes["agents.workflow_name"] == {"stringValue": workflow}